@@ -32,12 +32,14 @@ from src.general.genTF import genTF
 from src.general.sanityCheck import sanityInput
 from src.general.saveResults import saveResults
 from src.general.genLoadInput import genLoadInput
+from src.general.OPP import oppTable, oppPulse, oppMi, oppK
 
 
 # ==============================================================================
 # External
 # ==============================================================================
 import sys
+from os.path import join as pjoin
 
 
 #######################################################################################################################
@@ -81,7 +83,7 @@ def main(setupExp, setupData, setupTopo, setupPara, setupPath):
     # Parameter
     # ==============================================================================
     try:
-        para = loadPara(setupTopo, setupPath, setupPara)
+        para = loadPara(setupTopo, setupPath, setupPara, setupExp)
     except:
         sys.exit('ERROR: Parameters could not be loaded')
 
@@ -118,6 +120,12 @@ def main(setupExp, setupData, setupTopo, setupPara, setupPath):
     # ==============================================================================
     setupData = genLoadInput(setupExp, setupTopo, setupData)
 
+    # ==============================================================================
+    # Optimal Pulse Patterns
+    # ==============================================================================
+    if setupPara['PWM']['type'] == "OPP":
+        oppTable(oppMi, [oppPulse(setupPara, setupTopo)], oppK, pjoin(setupPath['parPath'], 'OPP'))
+
     # ==============================================================================
     # MSG OUT
     # ==============================================================================
@@ -27,7 +27,7 @@ from src.data.loadParaCap import loadParaCap
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def loadPara(setupTopo, setupPath, setupPara):
+def loadPara(setupTopo, setupPath, setupPara, setupExp):
     ###################################################################################################################
     # MSG IN
     ###################################################################################################################
@@ -46,7 +46,7 @@ def loadPara(setupTopo, setupPath, setupPara):
     # ==============================================================================
     # Switches
     # ==============================================================================
-    paraSwi = loadParaSwi(setupTopo['SwiName'], setupPath['parPath'], setupPara)
+    paraSwi = loadParaSwi(setupTopo['SwiName'], setupPath['parPath'], setupPara, setupExp)
 
     # ==============================================================================
     # Capacitor
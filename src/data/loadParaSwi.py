@@ -16,18 +16,21 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import tabGrid, tabInter
 
 # ==============================================================================
 # External
 # ==============================================================================
+import numpy as np
 import pandas as pd
+from scipy import integrate
 from os.path import join as pjoin
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def loadParaSwi(name, path, setupPara):
+def loadParaSwi(name, path, setupPara, setupExp):
     ###################################################################################################################
     # MSG IN
     ###################################################################################################################
@@ -190,6 +193,36 @@ def loadParaSwi(name, path, setupPara):
         para['Elec']['con']['Coss'] = para['Elec']['con']['Coss'] * 0
         para['Elec']['con']['Crss'] = para['Elec']['con']['Crss'] * 0
 
+    # ==============================================================================
+    # Device Model
+    # ==============================================================================
+    # Grids of the tabular model versus (Tj, I) or (Tj, V) are built once and evaluated vectorised with tabInter()
+    para['Elec']['mdl'] = {}
+    axis = {'Vf': 'If', 'Vfd': 'Ifd', 'Eon': 'If', 'Eoff': 'If', 'Erec': 'Ifd', 'Coss': 'Vf', 'Crss': 'Vf'}
+    for key in axis:
+        para['Elec']['mdl'][key] = tabGrid(para['Elec']['vec']['Tj'], para['Elec']['vec'][axis[key]],
+                                           para['Elec']['tab'][key])
+        if para['Elec']['mdl'][key] is None and para['Elec']['tab'][key].size > 0:
+            print("WARN: Table '%s' does not match the axes 'Tj' and '%s' and is ignored" % (key, axis[key]))
+
+    # ------------------------------------------
+    # Output and reverse transfer energies
+    # ------------------------------------------
+    # Charges and energies of Coss and Crss are integrated once over nInt voltage steps
+    para['Elec']['mdl']['Eoss'] = None
+    para['Elec']['mdl']['Erss'] = None
+    if para['Elec']['mdl']['Coss'] is not None and para['Elec']['mdl']['Crss'] is not None:
+        Tj = para['Elec']['vec']['Tj'].to_numpy(dtype=float)
+        V_int = np.linspace(0, int(np.max(para['Elec']['vec']['Vf'].values)), setupExp['int'])
+        Qoss = integrate.cumulative_trapezoid(tabInter(para['Elec']['mdl']['Coss'], Tj.reshape(-1, 1), V_int), x=V_int,
+                                              initial=V_int[0], axis=1)
+        Qrss = integrate.cumulative_trapezoid(tabInter(para['Elec']['mdl']['Crss'], Tj.reshape(-1, 1), V_int), x=V_int,
+                                              initial=V_int[0], axis=1)
+        Eoss = integrate.cumulative_trapezoid(Qoss, x=V_int, initial=V_int[0], axis=1)
+        Erss = integrate.cumulative_trapezoid(Qrss, x=V_int, initial=V_int[0], axis=1)
+        para['Elec']['mdl']['Eoss'] = tabGrid(Tj, V_int, np.transpose(Eoss))
+        para['Elec']['mdl']['Erss'] = tabGrid(Tj, V_int, np.transpose(Erss))
+
     ###################################################################################################################
     # Return
     ###################################################################################################################
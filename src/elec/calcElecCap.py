@@ -16,6 +16,7 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import lsimBatch
 
 # ==============================================================================
 # External
@@ -42,7 +43,7 @@ def calcElecCap(t, i_c, Tj, para, setupPara, setupTopo):
     # Variables
     # ==============================================================================
     f = np.linspace(0, int(1/dt), int(len(i_c)/2))
-    t = np.linspace(0, 2/fel, len(i_c)*2-1)
+    t = np.arange(0, len(i_c)*2-1) * dt
 
     ###################################################################################################################
     # Pre-Processing
@@ -94,7 +95,7 @@ def calcElecCap(t, i_c, Tj, para, setupPara, setupTopo):
     # Calculation
     ###################################################################################################################
     tf = signal.TransferFunction([ESR*C, 1], [C, 0])
-    _, v_dc, _, = signal.lsim(tf, i_c, t)
+    v_dc = lsimBatch(tf, i_c, t)
 
     ###################################################################################################################
     # Post-Processing
@@ -16,20 +16,18 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import tabInter
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
-import pandas as pd
-import copy
-from scipy import interpolate
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
+def calcElecBri(Vdc, Is, G, Tj, pos, para, setupPara):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
@@ -41,16 +39,28 @@ def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
     Vfd = para['Swi']['Elec']['con']['Vfd']
     RonD = para['Swi']['Elec']['con']['RonD']
 
+    # ==============================================================================
+    # Bridge
+    # ==============================================================================
+    # Rows are the switches of the bridge (switches x samples), Is is shared if one-dimensional, Tj holds one
+    # temperature and pos one position ('HS' or 'LS') per switch
+    G = np.atleast_2d(np.asarray(G, dtype=bool))
+    Is = np.broadcast_to(np.asarray(Is, dtype=float), np.shape(G))
+    Tj = np.reshape(np.asarray(Tj, dtype=float), (-1, 1))
+    hs = np.reshape(np.asarray(pos) == 'HS', (-1, 1))
+
     # ==============================================================================
     # Variables
     # ==============================================================================
-    VfT = np.zeros(np.size(Is))
-    VfD = np.zeros(np.size(Is))
+    VfT = np.zeros(np.shape(Is))
+    VfD = np.zeros(np.shape(Is))
+    Gf = G.astype(float)
+    nGf = (~G).astype(float)
 
     # ==============================================================================
     # Output
     # ==============================================================================
-    out = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
+    out = {}
 
     ###################################################################################################################
     # Pre-Processing
@@ -64,13 +74,13 @@ def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
     if setupPara['Elec']['SwiMdl'] == "con":
         # IGBT
         if setupPara['Elec']['SwiType'] == "IGBT":
-            VfT = Vf * np.ones(np.size(Is))
-            VfD = Vfd * np.ones(np.size(Is))
+            VfT = Vf * np.ones(np.shape(Is))
+            VfD = Vfd * np.ones(np.shape(Is))
 
         # MOSFET
         if setupPara['Elec']['SwiType'] == "MOSFET":
-            VfT = Vf * np.ones(np.size(Is))
-            VfD = Vfd * np.ones(np.size(Is))
+            VfT = Vf * np.ones(np.shape(Is))
+            VfD = Vfd * np.ones(np.shape(Is))
 
     # ------------------------------------------
     # Piece-wise linear (tbi)
@@ -92,36 +102,27 @@ def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
     if setupPara['Elec']['SwiMdl'] == "tab":
         # IGBT
         if setupPara['Elec']['SwiType'] == "IGBT":
-            Vce_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                          para['Swi']['Elec']['vec']['If'].to_numpy(),
-                                          para['Swi']['Elec']['tab']['Vf'].to_numpy(), kind='linear')
-            Vfd_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                          para['Swi']['Elec']['vec']['Ifd'].to_numpy(),
-                                          para['Swi']['Elec']['tab']['Vfd'].to_numpy(), kind='linear')
-
-            for i in range(0, len(Is)):
-                VfT[i] = Vce_2d(Tj, abs(Is[i]))
-                VfD[i] = Vfd_2d(Tj, abs(Is[i]))
+            VfT = tabInter(para['Swi']['Elec']['mdl']['Vf'], Tj, np.abs(Is))
+            VfD = tabInter(para['Swi']['Elec']['mdl']['Vfd'], Tj, np.abs(Is))
 
         # MOSFET
         if setupPara['Elec']['SwiType'] == "MOSFET":
-            Vce_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                          para['Swi']['Elec']['vec']['If'].to_numpy(),
-                                          para['Swi']['Elec']['tab']['Vf'].to_numpy(), kind='linear')
-            Vfd_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                          para['Swi']['Elec']['vec']['Ifd'].to_numpy(),
-                                          para['Swi']['Elec']['tab']['Vfd'].to_numpy(), kind='linear')
-
-            for i in range(0, len(Is)):
-                VfT[i] = Vce_2d(Tj, abs(Is[i]))
-                VfD[i] = Vfd_2d(Tj, abs(Is[i]))
+            VfT = tabInter(para['Swi']['Elec']['mdl']['Vf'], Tj, np.abs(Is))
+            VfD = tabInter(para['Swi']['Elec']['mdl']['Vfd'], Tj, np.abs(Is))
 
     # ==============================================================================
     # Parameterize PWM Method
     # ==============================================================================
     if setupPara['PWM']['type'] == 0:
-        VfT = np.zeros(np.size(Is))
-        VfD = np.zeros(np.size(Is))
+        VfT = np.zeros(np.shape(Is))
+        VfD = np.zeros(np.shape(Is))
+
+    # ==============================================================================
+    # Current Direction
+    # ==============================================================================
+    # Forward conduction is Is > 0 for the high side and Is <= 0 for the low side, reverse conduction Is < 0 and Is > 0
+    fwd = np.where(hs, Is > 0, Is <= 0)
+    rev = np.where(hs, Is < 0, Is > 0)
 
     ###################################################################################################################
     # Calculation
@@ -129,91 +130,47 @@ def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
     # ==============================================================================
     # Transistor
     # ==============================================================================
-    if pos == 'HS':
-        # ------------------------------------------
-        # Voltage
-        # ------------------------------------------
-        v_T = Vdc * (~G).astype(float)
-        v_T[Is > 0] = v_T[Is > 0] + (VfT[Is > 0]) * (G[Is > 0]).astype(float) + (VfD[Is > 0]) * (~G[Is > 0]).astype(float)
-        v_T[Is <= 0] = v_T[Is <= 0] - (VfT[Is <= 0]) * (~G[Is <= 0]).astype(float) - (VfD[Is <= 0]) * (G[Is <= 0]).astype(float)
-
-        # ------------------------------------------
-        # Current
-        # ------------------------------------------
-        i_T = Is * G.astype(float)
-        if setupPara['Elec']['SwiRecCon'] == "D":
-            i_T[Is < 0] = 0
-        else:
-            i_T[Is < 0] = i_T[Is < 0] * (VfD[Is < 0] / (VfD[Is < 0] + VfT[Is < 0]))
+    # ------------------------------------------
+    # Voltage
+    # ------------------------------------------
+    v_T = Vdc * nGf
+    v_T = np.where(fwd, v_T + VfT * Gf + VfD * nGf, v_T - VfT * nGf - VfD * Gf)
+
+    # ------------------------------------------
+    # Current
+    # ------------------------------------------
+    i_T = np.where(hs, Is * Gf, Is * Gf * (-1))
+    if setupPara['Elec']['SwiRecCon'] == "D":
+        i_T[rev] = 0
     else:
-        # ------------------------------------------
-        # Voltage
-        # ------------------------------------------
-        v_T = Vdc * (~G).astype(float)
-        v_T[Is <= 0] = v_T[Is <= 0] + (VfT[Is <= 0]) * (G[Is <= 0]).astype(float) + (VfD[Is <= 0]) * (~G[Is <= 0]).astype(float)
-        v_T[Is > 0] = v_T[Is > 0] - (VfT[Is > 0]) * (~G[Is > 0]).astype(float) - (VfD[Is > 0]) * (G[Is > 0]).astype(float)
-
-        # ------------------------------------------
-        # Current
-        # ------------------------------------------
-        i_T = Is * G.astype(float) * (-1)
-        if setupPara['Elec']['SwiRecCon'] == "D":
-            i_T[Is > 0] = 0
-        else:
-            i_T[Is > 0] = i_T[Is > 0] * (VfD[Is > 0] / (VfD[Is > 0] + VfT[Is > 0]))
+        i_T[rev] = i_T[rev] * (VfD[rev] / (VfD[rev] + VfT[rev]))
 
     # ==============================================================================
     # Diode
     # ==============================================================================
-    if pos == 'HS':
-        # ------------------------------------------
-        # Voltage
-        # ------------------------------------------
-        v_D = -v_T
-
-        # ------------------------------------------
-        # Current
-        # ------------------------------------------
-        i_D = -copy.deepcopy(Is)
-        i_D[Is > 0] = 0
-        if setupPara['Elec']['SwiRecCon'] == "D":
-            # HS Gate 0/1
-            i_D[v_D < 0] = 0
-        else:
-            # HS Gate 0
-            i_D[v_D < 0] = 0
-
-            # HS Gate 1
-            i_D = i_D * (VfT / (VfD + VfT))
-
-            # Blanking time
-            if setupPara['Elec']['SwiRecMdl'] == 1:
-                i_D[(VfT > VfD) & (G.astype(float) == 1)] = 0
+    # ------------------------------------------
+    # Voltage
+    # ------------------------------------------
+    v_D = -v_T
 
+    # ------------------------------------------
+    # Current
+    # ------------------------------------------
+    i_D = np.where(hs, -Is, Is)
+    i_D[np.where(hs, Is > 0, Is < 0)] = 0
+    if setupPara['Elec']['SwiRecCon'] == "D":
+        # Gate 0/1
+        i_D[v_D < 0] = 0
     else:
-        # ------------------------------------------
-        # Voltage
-        # ------------------------------------------
-        v_D = -v_T
-
-        # ------------------------------------------
-        # Current
-        # ------------------------------------------
-        i_D = copy.deepcopy(Is)
-        i_D[Is < 0] = 0
-        if setupPara['Elec']['SwiRecCon'] == "D":
-            # HS Gate 0/1
-            i_D[v_D < 0] = 0
-        else:
-            # HS Gate 0
-            i_D[v_D < 0] = 0
-
-            # HS Gate 1
-            i_D = i_D * (VfT / (VfD + VfT))
-
-            # Blanking time
-            if setupPara['Elec']['SwiRecMdl'] == 1:
-                i_D[(VfT > VfD) & ((~G).astype(float) == 1)] = 0
+        # Gate 0
+        i_D[v_D < 0] = 0
+
+        # Gate 1
+        i_D = i_D * (VfT / (VfD + VfT))
+
+        # Blanking time
+        if setupPara['Elec']['SwiRecMdl'] == 1:
+            i_D[(VfT > VfD) & np.where(hs, G, ~G)] = 0
 
     ###################################################################################################################
     # Post-Processing
@@ -224,16 +181,26 @@ def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
     # ------------------------------------------
     # Transistor
     # ------------------------------------------
-    out['v_T'] = v_T / setupPara['Elec']['SwiSeries']
     out['i_T'] = i_T / setupPara['Elec']['SwiPara']
+    out['v_T'] = v_T / setupPara['Elec']['SwiSeries']
 
     # ------------------------------------------
     # Diode
     # ------------------------------------------
-    out['v_D'] = v_D / setupPara['Elec']['SwiSeries']
     out['i_D'] = i_D / setupPara['Elec']['SwiPara']
+    out['v_D'] = v_D / setupPara['Elec']['SwiSeries']
 
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return out
\ No newline at end of file
+    return out
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcElecSwi(Vdc, Is, G, Tj, pos, para, setupPara):
+    # Single switch of calcElecBri() returned as column store
+    out = calcElecBri(Vdc, Is, np.reshape(G, (1, -1)), Tj, [pos], para, setupPara)
+
+    return {key: out[key][0] for key in ['i_T', 'v_T', 'i_D', 'v_D']}
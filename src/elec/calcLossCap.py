@@ -20,7 +20,6 @@
 # ==============================================================================
 # External
 # ==============================================================================
-import pandas as pd
 import numpy as np
 from scipy import interpolate
 
@@ -42,7 +41,7 @@ def calcLossCap(t, i_c, Tj, para, setupPara, setupTopo):
     # ==============================================================================
     # Output
     # ==============================================================================
-    out = pd.DataFrame(columns=['p_L'])
+    out = {}
 
     ###################################################################################################################
     # Pre-Processing
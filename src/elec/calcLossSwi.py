@@ -16,20 +16,26 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
-from src.general.helpFnc import zoh_easy
+from src.general.helpFnc import zohEdge, tabInter
+from src.elec.calcElecSwi import calcElecBri
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
-import pandas as pd
-from scipy import interpolate, integrate
+import hashlib
+
+#######################################################################################################################
+# Loss Memory
+#######################################################################################################################
+# Maximum number of stored samples (waveform samples times electrical and loss quantities) per memory
+memMax = int(5e6)
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
+def calcLossBri(i_G, i_T, i_D, v_T, v_D, Tj, para, setupPara, setupExp):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
@@ -37,33 +43,53 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     # Parameters
     # ==============================================================================
     fs = setupPara['PWM']['fs']
-    nInt = setupExp['int']
+
+    # ==============================================================================
+    # Bridge
+    # ==============================================================================
+    # Rows are the switches of the bridge (switches x samples) and Tj holds one temperature per switch
+    i_G = np.atleast_2d(i_G)
+    i_T = np.atleast_2d(np.asarray(i_T, dtype=float))
+    i_D = np.atleast_2d(np.asarray(i_D, dtype=float))
+    v_T = np.atleast_2d(np.asarray(v_T, dtype=float))
+    v_D = np.atleast_2d(np.asarray(v_D, dtype=float))
+    Tj = np.ravel(np.asarray(Tj, dtype=float))
 
     # ==============================================================================
     # Variables
     # ==============================================================================
-    Eon = np.zeros(np.size(i_T))
-    Eoff = np.zeros(np.size(i_T))
-    Erec = np.zeros(np.size(i_T))
-    tf = np.zeros(np.size(i_T))
-    tr = np.zeros(np.size(i_T))
-    try:
-        V_int = np.linspace(0, int(np.max(para['Swi']['Elec']['vec']['Vf'].values)), nInt)
-    except:
-        V_int = np.linspace(0, int(np.max(np.abs(v_D))), nInt)
-    Coss_int = np.zeros((len(para['Swi']['Elec']['vec']['Tj']), len(V_int)))
-    Crss_int = np.zeros((len(para['Swi']['Elec']['vec']['Tj']), len(V_int)))
-    Eoss_2d = np.zeros((len(para['Swi']['Elec']['vec']['Tj']), len(V_int)))
-    Erss_2d = np.zeros((len(para['Swi']['Elec']['vec']['Tj']), len(V_int)))
+    c_on = np.diff(i_G, prepend=0, axis=-1)
+    c_off = np.diff(i_G, append=0, axis=-1) * (-1)
+    edge = (c_on != 0) | (c_off != 0)
+    edge[:, 0] = True
+    idx = np.flatnonzero(edge)
+    row = idx // np.shape(i_G)[-1]
+    Eon = np.zeros(np.size(idx))
+    Eoff = np.zeros(np.size(idx))
+    Erec = np.zeros(np.size(idx))
 
     # ==============================================================================
     # Output
     # ==============================================================================
-    out = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
+    out = {}
 
     ###################################################################################################################
     # Pre-Processing
     ###################################################################################################################
+    # ==============================================================================
+    # Switching Edges
+    # ==============================================================================
+    # Energies are only evaluated at the turn-on, turn-off and recovery edges (and the first sample) of all switches,
+    # the maxima scaling the energies are taken over the full waveform of each switch
+    i_T_e = i_T.ravel()[idx]
+    i_D_e = i_D.ravel()[idx]
+    v_T_e = v_T.ravel()[idx]
+    v_D_e = v_D.ravel()[idx]
+    Tj_e = Tj[row]
+    Imax_T = np.max(np.abs(i_T), axis=-1)[row]
+    Vmax_T = np.max(np.abs(v_T), axis=-1)[row]
+    Vmax_D = np.max(np.abs(v_D), axis=-1)[row]
+
     # ==============================================================================
     # Extract Parameters
     # ==============================================================================
@@ -73,15 +99,15 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     if setupPara['Elec']['SwiMdl'] == "con":
         # IGBT
         if setupPara['Elec']['SwiType'] == "IGBT":
-            Eon = para['Swi']['Elec']['con']['Eon'] * np.ones(np.size(i_T)) * np.max(np.abs(i_T)) / para['Swi']['Elec']['con']['Imax'] * np.max(np.abs(v_T)) / para['Swi']['Elec']['con']['Vmax']
-            Eoff = para['Swi']['Elec']['con']['Eoff'] * np.ones(np.size(i_T)) * np.max(np.abs(i_T)) / para['Swi']['Elec']['con']['Imax'] * np.max(np.abs(v_T)) / para['Swi']['Elec']['con']['Vmax']
-            Erec = para['Swi']['Elec']['con']['Erec'] * np.ones(np.size(i_T)) * np.max(np.abs(i_T)) / para['Swi']['Elec']['con']['Imax'] * np.max(np.abs(v_T)) / para['Swi']['Elec']['con']['Vmax']
+            Eon = para['Swi']['Elec']['con']['Eon'] * np.ones(np.size(i_T_e)) * Imax_T / para['Swi']['Elec']['con']['Imax'] * Vmax_T / para['Swi']['Elec']['con']['Vmax']
+            Eoff = para['Swi']['Elec']['con']['Eoff'] * np.ones(np.size(i_T_e)) * Imax_T / para['Swi']['Elec']['con']['Imax'] * Vmax_T / para['Swi']['Elec']['con']['Vmax']
+            Erec = para['Swi']['Elec']['con']['Erec'] * np.ones(np.size(i_T_e)) * Imax_T / para['Swi']['Elec']['con']['Imax'] * Vmax_T / para['Swi']['Elec']['con']['Vmax']
 
         # MOSFET
         if setupPara['Elec']['SwiType'] == "MOSFET":
-            Eon = 0.50 * np.max(np.abs(v_T)) * np.max(np.abs(i_T)) * (para['Swi']['Elec']['con']['tr'] + para['Swi']['Elec']['con']['tf']) + 0.5 * para['Swi']['Elec']['con']['Coss'] * np.max(np.abs(v_T)) ** 2 * np.ones(np.size(i_T))
-            Eoff = 0.50 * np.max(np.abs(v_T)) * np.max(np.abs(i_T)) * (para['Swi']['Elec']['con']['tr'] + para['Swi']['Elec']['con']['tf']) + 0.5 * para['Swi']['Elec']['con']['Coss'] * np.max(np.abs(v_T)) ** 2 * np.ones(np.size(i_T))
-            Erec = 0.25 * para['Swi']['Elec']['con']['Qrr'] * np.max(np.abs(v_D)) * np.ones(np.size(i_T)) + 0.5 * para['Swi']['Elec']['con']['Crss'] * np.max(np.abs(v_T)) ** 2 * np.ones(np.size(i_T))
+            Eon = 0.50 * Vmax_T * Imax_T * (para['Swi']['Elec']['con']['tr'] + para['Swi']['Elec']['con']['tf']) + 0.5 * para['Swi']['Elec']['con']['Coss'] * Vmax_T ** 2 * np.ones(np.size(i_T_e))
+            Eoff = 0.50 * Vmax_T * Imax_T * (para['Swi']['Elec']['con']['tr'] + para['Swi']['Elec']['con']['tf']) + 0.5 * para['Swi']['Elec']['con']['Coss'] * Vmax_T ** 2 * np.ones(np.size(i_T_e))
+            Erec = 0.25 * para['Swi']['Elec']['con']['Qrr'] * Vmax_D * np.ones(np.size(i_T_e)) + 0.5 * para['Swi']['Elec']['con']['Crss'] * Vmax_T ** 2 * np.ones(np.size(i_T_e))
 
     # ------------------------------------------
     # Piece-wise-linear
@@ -89,21 +115,18 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     if setupPara['Elec']['SwiMdl'] == "pwl":
         # IGBT
         if setupPara['Elec']['SwiType'] == "IGBT":
-            Eon = para['Swi']['Elec']['con']['Eon'] * np.abs(i_T) / para['Swi']['Elec']['con']['Imax'] * np.max(
-                np.abs(v_T)) / para['Swi']['Elec']['con']['Vmax']
-            Eoff = para['Swi']['Elec']['con']['Eoff'] * np.abs(i_T) / para['Swi']['Elec']['con']['Imax'] * np.max(
-                np.abs(v_T)) / para['Swi']['Elec']['con']['Vmax']
-            Erec = para['Swi']['Elec']['con']['Erec'] * np.abs(i_T) / para['Swi']['Elec']['con']['Imax'] * np.max(
-                np.abs(v_T)) / para['Swi']['Elec']['con']['Vmax']
+            Eon = para['Swi']['Elec']['con']['Eon'] * np.abs(i_T_e) / para['Swi']['Elec']['con']['Imax'] * Vmax_T / para['Swi']['Elec']['con']['Vmax']
+            Eoff = para['Swi']['Elec']['con']['Eoff'] * np.abs(i_T_e) / para['Swi']['Elec']['con']['Imax'] * Vmax_T / para['Swi']['Elec']['con']['Vmax']
+            Erec = para['Swi']['Elec']['con']['Erec'] * np.abs(i_T_e) / para['Swi']['Elec']['con']['Imax'] * Vmax_T / para['Swi']['Elec']['con']['Vmax']
 
         # MOSFET
         if setupPara['Elec']['SwiType'] == "MOSFET":
-            Eon = 0.50 * np.max(np.abs(v_T)) * np.abs(i_T) * (
+            Eon = 0.50 * Vmax_T * np.abs(i_T_e) * (
                         para['Swi']['Elec']['con']['tr'] + para['Swi']['Elec']['con']['tf']) + \
-                  para['Swi']['Elec']['con']['Qrr'] * np.max(np.abs(v_T))
-            Eoff = 0.50 * np.max(np.abs(v_T)) * np.abs(i_T) * (
+                  para['Swi']['Elec']['con']['Qrr'] * Vmax_T
+            Eoff = 0.50 * Vmax_T * np.abs(i_T_e) * (
                         para['Swi']['Elec']['con']['tr'] + para['Swi']['Elec']['con']['tf'])
-            Erec = 0.25 * para['Swi']['Elec']['con']['Qrr'] * np.max(np.abs(v_D)) * np.ones(np.size(i_T))
+            Erec = 0.25 * para['Swi']['Elec']['con']['Qrr'] * Vmax_D * np.ones(np.size(i_T_e))
 
     # ------------------------------------------
     # Tabular
@@ -111,64 +134,28 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     if setupPara['Elec']['SwiMdl'] == "tab":
         # IGBT
         if setupPara['Elec']['SwiType'] == "IGBT" or setupPara['PWM']['swloss'] == 0:
-            Eon_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                          para['Swi']['Elec']['vec']['If'].to_numpy(),
-                                          para['Swi']['Elec']['tab']['Eon'].to_numpy(), kind='linear')
-            Eoff_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                           para['Swi']['Elec']['vec']['If'].to_numpy(),
-                                           para['Swi']['Elec']['tab']['Eoff'].to_numpy(), kind='linear')
-            Erec_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                           para['Swi']['Elec']['vec']['Ifd'].to_numpy(),
-                                           para['Swi']['Elec']['tab']['Erec'].to_numpy(), kind='linear')
-
-            for i in range(0, len(i_T)):
-                Eon[i] = Eon_2d(t_Tj, i_T[i])
-                Eoff[i] = Eoff_2d(t_Tj, i_T[i])
-                Erec[i] = Erec_2d(t_Tj, i_D[i])
+            Eon = tabInter(para['Swi']['Elec']['mdl']['Eon'], Tj_e, i_T_e)
+            Eoff = tabInter(para['Swi']['Elec']['mdl']['Eoff'], Tj_e, i_T_e)
+            Erec = tabInter(para['Swi']['Elec']['mdl']['Erec'], Tj_e, i_D_e)
 
         # MOSFET
         if setupPara['Elec']['SwiType'] == "MOSFET" and setupPara['PWM']['swloss'] == 1:
-            Coss_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                           para['Swi']['Elec']['vec']['Vf'].to_numpy(),
-                                           para['Swi']['Elec']['tab']['Coss'].to_numpy(), kind='linear')
-            Crss_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(),
-                                           para['Swi']['Elec']['vec']['Vf'].to_numpy(),
-                                           para['Swi']['Elec']['tab']['Crss'].to_numpy(), kind='linear')
-
             IGon = (para['Swi']['Elec']['con']['Vg'] - para['Swi']['Elec']['con']['Vpl']) / para['Swi']['Elec']['con'][
                 'Rg']
             IGoff = para['Swi']['Elec']['con']['Vpl'] / para['Swi']['Elec']['con']['Rg']
 
-            for i in range(0, len(para['Swi']['Elec']['vec']['Tj'])):
-                for ii in range(0, len(V_int)):
-                    Coss_int[i, ii] = Coss_2d(para['Swi']['Elec']['vec']['Tj'][i], V_int[ii])
-                    Crss_int[i, ii] = Crss_2d(para['Swi']['Elec']['vec']['Tj'][i], V_int[ii])
-                Qoss = integrate.cumulative_trapezoid(Coss_int[i, :], x=V_int, initial=V_int[0])
-                Qrss = integrate.cumulative_trapezoid(Crss_int[i, :], x=V_int, initial=V_int[0])
-                Eoss_2d[i, :] = integrate.cumulative_trapezoid(Qoss, x=V_int, initial=V_int[0])
-                Erss_2d[i, :] = integrate.cumulative_trapezoid(Qrss, x=V_int, initial=V_int[0])
-
-            Eon_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(), V_int, np.transpose(Eoss_2d),
-                                          kind='linear')
-            Eoff_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(), V_int, np.transpose(Eoss_2d),
-                                           kind='linear')
-            Erec_2d = interpolate.interp2d(para['Swi']['Elec']['vec']['Tj'].to_numpy(), V_int, np.transpose(Erss_2d),
-                                           kind='linear')
-
-            for i in range(0, len(i_T)):
-                Eon[i] = Eon_2d(t_Tj, abs(v_T[i]))
-                Eoff[i] = Eoff_2d(t_Tj, abs(v_T[i]))
-                Erec[i] = Erec_2d(t_Tj, abs(v_D[i]))
-                tf1 = (np.max(np.abs(v_T)) - np.abs(v_T[i])) * (Crss_2d(t_Tj, np.abs(v_T[i])) / IGon)
-                tf2 = (np.max(np.abs(v_T)) - np.abs(v_T[i])) * (Crss_2d(t_Tj, np.max(np.abs(v_T))) / IGon)
-                tr1 = (np.max(np.abs(v_T)) - np.abs(v_T[i])) * (Crss_2d(t_Tj, np.abs(v_T[i])) / IGoff)
-                tr2 = (np.max(np.abs(v_T)) - np.abs(v_T[i])) * (Crss_2d(t_Tj, np.max(np.abs(v_T))) / IGoff)
-                tf[i] = (tf1 + tf2) / 2
-                tr[i] = (tr1 + tr2) / 2
-
-            Eon = Eon + 0.5 * np.abs(i_T) * np.max(abs(v_T)) * (tr + tf)
-            Eoff = Eoff + 0.5 * np.abs(i_T) * np.max(abs(v_T)) * (tr + tf)
-            Erec = Erec + 0.25 * para['Swi']['Elec']['con']['Qrr'] * np.max(np.abs(v_D))
+            Eon = tabInter(para['Swi']['Elec']['mdl']['Eoss'], Tj_e, np.abs(v_T_e))
+            Eoff = tabInter(para['Swi']['Elec']['mdl']['Eoss'], Tj_e, np.abs(v_T_e))
+            Erec = tabInter(para['Swi']['Elec']['mdl']['Erss'], Tj_e, np.abs(v_D_e))
+
+            Crss = tabInter(para['Swi']['Elec']['mdl']['Crss'], Tj_e, np.abs(v_T_e))
+            Crss_max = tabInter(para['Swi']['Elec']['mdl']['Crss'], Tj_e, Vmax_T)
+            tf = ((Vmax_T - np.abs(v_T_e)) * (Crss / IGon) + (Vmax_T - np.abs(v_T_e)) * (Crss_max / IGon)) / 2
+            tr = ((Vmax_T - np.abs(v_T_e)) * (Crss / IGoff) + (Vmax_T - np.abs(v_T_e)) * (Crss_max / IGoff)) / 2
+
+            Eon = Eon + 0.5 * np.abs(i_T_e) * Vmax_T * (tr + tf)
+            Eoff = Eoff + 0.5 * np.abs(i_T_e) * Vmax_T * (tr + tf)
+            Erec = Erec + 0.25 * para['Swi']['Elec']['con']['Qrr'] * Vmax_D
 
     ###################################################################################################################
     # Calculation
@@ -184,7 +171,7 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     # ------------------------------------------
     # Switching
     # ------------------------------------------
-    out['p_T_s'] = (zoh_easy(Eon, np.diff(i_G, prepend=0)) + np.roll(zoh_easy(Eoff, np.diff(i_G, append=0) * (-1)), 1)) * fs
+    out['p_T_s'] = (zohEdge(Eon, c_on, idx) + np.roll(zohEdge(Eoff, c_off, idx), 1, axis=-1)) * fs
 
     # ==============================================================================
     # Diode
@@ -197,7 +184,7 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     # ------------------------------------------
     # Switching
     # ------------------------------------------
-    out['p_D_s'] = zoh_easy(Erec, np.diff(i_G, append=0) * (-1)) * fs
+    out['p_D_s'] = zohEdge(Erec, c_off, idx) * fs
 
     # ==============================================================================
     # Total
@@ -218,3 +205,114 @@ def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
     # Return
     ###################################################################################################################
     return out
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcMemBri(Vdc, Is, i_G, Tj, pos, mem, para, setupPara, setupExp):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    Tq = setupExp['Tq']
+
+    # ==============================================================================
+    # Exact
+    # ==============================================================================
+    # Without quantisation step the switches are evaluated at their own temperature
+    if Tq <= 0:
+        elec = calcElecBri(Vdc, Is, (i_G == 1), Tj, pos, para, setupPara)
+        loss = calcLossBri(i_G, elec['i_T'], elec['i_D'], elec['v_T'], elec['v_D'], Tj, para, setupPara, setupExp)
+        return [elec, loss]
+
+    # ==============================================================================
+    # Bridge
+    # ==============================================================================
+    # Rows are the switches of the bridge (switches x samples), Is is shared if one-dimensional
+    i_G = np.atleast_2d(i_G)
+    Is = np.broadcast_to(np.asarray(Is, dtype=float), np.shape(i_G))
+    Tj = np.ravel(np.asarray(Tj, dtype=float))
+    pos = list(np.ravel(pos))
+    Nsw = np.shape(i_G)[0]
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    out = [{}, {}]
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Keys
+    # ==============================================================================
+    # A switch is identified by its waveforms, its temperature is bracketed by two multiples of Tq
+    Vb = np.asarray(Vdc, dtype=float).tobytes()
+    # Keys are sha1 digests of the exact bytes, so two different switches cannot share an entry
+    fp = [hashlib.sha1(Vb + (str(pos[i]) + '|').encode() + Is[i].tobytes() + i_G[i].tobytes()).digest()
+          for i in range(0, Nsw)]
+    nlo = np.floor(Tj / Tq).astype(int)
+    w = Tj / Tq - nlo
+    keyLo = [(fp[i], nlo[i]) for i in range(0, Nsw)]
+    keyHi = [(fp[i], nlo[i] + 1) for i in range(0, Nsw)]
+
+    # ==============================================================================
+    # Lookup
+    # ==============================================================================
+    need = keyLo + [keyHi[i] for i in range(0, Nsw) if w[i] > 0]
+    val = {key: mem[key] for key in need if key in mem}
+    miss = [key for key in dict.fromkeys(need) if key not in val]
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Missing temperatures
+    # ==============================================================================
+    # All missing entries are evaluated in one batch at their bucket temperature
+    if len(miss) > 0:
+        row = {fp[i]: i for i in range(0, Nsw)}
+        idx = [row[key[0]] for key in miss]
+        Tm = np.array([key[1] for key in miss]) * Tq
+        elec = calcElecBri(Vdc, Is[idx], (i_G[idx] == 1), Tm, [pos[i] for i in idx], para, setupPara)
+        loss = calcLossBri(i_G[idx], elec['i_T'], elec['i_D'], elec['v_T'], elec['v_D'], Tm, para, setupPara, setupExp)
+
+        # ------------------------------------------
+        # Storing
+        # ------------------------------------------
+        Nmax = max(int(memMax / (np.shape(i_G)[-1] * (len(elec) + len(loss)))), 2 * Nsw)
+        for j in range(0, len(miss)):
+            val[miss[j]] = [{key: elec[key][j] for key in elec}, {key: loss[key][j] for key in loss}]
+            if len(mem) >= Nmax:
+                mem.pop(next(iter(mem)))
+            mem[miss[j]] = val[miss[j]]
+
+    # ==============================================================================
+    # Interpolation
+    # ==============================================================================
+    # Linear in Tj between the two bracketing temperatures, switches on a multiple of Tq use the lower one only
+    keyHi = [keyHi[i] if w[i] > 0 else keyLo[i] for i in range(0, Nsw)]
+    W = np.reshape(w, (-1, 1))
+    for k in range(0, 2):
+        for key in val[keyLo[0]][k]:
+            lo = np.array([val[keyLo[i]][k][key] for i in range(0, Nsw)])
+            hi = np.array([val[keyHi[i]][k][key] for i in range(0, Nsw)])
+            out[k][key] = lo + W * (hi - lo)
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return out
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcLossSwi(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp):
+    # Single switch of calcLossBri() returned as column store
+    out = calcLossBri(i_G, i_T, i_D, v_T, v_D, t_Tj, para, setupPara, setupExp)
+
+    return {key: out[key][0] for key in ['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L']}
@@ -9,8 +9,19 @@
 # External
 # ==============================================================================
 import numpy as np
+import hashlib
+import os
+from os.path import isfile, join as pjoin
+from concurrent.futures import ProcessPoolExecutor
 from scipy.optimize import minimize, LinearConstraint, NonlinearConstraint
 
+#######################################################################################################################
+# Table Settings
+#######################################################################################################################
+oppMi = np.linspace(0, 4 / np.pi, 65)                                                                                   # modulation index grid of the OPP tables
+oppK = 100                                                                                                              # highest harmonic order in the OPP cost function
+oppCache = {}                                                                                                           # loaded OPP tables per pulse number
+
 
 #######################################################################################################################
 # Function
@@ -27,34 +38,62 @@ def ampl_sym_opp(alpha_a, k):
     i_ak(ki): Frequency in relation to fundamental frequency
     '''
 
-    swi_alpha = [-2 if idx % 2 == 1 else 2 for idx,_ in enumerate(alpha_a)]
-    i_ak = [x for x in range(1,k+1,2) if x % 3 != 0] # Fundamental and relevant harmonic components only
-    u_ak = [0]*len(i_ak)
-
-    for idxk, ikk in enumerate(i_ak):
-        # Run over all relevant frequency components
-        ka = np.cos(ikk*alpha_a)
-        u_ak[idxk] = (np.dot(swi_alpha, ka)-1) / ikk
+    # Harmonics are evaluated as one matrix cos(k*alpha) instead of a loop over the frequency components
+    alpha_a = np.atleast_1d(np.asarray(alpha_a, dtype=float))
+    swi_alpha = np.where(np.arange(0, len(alpha_a)) % 2 == 1, -2.0, 2.0)
+    i_ak = np.array([x for x in range(1,k+1,2) if x % 3 != 0]) # Fundamental and relevant harmonic components only
+    u_ak = (np.cos(np.outer(i_ak, alpha_a)) @ swi_alpha - 1) / i_ak
 
     return u_ak, i_ak
 
+# Voltage amplitude gradient:
+def ampl_sym_opp_grad(alpha_a, k):
+    '''
+    Calculates the derivative of the voltage amplitudes of ampl_sym_opp() with respect to the switching angles.
+    Inputs:
+    alpha_a: switching angles as numpy array
+    k: highest Fourier-coefficient to be evaluated
+    Output:
+    du_ak(ki, i): Derivative of the voltage amplitude of frequency ki with respect to angle i
+    '''
+
+    alpha_a = np.atleast_1d(np.asarray(alpha_a, dtype=float))
+    swi_alpha = np.where(np.arange(0, len(alpha_a)) % 2 == 1, -2.0, 2.0)
+    i_ak = np.array([x for x in range(1,k+1,2) if x % 3 != 0])
+    du_ak = -np.sin(np.outer(i_ak, alpha_a)) * swi_alpha
+
+    return du_ak
+
 # Cost function:
-def costfuntion(alpha):
+def costfuntion(alpha, k_max=100):
 
-    u_kc, i_kc = ampl_sym_opp(alpha,100)
+    u_kc, i_kc = ampl_sym_opp(alpha,k_max)
     u_ak_sq = np.power(np.divide(u_kc[1:],i_kc[1:]), 2)
     wthd = np.sqrt(np.sum(u_ak_sq))
     cost = wthd
 
     return cost
 
+# Cost function gradient:
+def costfuntion_grad(alpha, k_max=100):
+
+    u_kc, i_kc = ampl_sym_opp(alpha,k_max)
+    du_kc = ampl_sym_opp_grad(alpha,k_max)
+    wthd = np.sqrt(np.sum(np.power(np.divide(u_kc[1:],i_kc[1:]), 2)))
+    if wthd == 0:
+        return np.zeros(np.size(alpha))
+    grad = (u_kc[1:] / i_kc[1:]**2) @ du_kc[1:] / wthd
+
+    return grad
 
-def Opp(k_max, p0, Mi):
+
+def Opp(k_max, p0, Mi, alpha0=None):
     '''
     Calculates the optimal switch- on and -off angles according to the following input parameters:
     k_max: Maximum order of harmonics, which are taken into account
     p0: Number of switching instances in one fundamental period
     Mi: Modulation index [0 ... 4/pi]
+    alpha0: Starting point of the optimisation (warm start), zeros if None
     '''
 
     ###################################################################################################################
@@ -64,10 +103,12 @@ def Opp(k_max, p0, Mi):
     bmin = 0                            # Minimum angle between switching instances (tbd.)
     lbmin = bmin                        # Minium angle (lower bound for optimisation)
     ubmax = (np.pi - bmin)/2            # Maximum angle (upper bound for optimisation)
-    alpha0 = [lbmin]*p_deg              # Starting point of alpha-values for optimisation
+    if alpha0 is None:
+        alpha0 = [lbmin]*p_deg          # Starting point of alpha-values for optimisation
     ub = [ubmax]*p_deg                  # Upper bound list
     lb = [lbmin]*p_deg                  # Lower bound list
     bounds = list(zip(lb, ub))          # Bounds as a list of tuples
+    options = {'ftol': 1e-9, 'maxiter': 500}  # Solver settings (cheap with analytic gradients)
 
     ###################################################################################################################
     # Pre-processing
@@ -85,15 +126,20 @@ def Opp(k_max, p0, Mi):
         u_fund, _ = ampl_sym_opp(x_eq, 1)
         return u_fund
 
+    def eq_jac(x_eq):
+
+        return ampl_sym_opp_grad(x_eq, 1)
+
     linear_constraint = LinearConstraint(aineq, lb=[-np.inf]*p_deg, ub=bineq)
-    nonlinear_constraint = NonlinearConstraint(eq_con, lb=Mi, ub=Mi)
+    nonlinear_constraint = NonlinearConstraint(eq_con, lb=Mi, ub=Mi, jac=eq_jac)
 
     ###################################################################################################################
     # Calculation
     ###################################################################################################################
 
-    opt_result = minimize(costfuntion, alpha0, method='SLSQP', bounds=bounds,
-                          constraints=[linear_constraint, nonlinear_constraint])
+    # Analytic gradients of the WTHD and the fundamental replace the finite differences of SLSQP
+    opt_result = minimize(costfuntion, alpha0, args=(k_max,), method='SLSQP', jac=costfuntion_grad, bounds=bounds,
+                          constraints=[linear_constraint, nonlinear_constraint], options=options)
 
 
     ###################################################################################################################
@@ -101,6 +147,153 @@ def Opp(k_max, p0, Mi):
     ###################################################################################################################
     return opt_result
 
+
+#######################################################################################################################
+# Pulse Number
+#######################################################################################################################
+def oppPulse(setupPara, setupTopo):
+    # Odd pulse number (switching instances per fundamental period) closest to fs/fel from above
+    return max(3, 2 * int(np.floor(setupPara['PWM']['fs'] / setupTopo['fel'] / 2)) + 1)
+
+
+#######################################################################################################################
+# Warm-started Mi sweep
+#######################################################################################################################
+def oppChain(k_max, p0, Mi):
+    # The Mi grid is solved in ascending order, each solve starts from the solution of the neighbouring Mi; if the
+    # warm-started solve fails the cold start of Opp() is used, but not carried on to the next Mi
+    p_deg = int((p0 - 1) / 2)
+    alpha0 = np.arange(1, p_deg + 1) * np.pi / 2 / (p_deg + 1)
+    alpha = np.zeros((len(Mi), p_deg))
+    ok = np.zeros(len(Mi), dtype=bool)
+    for i in range(0, len(Mi)):
+        res = Opp(k_max, p0, np.pi / 4 * Mi[i], alpha0)
+        if res.success:
+            alpha0 = np.sort(res.x)
+        else:
+            res = Opp(k_max, p0, np.pi / 4 * Mi[i])
+        alpha[i] = np.sort(res.x)
+        ok[i] = res.success
+
+    return [alpha, ok]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def oppTable(Mi, P, k_max, path=None):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    Mi = np.asarray(Mi, dtype=float)
+    P = [int(p) for p in P]
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    table = {}
+    key = hashlib.sha1(Mi.tobytes() + np.array(P).tobytes() + str(k_max).encode()).hexdigest()
+    name = None
+    if path is not None:
+        name = pjoin(path, 'OPP_' + key[0:16] + '.npz')
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Cached table
+    # ==============================================================================
+    if name is not None and isfile(name):
+        data = np.load(name)
+        sha = hashlib.sha1(key.encode())
+        for p in P:
+            sha.update(data['alpha_%d' % p].tobytes() + data['ok_%d' % p].tobytes())
+        if str(data['hash']) == sha.hexdigest():
+            for p in P:
+                table[p] = {'Mi': Mi, 'alpha': data['alpha_%d' % p], 'ok': data['ok_%d' % p]}
+                oppCache[p] = table[p]
+            print("INFO: OPP table loaded from " + name)
+            return table
+        print("WARN: OPP table " + name + " is corrupted and will be rebuilt")
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Solve grid
+    # ==============================================================================
+    # The Mi grid of each pulse number is split into contiguous segments, each segment is a warm-started chain and
+    # all segments of all pulse numbers are solved in parallel
+    print("INFO: Calculating OPP table for pulse numbers " + str(P))
+    Nseg = max(1, min(len(Mi), (os.cpu_count() or 1) // len(P)))
+    seg = np.array_split(np.arange(0, len(Mi)), Nseg)
+    seg = [s for s in seg if len(s) > 0]
+    job = [(p, s) for p in P for s in seg]
+    if len(job) == 1:
+        res = [oppChain(k_max, P[0], Mi)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(job), os.cpu_count() or 1)) as pool:
+            res = list(pool.map(oppChain, [k_max] * len(job), [j[0] for j in job], [Mi[j[1]] for j in job]))
+
+    # ==============================================================================
+    # Merge segments
+    # ==============================================================================
+    out = []
+    for i in range(0, len(P)):
+        part = res[i * len(seg):(i + 1) * len(seg)]
+        out.append([np.concatenate([r[0] for r in part], axis=0), np.concatenate([r[1] for r in part])])
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Table
+    # ==============================================================================
+    for i in range(0, len(P)):
+        table[P[i]] = {'Mi': Mi, 'alpha': out[i][0], 'ok': out[i][1]}
+        oppCache[P[i]] = table[P[i]]
+        if not np.all(out[i][1]):
+            print("WARN: OPP optimisation failed for p0=%d at Mi=%s" % (P[i], str(Mi[~out[i][1]])))
+
+    # ==============================================================================
+    # Save
+    # ==============================================================================
+    if name is not None:
+        os.makedirs(path, exist_ok=True)
+        sha = hashlib.sha1(key.encode())
+        data = {}
+        for p in P:
+            data['alpha_%d' % p] = table[p]['alpha']
+            data['ok_%d' % p] = table[p]['ok']
+            sha.update(data['alpha_%d' % p].tobytes() + data['ok_%d' % p].tobytes())
+        np.savez(name, Mi=Mi, P=np.array(P), k_max=k_max, hash=sha.hexdigest(), **data)
+        print("INFO: OPP table saved to " + name)
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return table
+
+
+#######################################################################################################################
+# Switching Angles
+#######################################################################################################################
+def oppAngles(Mi, p0):
+    # Angles are interpolated linearly between the successfully optimised grid points of the cached table
+    if p0 not in oppCache:
+        oppTable(oppMi, [p0], oppK)
+    table = oppCache[p0]
+    ok = table['ok']
+    alpha = np.zeros(np.shape(np.ravel(Mi)) + (np.size(table['alpha'], axis=1),))
+    for i in range(0, np.size(alpha, axis=1)):
+        alpha[:, i] = np.interp(np.ravel(Mi), table['Mi'][ok], table['alpha'][ok, i])
+
+    return alpha
+
+
 if __name__ == "__main__":
 
     u_k, i_k = ampl_sym_opp(np.array([np.pi/3]), 50)
@@ -108,3 +301,6 @@ if __name__ == "__main__":
 
     result = Opp(100, 5, 0.5)
     print(result.message)
+
+    # OPP table for a grid of pulse numbers
+    oppTable(oppMi, [5, 7, 11, 13], oppK)
@@ -20,51 +20,46 @@
 # ==============================================================================
 # External
 # ==============================================================================
-import pandas as pd
+
+
+#######################################################################################################################
+# Write Block
+#######################################################################################################################
+def app_blk(data, elec, loss, start):
+    # ==============================================================================
+    # Electrical
+    # ==============================================================================
+    for c1 in data['elec']:
+        for c2 in data['elec'][c1]:
+            for c3 in data['elec'][c1][c2]:
+                data['elec'][c1][c2][c3][start:start + len(elec[c1][c2][c3])] = elec[c1][c2][c3]
+
+    # ==============================================================================
+    # Losses
+    # ==============================================================================
+    for c1 in data['loss']:
+        for c2 in data['loss'][c1]:
+            for c3 in data['loss'][c1][c2]:
+                data['loss'][c1][c2][c3][start:start + len(loss[c1][c2][c3])] = loss[c1][c2][c3]
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return data
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def app_fs(data, elec, loss, setupExp):
+def app_fs(data, elec, loss, start):
     ###################################################################################################################
     # Calculation
     ###################################################################################################################
     # ==============================================================================
     # Switching Period
     # ==============================================================================
-    if setupExp['freqPar'] == 'fs':
-        # ------------------------------------------
-        # Electrical
-        # ------------------------------------------
-        for c1 in data['elec']:
-            for c2 in data['elec'][c1]:      
-                data['elec'][c1][c2] = pd.concat([data['elec'][c1][c2], elec[c1][c2]])
-
-        # ------------------------------------------
-        # Losses
-        # ------------------------------------------
-        for c1 in data['loss']:
-            for c2 in data['loss'][c1]:      
-                data['loss'][c1][c2] = pd.concat([data['loss'][c1][c2], loss[c1][c2]])
-
-    # ==============================================================================
-    # Electrical Period
-    # ==============================================================================
-    else:
-        # ------------------------------------------
-        # Electrical
-        # ------------------------------------------
-        for c1 in data['elec']:
-            for c2 in data['elec'][c1]:      
-                data['elec'][c1][c2] = elec[c1][c2]
-
-        # ------------------------------------------
-        # Losses
-        # ------------------------------------------
-        for c1 in data['loss']:
-            for c2 in data['loss'][c1]:      
-                data['loss'][c1][c2] = loss[c1][c2]
+    # The electrical period is preallocated, each switching period is written at its first sample
+    data = app_blk(data, elec, loss, start)
 
     ###################################################################################################################
     # Return
@@ -75,48 +70,30 @@ def app_fs(data, elec, loss, setupExp):
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def app_fel(data, elec, loss, Nel, setupExp):
+def app_fel(data, elec, loss, k, Nel, setupExp):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    N = len(elec['cap']['C1']['i_c'])
+
     ###################################################################################################################
     # Calculation
     ###################################################################################################################
     # ==============================================================================
-    # Switching Period
+    # Open Loop
     # ==============================================================================
+    # The single electrical period is repeated for all periods
     if setupExp['loop'] == 'OL':
         for j in range(0, Nel):
-            # ------------------------------------------
-            # Electrical
-            # ------------------------------------------
-            for c1 in data['elec']:
-                for c2 in data['elec'][c1]:      
-                    data['elec'][c1][c2] = pd.concat([data['elec'][c1][c2], elec[c1][c2]])
-
-            # ------------------------------------------
-            # Losses
-            # ------------------------------------------
-            for c1 in data['loss']:
-                for c2 in data['loss'][c1]:      
-                    data['loss'][c1][c2] = pd.concat([data['loss'][c1][c2], loss[c1][c2]])
+            data = app_blk(data, elec, loss, j * N)
 
     # ==============================================================================
-    # Electrical Period
+    # Closed Loop
     # ==============================================================================
     else:
-        # ------------------------------------------
-        # Electrical
-        # ------------------------------------------
-        for c1 in data['elec']:
-            for c2 in data['elec'][c1]:      
-                data['elec'][c1][c2] = pd.concat([data['elec'][c1][c2], elec[c1][c2]])
-
-        # ------------------------------------------
-        # Losses
-        # ------------------------------------------
-        for c1 in data['loss']:
-            for c2 in data['loss'][c1]:      
-                data['loss'][c1][c2] = pd.concat([data['loss'][c1][c2], loss[c1][c2]])
+        data = app_blk(data, elec, loss, k * N)
 
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return data
\ No newline at end of file
+    return data
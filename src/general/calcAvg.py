@@ -16,14 +16,45 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
-import pandas as pd
+from src.topo.B2.initB2 import initB2_Data
+from src.topo.B4.initB4 import initB4_Data
+from src.topo.B6.initB6 import initB6_Data
 
 # ==============================================================================
 # External
 # ==============================================================================
-from src.topo.B2.initB2 import initB2_Data
-from src.topo.B4.initB4 import initB4_Data
-from src.topo.B6.initB6 import initB6_Data
+import numpy as np
+
+
+#######################################################################################################################
+# Moving Average
+#######################################################################################################################
+def movAvg(x, Nsim, W):
+    # ==============================================================================
+    # Extension
+    # ==============================================================================
+    # The signal is extended by one period on both sides, the result has one sample more than x
+    y = np.concatenate((x[0:Nsim+1], x, x[-1-Nsim:-1]))
+    N = len(y)
+
+    # ==============================================================================
+    # Window
+    # ==============================================================================
+    # Centred window over W + 1 samples (closed on both sides), incomplete windows are undefined
+    off = int((W - 1) // 2)
+    ende = np.arange(1 + off, N + 1 + off)
+    start = np.clip(ende - W - 1, 0, N)
+    ende = np.clip(ende, 0, N)
+    cnt = ende - start
+
+    # ==============================================================================
+    # Mean
+    # ==============================================================================
+    cs = np.concatenate(([0.0], np.cumsum(y)))
+    avg = (cs[ende] - cs[start]) / np.maximum(cnt, 1)
+    avg[cnt < W] = np.nan
+
+    return avg[Nsim:-Nsim]
 
 
 #######################################################################################################################
@@ -42,40 +73,33 @@ def calcAvg(data, setupExp, setupTopo, Nsim, Npwm):
     else:
         out = initB6_Data()
 
-    ###################################################################################################################
-    # Calculation
-    ###################################################################################################################
     # ==============================================================================
-    # Electrical
+    # Window
     # ==============================================================================
     if setupExp['freqAvg'] == 'fel':
+        W = Nsim
+    else:
+        W = int(Nsim/Npwm)
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    if setupExp['freqAvg'] == 'fel' or setupExp['freqAvg'] == 'fs':
+        # ==============================================================================
+        # Electrical
+        # ==============================================================================
         for c1 in data['elec']:
             for c2 in data['elec'][c1]:
                 for c3 in data['elec'][c1][c2]:
-                    temp = pd.concat([data['elec'][c1][c2][c3][0:Nsim+1], data['elec'][c1][c2][c3], data['elec'][c1][c2][c3][-1-Nsim:-1]]).rolling(window=Nsim, center=True, closed='both', min_periods=None).mean()
-                    out['elec'][c1][c2][c3] = temp[Nsim:-Nsim]
-    elif setupExp['freqAvg'] == 'fs':
-        for c1 in data['elec']:
-            for c2 in data['elec'][c1]:
-                for c3 in data['elec'][c1][c2]:
-                    temp = pd.concat([data['elec'][c1][c2][c3][0:Nsim+1], data['elec'][c1][c2][c3], data['elec'][c1][c2][c3][-1-Nsim:-1]]).rolling(window=int(Nsim/Npwm), center=True, closed='both', min_periods=None).mean()
-                    out['elec'][c1][c2][c3] = temp[Nsim:-Nsim]
+                    out['elec'][c1][c2][c3] = movAvg(np.asarray(data['elec'][c1][c2][c3], dtype=float), Nsim, W)
 
-    # ==============================================================================
-    # Losses
-    # ==============================================================================
-    if setupExp['freqAvg'] == 'fel':
-        for c1 in data['loss']:
-            for c2 in data['loss'][c1]:
-                for c3 in data['loss'][c1][c2]:
-                    temp = pd.concat([data['loss'][c1][c2][c3][0:Nsim+1], data['loss'][c1][c2][c3], data['loss'][c1][c2][c3][-1-Nsim:-1]]).rolling(window=Nsim, center=True, closed='both', min_periods=None).mean()
-                    out['loss'][c1][c2][c3] = temp[Nsim:-Nsim]
-    elif setupExp['freqAvg'] == 'fs':
+        # ==============================================================================
+        # Losses
+        # ==============================================================================
         for c1 in data['loss']:
             for c2 in data['loss'][c1]:
                 for c3 in data['loss'][c1][c2]:
-                    temp = pd.concat([data['loss'][c1][c2][c3][0:Nsim+1], data['loss'][c1][c2][c3], data['loss'][c1][c2][c3][-1-Nsim:-1]]).rolling(window=int(Nsim/Npwm), center=True, closed='both', min_periods=None).mean()
-                    out['loss'][c1][c2][c3] = temp[Nsim:-Nsim]
+                    out['loss'][c1][c2][c3] = movAvg(np.asarray(data['loss'][c1][c2][c3], dtype=float), Nsim, W)
 
     ###################################################################################################################
     # Post
@@ -27,7 +27,7 @@ from scipy.fft import fft
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcDistNum(t, i_a, v_a, i_dc, v_dc, Vdc, fel):
+def calcDistNum(t, i_a, v_a, i_dc, v_dc, Vdc, fel, spec=None):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
@@ -37,7 +37,7 @@ def calcDistNum(t, i_a, v_a, i_dc, v_dc, Vdc, fel):
     Tel = 1 / fel
     dt = t[1] - t[0]
     K = int(np.round((t[-1] - t[0]) / Tel))
-    N = int(len(v_a))
+    N = int(np.shape(v_a)[-1])
 
     # ==============================================================================
     # Variables
@@ -45,27 +45,45 @@ def calcDistNum(t, i_a, v_a, i_dc, v_dc, Vdc, fel):
     distAc = {}
     distDc = {}
 
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Spectra
+    # ==============================================================================
+    # Spectra of the frequency domain solver cover whole periods, the window is reduced by the endpoint
+    if not spec:
+        spec = {}
+    else:
+        N = N - 1
+        [i_a, v_a, i_dc, v_dc] = [x[..., 0:N] for x in [i_a, v_a, i_dc, v_dc]]
+    I_a = spec['i_a'] if 'i_a' in spec else fft(i_a)
+    I_dc = spec['i_dc'] if 'i_dc' in spec else fft(i_dc)
+    V_dc = spec['v_dc'] if 'v_dc' in spec else fft(v_dc)
+    V_dc_0 = spec['v_dc'][..., 0] - Vdc * N if 'v_dc' in spec else fft(v_dc - Vdc)[..., 0]
+
     ###################################################################################################################
     # Calculation
     ###################################################################################################################
     # ==============================================================================
     # AC-Side
     # ==============================================================================
-    V_a_eff = np.sqrt(1 / Tel / K * np.sum(v_a ** 2 * dt))
-    V_a_v1_eff = (1 / np.sqrt(2)) * 2 * np.abs(fft(v_a) / N)[K]
+    V_a_eff = np.sqrt(1 / Tel / K * np.sum(v_a ** 2 * dt, axis=-1))
+    V_a_v1_eff = (1 / np.sqrt(2)) * 2 * np.abs(fft(v_a) / N)[..., K]
     V_a_thd = np.sqrt(V_a_eff ** 2 - V_a_v1_eff ** 2) / V_a_eff * Vdc / 2
-    I_a_eff = np.sqrt(1 / Tel / K * np.sum(i_a ** 2 * dt))
-    I_a_v1_eff = (1 / np.sqrt(2)) * 2 * np.abs(fft(i_a) / N)[K]
+    I_a_eff = np.sqrt(1 / Tel / K * np.sum(i_a ** 2 * dt, axis=-1))
+    I_a_v1_eff = (1 / np.sqrt(2)) * 2 * np.abs(I_a / N)[..., K]
     I_a_thd = np.sqrt(I_a_eff ** 2 - I_a_v1_eff ** 2)
 
     # ==============================================================================
     # DC-Side
     # ==============================================================================
-    V_dc_eff = np.sqrt(1 / Tel / K * np.sum(v_dc ** 2 * dt))
-    V_dc_v1_eff = np.abs(fft(v_dc) / N)[0]
-    V_dc_thd = np.sqrt((np.sqrt(1 / Tel / K * np.sum((v_dc-Vdc) ** 2 * dt))) ** 2 - (np.abs(fft(v_dc-Vdc) / N)[0]) ** 2)
-    I_dc_eff = np.sqrt(1 / Tel / K * np.sum(i_dc ** 2 * dt))
-    I_dc_v1_eff = np.abs(fft(i_dc) / N)[0]
+    V_dc_eff = np.sqrt(1 / Tel / K * np.sum(v_dc ** 2 * dt, axis=-1))
+    V_dc_v1_eff = np.abs(V_dc / N)[..., 0]
+    V_dc_thd = np.sqrt((np.sqrt(1 / Tel / K * np.sum((v_dc-Vdc) ** 2 * dt, axis=-1))) ** 2 -
+                       (np.abs(V_dc_0 / N)) ** 2)
+    I_dc_eff = np.sqrt(1 / Tel / K * np.sum(i_dc ** 2 * dt, axis=-1))
+    I_dc_v1_eff = np.abs(I_dc / N)[..., 0]
     I_dc_thd = np.sqrt(I_dc_eff ** 2 - I_dc_v1_eff ** 2)
 
     ###################################################################################################################
@@ -27,7 +27,7 @@ from scipy.fft import fft
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcFreq(s, xs, timeAc, timeDc):
+def calcFreq(s, xs, timeAc, timeDc, spec=None):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
@@ -38,6 +38,14 @@ def calcFreq(s, xs, timeAc, timeDc):
     # General
     # ------------------------------------------
     N = int(len(s))
+    P = N - 1
+
+    # ------------------------------------------
+    # Spectra
+    # ------------------------------------------
+    # Spectra of the frequency domain solver (whole periods without the endpoint) are reused if available
+    if not spec:
+        spec = {}
 
     # ==============================================================================
     # Variables
@@ -69,7 +77,10 @@ def calcFreq(s, xs, timeAc, timeDc):
     # Phase
     # ------------------------------------------
     # Current
-    Y = np.abs(fft(timeAc['i_a']) / N)[0:int(N / 2)]
+    if 'i_a' in spec:
+        Y = np.abs(spec['i_a'] / P)[0:int(N / 2)]
+    else:
+        Y = np.abs(fft(timeAc['i_a']) / N)[0:int(N / 2)]
     Y[1:-2] = 2 * Y[1:-2]
     freqAc['I_a'] = Y
 
@@ -88,12 +99,18 @@ def calcFreq(s, xs, timeAc, timeDc):
     # DC-Link
     # ------------------------------------------
     # Current
-    Y = np.abs(fft(timeDc['i_dc']) / N)[0:int(N / 2)]
+    if 'i_dc' in spec:
+        Y = np.abs(spec['i_dc'] / P)[0:int(N / 2)]
+    else:
+        Y = np.abs(fft(timeDc['i_dc']) / N)[0:int(N / 2)]
     Y[1:-2] = 2 * Y[1:-2]
     freqDc['I_dc'] = Y
 
     # Voltage
-    Y = np.abs(fft(timeDc['v_dc']) / N)[0:int(N / 2)]
+    if 'v_dc' in spec:
+        Y = np.abs(spec['v_dc'] / P)[0:int(N / 2)]
+    else:
+        Y = np.abs(fft(timeDc['v_dc']) / N)[0:int(N / 2)]
     Y[1:-2] = 2 * Y[1:-2]
     freqDc['V_dc'] = Y
 
@@ -0,0 +1,141 @@
+#######################################################################################################################
+#######################################################################################################################
+# Title:        PWM Distortion Toolkit for Standard Topologies
+# Topic:        Power Electronics
+# File:         genPattern
+# Date:         14.08.2023
+# Author:       Dr. Pascal A. Schirmer
+# Version:      V.0.2
+# Copyright:    Pascal Schirmer
+#######################################################################################################################
+#######################################################################################################################
+
+#######################################################################################################################
+# Import libs
+#######################################################################################################################
+# ==============================================================================
+# Internal
+# ==============================================================================
+from src.general.genSwEvent import evtClean
+
+# ==============================================================================
+# External
+# ==============================================================================
+import numpy as np
+
+#######################################################################################################################
+# Pattern Cache
+#######################################################################################################################
+patCache = {}
+patCacheMax = 64
+
+#######################################################################################################################
+# Batch Size
+#######################################################################################################################
+# Maximum number of samples (modulation indices times time samples) per batch of switching functions
+batMax = int(2e6)
+
+
+#######################################################################################################################
+# Tile Pattern
+#######################################################################################################################
+def patTile(p, N, K, Tel):
+    # ==============================================================================
+    # Switching events
+    # ==============================================================================
+    if isinstance(p, dict) and set(p.keys()) == {'t', 's'}:
+        idx = p['t'] < p['t'][0] + Tel * (1 - 1e-12)
+        te = (p['t'][idx] + Tel * np.arange(0, K).reshape(-1, 1)).ravel()
+        se = np.tile(p['s'][idx], K)
+        te = np.append(te, p['t'][~idx] + Tel * (K - 1))
+        se = np.append(se, p['s'][~idx])
+        return evtClean(te, se)
+
+    # ==============================================================================
+    # Containers
+    # ==============================================================================
+    if isinstance(p, dict):
+        return {key: patTile(p[key], N, K, Tel) for key in p}
+    if isinstance(p, list):
+        return [patTile(temp, N, K, Tel) for temp in p]
+
+    # ==============================================================================
+    # Sampled signals
+    # ==============================================================================
+    # Rows of 2D signals belong to a batch of modulation indices
+    if isinstance(p, np.ndarray) and p.ndim >= 1 and np.shape(p)[-1] == N + 1:
+        return np.concatenate((np.tile(p[..., 0:N], K), p[..., N:]), axis=-1)
+
+    return p
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def genPattern(fnc, ref, t, Mi, setupPara, setupTopo):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    fel = setupTopo['fel']
+    fs = setupPara['PWM']['fs']
+    Tel = 1 / fel
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    K = int(np.round((t[-1] - t[0]) * fel))
+    N = int((len(t) - 1) / max(K, 1))
+    if isinstance(ref, dict):
+        refs = ref
+    else:
+        refs = {'A': ref}
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Synchronous modulation
+    # ==============================================================================
+    # The pattern is only valid if fs and fsim are integer multiples of fel and the reference is periodic
+    sync = K >= 2 and N * K == len(t) - 1 and abs((t[-1] - t[0]) * fel - K) < 1e-9
+    sync = sync and abs(fs / fel - np.round(fs / fel)) < 1e-9
+    if sync:
+        for key in refs:
+            sync = sync and np.allclose(refs[key][0:N], refs[key][N:2 * N], rtol=1e-9,
+                                        atol=1e-9 * np.max(np.abs(refs[key])))
+    if not sync:
+        return fnc(ref, t, Mi, setupPara, setupTopo)
+
+    # ==============================================================================
+    # Key
+    # ==============================================================================
+    key = (fnc.__module__, fnc.__name__, repr(sorted(setupPara['PWM'].items())), tuple(np.ravel(Mi)), fel, N, t[0], t[N],
+           tuple((k, hash(refs[k][0:N + 1].tobytes())) for k in sorted(refs.keys())))
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Fundamental period
+    # ==============================================================================
+    if key not in patCache:
+        if isinstance(ref, dict):
+            ref1 = {k: ref[k][0:N + 1] for k in ref}
+        else:
+            ref1 = ref[0:N + 1]
+        if len(patCache) >= patCacheMax:
+            patCache.pop(next(iter(patCache)))
+        patCache[key] = fnc(ref1, t[0:N + 1], Mi, setupPara, setupTopo)
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    out = [patTile(p, N, K, Tel) for p in patCache[key]]
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return out
@@ -0,0 +1,355 @@
+#######################################################################################################################
+#######################################################################################################################
+# Title:        PWM Distortion Toolkit for Standard Topologies
+# Topic:        Power Electronics
+# File:         genSwEvent
+# Date:         14.08.2023
+# Author:       Dr. Pascal A. Schirmer
+# Version:      V.0.2
+# Copyright:    Pascal Schirmer
+#######################################################################################################################
+#######################################################################################################################
+
+#######################################################################################################################
+# Import libs
+#######################################################################################################################
+# ==============================================================================
+# Internal
+# ==============================================================================
+
+# ==============================================================================
+# External
+# ==============================================================================
+import numpy as np
+
+
+#######################################################################################################################
+# Clean Events
+#######################################################################################################################
+def evtClean(te, se):
+    # Events at identical times keep the last state, repeated states are removed
+    keep = np.append(te[1:] > te[:-1], True)
+    te = te[keep]
+    se = se[keep]
+    keep = np.insert(se[1:] != se[:-1], 0, True)
+
+    return {'t': te[keep], 's': se[keep]}
+
+
+#######################################################################################################################
+# Events to Switching Function
+#######################################################################################################################
+def evt2dense(evt, t):
+    # A list of events (batch) is returned as one row per entry
+    if isinstance(evt, list):
+        return np.array([evt2dense(e, t) for e in evt])
+
+    # Events are assigned to a sample within a small fraction of the sample time (rounding of tiled events)
+    tol = 1e-9 * (t[-1] - t[0]) / max(len(t) - 1, 1)
+    idx = np.searchsorted(evt['t'], t + tol, side='right') - 1
+    s = evt['s'][np.maximum(idx, 0)].astype(float)
+
+    return s
+
+
+#######################################################################################################################
+# Switching Function to Events
+#######################################################################################################################
+def dense2evt(s, t):
+    if np.ndim(s) > 1:
+        return [dense2evt(row, t) for row in s]
+
+    idx = np.insert(np.nonzero(np.diff(s))[0] + 1, 0, 0)
+
+    return {'t': np.array(t[idx], dtype=float), 's': np.array(s[idx], dtype=float)}
+
+
+#######################################################################################################################
+# Dead-time
+#######################################################################################################################
+def evtDeadTime(evt, td):
+    if isinstance(evt, list):
+        return [evtDeadTime(e, td) for e in evt]
+
+    # Every edge into a conducting state starts with td of blanking, pulses shorter than td stay blanked
+    te = evt['t']
+    se = evt['s']
+    edge = (np.arange(0, len(te)) >= 1) & (se != 0)
+    tOn = te + td
+    keep = edge & (tOn < np.append(te[1:], np.inf))
+    tOut = np.concatenate((te, tOn[keep]))
+    sOut = np.concatenate((np.where(edge, 0, se), se[keep]))
+    idx = np.argsort(tOut, kind='stable')
+
+    return evtClean(tOut[idx], sOut[idx])
+
+
+#######################################################################################################################
+# Minimum Pulse Width
+#######################################################################################################################
+def evtMinPulse(evt, tmin):
+    if isinstance(evt, list):
+        return [evtMinPulse(e, tmin) for e in evt]
+
+    # States shorter than tmin are absorbed by the preceding state
+    te = evt['t']
+    se = evt['s']
+    dur = np.append(np.diff(te), np.inf)
+    keep = (dur >= tmin)
+    keep[0] = True
+
+    return evtClean(te[keep], se[keep])
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def genEvt_CB(x, t, Mi, car, setupPara):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    fs = setupPara['PWM']['fs']
+    Ts = 1 / fs
+    [w, d, g] = car
+
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # Every row of x belongs to one modulation index
+    if np.ndim(x) > 1:
+        return [genEvt_CB(x[i], t, np.ravel(Mi)[i], car, setupPara) for i in range(0, len(x))]
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    t0 = t[0]
+    t1 = t[-1]
+    tu = np.array([t0])
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Zero modulation
+    # ==============================================================================
+    if Mi == 0:
+        return {'t': np.array([t0]), 's': np.array([0.0])}
+
+    # ==============================================================================
+    # Carrier breakpoints
+    # ==============================================================================
+    n = np.arange(np.floor(fs * t0 - d) - 1, np.ceil(fs * t1 - d) + 2)
+    tc = ((n.reshape(-1, 1) + d + np.array([0, w])) / fs).ravel()
+
+    # ==============================================================================
+    # Update instants
+    # ==============================================================================
+    if setupPara['PWM']['samp'] == "RS":
+        if setupPara['PWM']['upd'] == "SE":
+            Tu = Ts
+        else:
+            Tu = Ts / 2
+        tu = np.unique(np.append(tu, np.arange(np.ceil(t0 / Tu), np.floor(t1 / Tu) + 1) * Tu))
+
+    # ==============================================================================
+    # Segments
+    # ==============================================================================
+    # Between two boundaries the carrier is linear and the sampled reference constant
+    tb = np.unique(np.concatenate(([t0, t1], tc, tu)))
+    tb = tb[(tb >= t0) & (tb <= t1)]
+    tb = tb[np.append(True, np.diff(tb) > 1e-9 * Ts)]
+    ta = tb[:-1]
+    tb = tb[1:]
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Carrier
+    # ==============================================================================
+    ph = fs * (ta + tb) / 2 - d
+    nc = np.floor(ph)
+    up = (ph - nc) < w
+    ca = np.where(up, g * (-1 + 2 * (fs * ta - d - nc) / max(w, 1e-12)),
+                  g * (1 - 2 * (fs * ta - d - nc - w) / max(1 - w, 1e-12)))
+    cb = np.where(up, g * (-1 + 2 * (fs * tb - d - nc) / max(w, 1e-12)),
+                  g * (1 - 2 * (fs * tb - d - nc - w) / max(1 - w, 1e-12)))
+
+    # ==============================================================================
+    # Reference
+    # ==============================================================================
+    if setupPara['PWM']['samp'] == "RS":
+        xu = np.interp(tu, t, x)
+        xv = xu[np.searchsorted(tu, (ta + tb) / 2, side='right') - 1]
+        fa = xv - ca
+        fb = xv - cb
+    else:
+        fa = np.interp(ta, t, x) - ca
+        fb = np.interp(tb, t, x) - cb
+
+    # ==============================================================================
+    # Intersections
+    # ==============================================================================
+    sa = np.where(fa > 0, 1.0, -1.0)
+    sb = np.where(fb > 0, 1.0, -1.0)
+    cr = np.nonzero(sa != sb)[0]
+
+    # ------------------------------------------
+    # Regular sampling (linear)
+    # ------------------------------------------
+    if setupPara['PWM']['samp'] == "RS":
+        tx = ta[cr] + fa[cr] / (fa[cr] - fb[cr]) * (tb[cr] - ta[cr])
+
+    # ------------------------------------------
+    # Natural sampling (bisection)
+    # ------------------------------------------
+    else:
+        lo = ta[cr]
+        hi = tb[cr]
+        for _ in range(0, 48):
+            mid = (lo + hi) / 2
+            fm = np.interp(mid, t, x) - (ca[cr] + (cb[cr] - ca[cr]) * (mid - ta[cr]) / (tb[cr] - ta[cr]))
+            low = (fm > 0) == (fa[cr] > 0)
+            lo = np.where(low, mid, lo)
+            hi = np.where(low, hi, mid)
+        tx = hi
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    te = np.vstack((ta, np.full(np.size(ta), np.nan)))
+    se = np.vstack((sa, sb))
+    te[1, cr] = tx
+    te = te.ravel(order='F')
+    se = se.ravel(order='F')
+    keep = ~np.isnan(te)
+
+    # ==============================================================================
+    # Numerical slivers
+    # ==============================================================================
+    # Tangential intersections and references on the carrier peaks produce pulses of rounding width
+    evt = evtMinPulse(evtClean(te[keep], se[keep]), 1e-9 * Ts)
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return evt
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def genEvt_SV(st, rr, seq, mS, Mi, t, setupPara):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    Ts = 1 / setupPara['PWM']['fs']
+    Np = np.size(st, axis=-2)
+
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # Every row of st and rr belongs to one modulation index
+    if np.ndim(st) > 2:
+        out = [genEvt_SV(st[i], rr[i], seq, mS, np.ravel(Mi)[i], t, setupPara) for i in range(0, len(st))]
+        return {leg: [temp[leg] for temp in out] for leg in mS}
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    evt = {}
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Switching times
+    # ==============================================================================
+    # Each state starts at the end of the previous one, st is normalised to Ts/2
+    st = np.maximum.accumulate(np.hstack((np.zeros((Np, 1)), st[:, :-1])), axis=1)
+    te = (t[0] + np.arange(0, Np).reshape(-1, 1) * Ts + st * Ts / 2).ravel()
+    sv = np.array(seq)[rr[0:Np] - 1].ravel()
+    keep = te <= t[-1]
+
+    # ==============================================================================
+    # Legs
+    # ==============================================================================
+    for leg in mS:
+        if Mi != 0:
+            evt[leg] = evtClean(te[keep], np.array(mS[leg], dtype=float)[sv[keep]])
+        else:
+            evt[leg] = {'t': np.array([t[0]]), 's': np.array([0.0])}
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return evt
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def genEvt_OPP(alpha, phi, t, fel):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # Every row of alpha belongs to one modulation index
+    if np.ndim(alpha) > 1:
+        return [genEvt_OPP(alpha[i], phi, t, fel) for i in range(0, len(alpha))]
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    alpha = np.sort(alpha)
+    t0 = t[0]
+    t1 = t[-1]
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Quarter-wave symmetric pattern
+    # ==============================================================================
+    # The pattern starts negative at 0 and toggles at every angle of the quarter period
+    def sQuarter(theta):
+        th = np.mod(theta, 2 * np.pi)
+        half = th >= np.pi
+        th = np.mod(th, np.pi)
+        th = np.minimum(th, np.pi - th)
+        sq = np.where(np.searchsorted(alpha, th, side='right') % 2 == 0, -1.0, 1.0)
+        return np.where(half, -sq, sq)
+
+    # ==============================================================================
+    # Edges of one period
+    # ==============================================================================
+    th = np.sort(np.concatenate(([0, np.pi], alpha, np.pi - alpha, np.pi + alpha, 2 * np.pi - alpha)))
+    sth = sQuarter((th + np.append(th[1:], 2 * np.pi)) / 2)
+
+    # ==============================================================================
+    # Edge times
+    # ==============================================================================
+    k = np.arange(np.floor(fel * t0 + phi / (2 * np.pi)) - 1, np.ceil(fel * t1 + phi / (2 * np.pi)) + 1)
+    te = ((th + 2 * np.pi * k.reshape(-1, 1) - phi) / (2 * np.pi * fel)).ravel()
+    se = np.tile(sth, len(k))
+    keep = (te > t0) & (te <= t1)
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    te = np.concatenate(([t0], te[keep]))
+    se = np.concatenate((sQuarter([2 * np.pi * fel * t0 + phi]), se[keep]))
+    evt = evtClean(te, se)
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return evt
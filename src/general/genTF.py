@@ -98,6 +98,13 @@ def genTF(para, setupTopo):
     print("INFO: Load")
     out['TF']['Load'] = signal.TransferFunction([1], [L, R])
 
+    # ==============================================================================
+    # Output Filter and Load
+    # ==============================================================================
+    # Load current driven by the inverter voltage (series connection of output filter and load)
+    print("INFO: Output filter and load")
+    out['TF']['OutLoad'] = signal.TransferFunction([1], [Lout*L*Cout, (Rout*L*Cout + Lout*R*Cout), (Lout + L + R*Rout*Cout), (R + Rout)])
+
     ###################################################################################################################
     # Post-Processing
     ###################################################################################################################
@@ -108,6 +115,7 @@ def genTF(para, setupTopo):
     out['SS']['DC'] = out['TF']['DC'].to_ss()
     out['SS']['Out'] = out['TF']['Out'].to_ss()
     out['SS']['Load'] = out['TF']['Load'].to_ss()
+    out['SS']['OutLoad'] = out['TF']['OutLoad'].to_ss()
     
     ###################################################################################################################
     # MSG Out
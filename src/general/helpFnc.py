@@ -21,8 +21,11 @@
 # External
 # ==============================================================================
 import numpy as np
+import pandas as pd
 import math
-from scipy.fft import fft
+from scipy.fft import fft, rfft, irfft
+from scipy import signal as sig
+from scipy import linalg
 from os.path import dirname, join as pjoin
 import os
 
@@ -55,22 +58,69 @@ def initPath(nameFolder):
     return setupPath
 
 
+#######################################################################################################################
+# Column Store
+#######################################################################################################################
+def colInit(cols, N=0, val=0.0):
+    # Named float64 columns of N samples as row views into one contiguous (columns x samples) block
+    blk = np.full((len(cols), int(N)), val, dtype=float)
+    return {cols[i]: blk[i] for i in range(0, len(cols))}
+
+
+#######################################################################################################################
+# Bridge to Column Stores
+#######################################################################################################################
+def bri2col(out, ids):
+    # Per-switch column stores (row views) of the stacked (switches x samples) arrays of calcElecBri() or calcLossBri()
+    return {ids[i]: {key: out[key][i] for key in out} for i in range(0, len(ids))}
+
+
+#######################################################################################################################
+# Column Stores to Bridge
+#######################################################################################################################
+def col2bri(data, ids):
+    # Stacked (switches x samples) arrays of per-switch column stores, inverse of bri2col()
+    return {key: np.array([data[i][key] for i in ids]) for key in data[ids[0]]}
+
+
+#######################################################################################################################
+# Column Stores to DataFrames
+#######################################################################################################################
+def col2df(data):
+    # DataFrames of nested column stores {c1: {c2: store}}, only used at the output boundary
+    return {c1: {c2: pd.DataFrame(data[c1][c2]) for c2 in data[c1]} for c1 in data}
+
+
 #######################################################################################################################
 # Zero-Order-Hold Easy
 #######################################################################################################################
 def zoh_easy(x, c):
-    xs = np.zeros(np.size(x))
-    xs[0] = x[0]
-    h_old = x[0]
-    for i in range(1, int(len(x))):
-        if c[i] > 0:
-            xs[i] = x[i]
-            h_old = x[i]
-        elif c[i] < 0:
-            xs[i] = 0
-            h_old = 0
-        else:
-            xs[i] = h_old
+    x = np.asarray(x)
+    c = np.asarray(c)
+    val = np.where(c > 0, x, 0).astype(float)
+    upd = (c > 0) | (c < 0)
+    val[0] = x[0]
+    upd[0] = True
+    idx = np.maximum.accumulate(np.where(upd, np.arange(0, len(x)), 0))
+    xs = val[idx]
+    return xs
+
+
+#######################################################################################################################
+# Zero-Order-Hold Edges
+#######################################################################################################################
+def zohEdge(x, c, idx):
+    # Same as zoh_easy() along the last axis for values x known only at the sorted (flat) samples idx, which contain the
+    # first sample of every row and all samples where c is non-zero
+    c = np.asarray(c)
+    idx = np.asarray(idx)
+    ce = c.ravel()[idx]
+    first = (idx % np.shape(c)[-1] == 0)
+    upd = (ce != 0) | first
+    val = np.where(ce > 0, x, 0).astype(float)
+    val[first] = np.asarray(x, dtype=float)[first]
+    pos = np.searchsorted(idx[upd], np.arange(0, np.size(c)), side='right') - 1
+    xs = val[upd][pos].reshape(np.shape(c))
     return xs
 
 
@@ -78,36 +128,28 @@ def zoh_easy(x, c):
 # Zero-Order Hold (ZOH)
 #######################################################################################################################
 def zoh(x, c, e, th):
-    xs = np.zeros(np.size(x))
-    hold = th
-    xs[0] = x[0]
-    i_old = 0
+    x = np.asarray(x)
+    c = np.asarray(c)
     if e == 'SE':
-        for i in range(1, int(len(x))):
-            if c[i] >= 0.99:
-                if hold >= th:
-                    xs[i] = x[i]
-                    i_old = i
-                    hold = 0
-                else:
-                    xs[i] = x[i_old]
-                    hold = hold + 1
-            else:
-                xs[i] = x[i_old]
-                hold = hold + 1
+        trig = np.nonzero(c[1:] >= 0.99)[0] + 1
     else:
-        for i in range(1, int(len(x))):
-            if abs(c[i]) >= 0.99:
-                if hold >= th:
-                    xs[i] = x[i]
-                    i_old = i
-                    hold = 0
-                else:
-                    xs[i] = x[i_old]
-                    hold = hold + 1
-            else:
-                xs[i] = x[i_old]
-                hold = hold + 1
+        trig = np.nonzero(np.abs(c[1:]) >= 0.99)[0] + 1
+
+    # A trigger samples when at least th samples have passed since the last sample
+    if th > 0 and len(trig) > 0:
+        smp = [trig[0]]
+        nxt = np.searchsorted(trig, trig + th + 1)
+        k = nxt[0]
+        while k < len(trig):
+            smp.append(trig[k])
+            k = nxt[k]
+        trig = np.array(smp)
+
+    upd = np.zeros(len(x), dtype=bool)
+    upd[0] = True
+    upd[trig] = True
+    idx = np.maximum.accumulate(np.where(upd, np.arange(0, len(x)), 0))
+    xs = x[idx].astype(float)
 
     return xs
 
@@ -116,12 +158,10 @@ def zoh(x, c, e, th):
 # Convert to dB
 #######################################################################################################################
 def mag2dB(inp, ref):
-    out = np.zeros(np.size(inp))
-    for i in range(0, len(inp)):
-        if inp[i] != 0:
-            out[i] = 20 * np.log10(abs(inp[i]) / ref)
-        else:
-            out[i] = -60
+    inp = np.asarray(inp)
+    out = np.full(np.size(inp), -60.0)
+    idx = inp != 0
+    out[idx] = 20 * np.log10(np.abs(inp[idx]) / ref)
 
     return out
 
@@ -144,24 +184,22 @@ def rms(x):
 # Carrier Intersection
 #######################################################################################################################
 def cbInter(xs, c, Mi, tmin):
+    # Rows of xs belong to the rows of Mi (batch), the carrier is shared
     if tmin == 0:
-        if Mi != 0:
+        if np.ndim(Mi) == 0 and Mi == 0:
+            s = np.zeros(np.shape(xs))
+        else:
             s = xs > c
             s = s.astype(int) - (~s).astype(int)
-        else:
-            s = np.zeros(np.size(xs))
     else:
-        hold = tmin
-        s = np.zeros(np.size(xs))
-        for i in range(0, len(xs)):
-            if hold >= tmin:
-                if Mi != 0:
-                    temp = xs[i] > c[i]
-                    s[i] = temp.astype(int) - (~temp).astype(int)
-                hold = 0
-            else:
-                s[i] = s[i - 1]
-                hold = hold + 1
+        # Comparison is only updated every tmin+1 samples and held in between
+        s = np.zeros(np.shape(xs))
+        if np.ndim(Mi) > 0 or Mi != 0:
+            idx = np.arange(0, np.shape(xs)[-1]) // (tmin + 1) * (tmin + 1)
+            temp = xs[..., idx] > c[idx]
+            s[:] = temp.astype(int) - (~temp).astype(int)
+    if np.ndim(Mi) > 0:
+        s = np.where(Mi != 0, s, 0)
     return s
 
 
@@ -169,14 +207,17 @@ def cbInter(xs, c, Mi, tmin):
 # sample
 #######################################################################################################################
 def con2dis(x, t, Ts):
-    xs = np.zeros(np.size(x))
-    k = 0
-    for i in range(0, len(xs)):
-        if t[i] >= k * Ts:
-            xs[i] = x[i]
-            k = k + 1
-        else:
-            xs[i] = xs[i - 1]
+    # The k-th sample is taken at the first time t >= k*Ts, but at least one sample after the previous one
+    x = np.asarray(x)
+    N = np.shape(x)[-1]
+    k = np.arange(0, min(N, int(t[-1] / Ts) + 3))
+    idx = np.searchsorted(t, k * Ts, side='left')
+    idx = np.maximum.accumulate(idx - k) + k
+    upd = np.zeros(N + 1, dtype=bool)
+    upd[idx[idx < N] + 1] = True
+    upd[0] = True
+    ptr = np.maximum.accumulate(np.where(upd, np.arange(0, N + 1), 0))
+    xs = np.concatenate((np.zeros(np.shape(x)[:-1] + (1,)), x), axis=-1)[..., ptr][..., 1:]
     return xs
 
 
@@ -212,29 +253,541 @@ def wthd(x, _, cf, K):
 # Dead-time
 #######################################################################################################################
 def deadTime(s, Td):
-    Nd = 0
     T1 = (s == 1)
     T2 = (s == -1)
-    T1_out = np.zeros(np.size(T1))
-    T2_out = np.zeros(np.size(T2))
-    N = len(s)
-    for i in range(2, N):
-        if T1[i - 1] == 0 and T1[i] == 1:
-            Nd = Td
-        if Nd > 0:
-            T1_out[i] = 0
-            Nd = Nd - 1
-        else:
-            T1_out[i] = T1[i]
-
-        if T2[i - 1] == 0 and T2[i] == 1:
-            Nd = Td
-        if Nd > 0:
-            T2_out[i] = 0
-            Nd = Nd - 1
-        else:
-            T2_out[i] = T2[i]
-
+    T1_out = np.zeros(np.shape(T1))
+    T2_out = np.zeros(np.shape(T2))
+    N = np.shape(s)[-1]
+
+    # Both gates share one dead-time counter that is decremented twice per sample (T1 first, then T2), a rising
+    # edge restarts the counter with Td, hence the blanked half-steps are the Td half-steps after the last restart
+    rise = np.zeros(np.shape(s) + (2,), dtype=bool)
+    rise[..., 2:, 0] = T1[..., 2:] & ~T1[..., 1:-1]
+    rise[..., 2:, 1] = T2[..., 2:] & ~T2[..., 1:-1]
+    h = np.arange(0, 2 * N)
+    last = np.maximum.accumulate(np.where(rise.reshape(np.shape(s)[:-1] + (2 * N,)), h, -2 * N - Td), axis=-1)
+    blank = ((h - last) < Td).reshape(np.shape(s) + (2,))
+
+    T1_out[..., 2:] = (T1 & ~blank[..., 0])[..., 2:]
+    T2_out[..., 2:] = (T2 & ~blank[..., 1])[..., 2:]
     s_out = T1_out - T2_out
 
     return s_out
+
+
+#######################################################################################################################
+# Table Grid
+#######################################################################################################################
+def tabGrid(x, y, z):
+    # Validated grid of a 2D table z(y, x) for tabInter(), axes are sorted ascending and singleton axes are widened;
+    # returns None if the table is empty or does not match the axes
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    z = np.asarray(z, dtype=float)
+    if np.size(z) == 0 or np.shape(z) != (len(y), len(x)):
+        return None
+    ix = np.argsort(x, kind='stable')
+    iy = np.argsort(y, kind='stable')
+    x = x[ix]
+    y = y[iy]
+    z = z[iy][:, ix]
+    if len(x) == 1:
+        x = np.append(x, x[0] + 1)
+        z = np.hstack((z, z))
+    if len(y) == 1:
+        y = np.append(y, y[0] + 1)
+        z = np.vstack((z, z))
+
+    return {'x': x, 'y': y, 'z': z}
+
+
+#######################################################################################################################
+# Table Interpolation
+#######################################################################################################################
+def tabInter(tab, x, y):
+    # Bilinear interpolation of a grid from tabGrid() for arrays of points (x and y are broadcast), points outside the
+    # grid take the value at its edge (same as interp2d with linear splines)
+    xq = np.clip(np.asarray(x, dtype=float), tab['x'][0], tab['x'][-1])
+    yq = np.clip(np.asarray(y, dtype=float), tab['y'][0], tab['y'][-1])
+    i = np.clip(np.searchsorted(tab['x'], xq, side='right') - 1, 0, len(tab['x']) - 2)
+    j = np.clip(np.searchsorted(tab['y'], yq, side='right') - 1, 0, len(tab['y']) - 2)
+    wx = (xq - tab['x'][i]) / (tab['x'][i + 1] - tab['x'][i])
+    wy = (yq - tab['y'][j]) / (tab['y'][j + 1] - tab['y'][j])
+    z = tab['z']
+
+    return (1 - wy) * ((1 - wx) * z[j, i] + wx * z[j, i + 1]) + wy * ((1 - wx) * z[j + 1, i] + wx * z[j + 1, i + 1])
+
+
+#######################################################################################################################
+# Discretisation Cache
+#######################################################################################################################
+lsimCache = {}
+lsimCacheMax = 64
+
+
+#######################################################################################################################
+# Discretisation
+#######################################################################################################################
+def lsimDis(sys, dt):
+    # The system is discretised once per (model, dt) with the matrix exponential used by lsim (linear interpolation of
+    # the input between two samples) and stored in the Schur basis of the discrete system matrix (see lsimState())
+    if not isinstance(sys, sig.StateSpace):
+        sys = sys.to_ss()
+    A, B, C, D = [np.atleast_2d(np.asarray(x, dtype=float)) for x in (sys.A, sys.B, sys.C, sys.D)]
+    key = (A.shape, A.tobytes(), B.tobytes(), C.tobytes(), D.tobytes(), float(dt))
+    if key in lsimCache:
+        return lsimCache[key]
+
+    # ==============================================================================
+    # Matrix exponential
+    # ==============================================================================
+    n = A.shape[0]
+    M = np.vstack([np.hstack([A * dt, B * dt, np.zeros((n, 1))]), np.hstack([np.zeros((1, n + 1)), np.ones((1, 1))]),
+                   np.zeros((1, n + 2))])
+    expM = linalg.expm(M)
+    Ad = expM[:n, :n]
+    Bd1 = expM[:n, n + 1:]
+    Bd0 = expM[:n, n:n + 1] - Bd1
+
+    # ==============================================================================
+    # Schur form
+    # ==============================================================================
+    # Ad = Q*T*Q^H with unitary Q and upper triangular T, the eigenvalues of Ad are taken from the diagonal of T and not
+    # from the polynomial coefficients of the transfer function (these lose precision when the poles crowd towards z = 1
+    # at high sampling rates)
+    [T, Q] = linalg.schur(Ad, output='complex')
+
+    # ==============================================================================
+    # Cache
+    # ==============================================================================
+    # The shifted state x[k] - Bd1*u[k] removes the dependency on u[k+1] (input Bt and feedthrough Dt)
+    if len(lsimCache) >= lsimCacheMax:
+        lsimCache.pop(next(iter(lsimCache)))
+    lsimCache[key] = {'key': key, 'A': A, 'B': B, 'Ad': Ad, 'Bt': Ad @ Bd1 + Bd0, 'Bd1': Bd1, 'Bz': Bd0 + Bd1, 'C': C,
+                      'D': D, 'Dt': (C @ Bd1 + D)[0, 0], 'T': T, 'Q': Q, 'CQ': (C @ Q)[0]}
+
+    return lsimCache[key]
+
+
+#######################################################################################################################
+# Matrix Powers
+#######################################################################################################################
+def matPow(A, V, P):
+    # Returns A^k*V for k = 0 ... P-1 along the first axis, the sequence is doubled with squared powers of A
+    H = np.asarray(V, dtype=float)[np.newaxis]
+    Ak = A
+    while len(H) < P:
+        H = np.concatenate((H, H @ Ak.T), axis=0)
+        Ak = Ak @ Ak
+
+    return H[0:P]
+
+
+#######################################################################################################################
+# State Recursion
+#######################################################################################################################
+def lsimState(dis, g, w0=None):
+    # Solves w[k+1] = T*w[k] + g[k] from w[0] = w0 (zero if None) for inputs g of shape (..., n, len(t)) in the Schur
+    # basis of lsimDis(); T is triangular, so each coordinate is a first-order filter of its input and of the coordinates
+    # below it
+    T = dis['T']
+    n = np.size(T, axis=0)
+    w = np.zeros(np.shape(g), dtype=complex)
+    if w0 is None:
+        w0 = np.zeros(np.shape(g)[:-1])
+    for i in range(n - 1, -1, -1):
+        v = g[..., i, :] + np.einsum('j,...jt->...t', T[i, i + 1:], w[..., i + 1:, :])
+        w[..., i, :] = sig.lfilter([0, 1], [1, -T[i, i]], v, axis=-1, zi=w0[..., i, np.newaxis] + 0j)[0]
+
+    return w
+
+
+#######################################################################################################################
+# Batched Linear Simulation
+#######################################################################################################################
+def lsimBatch(sys, u, t, X0=None, per=0):
+    # Replaces lsim for uniformly sampled inputs, the rows of a batch of inputs are simulated together; X0 is the
+    # initial value of all states (one value per row), for per=1 the initial state is chosen such that the response is
+    # periodic over t (the input is assumed periodic with u[-1] = u[0]) and X0 is ignored
+    dis = lsimDis(sys, t[1] - t[0])
+    u = np.asarray(u, dtype=float)
+    n = np.size(dis['A'], axis=0)
+    T = np.shape(u)[-1]
+
+    # ==============================================================================
+    # Initial state
+    # ==============================================================================
+    # ------------------------------------------
+    # Periodic steady-state
+    # ------------------------------------------
+    # The shifted state after one period starting from rest is the input weighted with the reversed impulse responses
+    # of the states, the periodic initial state solves x0 = Ad^P * x0 + x(P)
+    if per == 1:
+        P = T - 1
+        xP = u[..., 0:P] @ matPow(dis['Ad'], dis['Bt'][:, 0], P)[::-1]
+        x0 = linalg.solve(np.eye(n) - np.linalg.matrix_power(dis['Ad'], P), np.reshape(xP, (-1, n)).T).T
+        x0 = np.reshape(x0, np.shape(xP))
+
+    # ------------------------------------------
+    # Initial value
+    # ------------------------------------------
+    # The shifted state starts at x0 - Bd1*u[0] even if the system starts at rest
+    else:
+        x0 = np.zeros(np.shape(u)[:-1] + (n,))
+        if X0 is not None:
+            x0 = x0 + np.asarray(X0, dtype=float)[..., np.newaxis]
+            if t[0] > 0:
+                x0 = x0 @ linalg.expm(dis['A'].T * t[0])
+        x0 = x0 - u[..., [0]] * dis['Bd1'][:, 0]
+
+    # ==============================================================================
+    # Response
+    # ==============================================================================
+    # The shifted state is driven by Bt*u[k], in the Schur basis by Q^H*Bt*u[k] starting from Q^H*x0
+    g = u[..., np.newaxis, :] * (dis['Q'].conj().T @ dis['Bt'])
+    w = lsimState(dis, g, x0 @ dis['Q'].conj())
+    y = np.real(np.einsum('i,...it->...t', dis['CQ'], w)) + dis['Dt'] * u
+
+    return y
+
+
+#######################################################################################################################
+# Frequency Response
+#######################################################################################################################
+def lsimFreq(sys, P, dt):
+    # Frequency response on the rfft grid of P samples, cached per (model, P, dt); the response is evaluated for the
+    # discretisation of lsimDis() (H(z) at z = exp(jw*dt)) so that both solvers give the same periodic solution; poles
+    # on the grid (integrator at w = 0) have no periodic response and their bins are set to zero
+    dis = lsimDis(sys, dt)
+    key = ('freq', dis['key'], int(P))
+    if key in lsimCache:
+        return lsimCache[key]
+
+    # H(z) = Dt + C*Q*(z*I - T)^-1*Q^H*Bt, the triangular system is solved by back-substitution for all bins at once
+    z = np.exp(2j * np.pi * np.arange(0, int(P) // 2 + 1) / int(P))
+    T = dis['T']
+    n = np.size(T, axis=0)
+    g = dis['Q'].conj().T @ dis['Bt'][:, 0]
+    den = z[:, np.newaxis] - np.diag(T)
+    ok = np.all(np.abs(den) > 1e-12, axis=1)
+    den[~ok] = 1
+    w = np.zeros((np.size(z), n), dtype=complex)
+    for i in range(n - 1, -1, -1):
+        w[:, i] = (g[i] + w[:, i + 1:] @ T[i, i + 1:]) / den[:, i]
+    H = np.zeros(np.size(z), dtype=complex)
+    H[ok] = w[ok] @ dis['CQ'] + dis['Dt']
+
+    if len(lsimCache) >= lsimCacheMax:
+        lsimCache.pop(next(iter(lsimCache)))
+    lsimCache[key] = H
+
+    return H
+
+
+#######################################################################################################################
+# Batched Frequency Domain Simulation
+#######################################################################################################################
+def fsimBatch(sys, u, t, U=None):
+    # Periodic steady-state response for inputs spanning whole periods (u[-1] = u[0]), the input spectrum U over the
+    # first P = len(t) - 1 samples can be passed if known; returns the response including the end sample and its
+    # spectrum
+    P = np.shape(u)[-1] - 1
+    if U is None:
+        U = rfft(np.asarray(u, dtype=float)[..., 0:P], axis=-1)
+    Y = U * lsimFreq(sys, P, t[1] - t[0])
+    y = irfft(Y, P, axis=-1)
+    y = np.concatenate((y, y[..., 0:1]), axis=-1)
+
+    return [y, Y]
+
+
+#######################################################################################################################
+# Event Discretisation
+#######################################################################################################################
+def evtDis(sys, dt):
+    # Extends the discretisation of lsimDis() for the event-driven solver with the eigendecomposition of A for the step
+    # responses inside a sample; defective or badly conditioned eigenvectors are marked and the step responses use the
+    # matrix exponential instead
+    dis = lsimDis(sys, dt)
+    key = ('evt', dis['key'])
+    if key in lsimCache:
+        return lsimCache[key]
+
+    # ==============================================================================
+    # Eigendecomposition
+    # ==============================================================================
+    [lam, V] = np.linalg.eig(dis['A'])
+    eig = np.linalg.cond(V) < 1e8
+    w = np.linalg.solve(V, dis['B'][:, 0].astype(complex)) if eig else None
+
+    # ==============================================================================
+    # Cache
+    # ==============================================================================
+    if len(lsimCache) >= lsimCacheMax:
+        lsimCache.pop(next(iter(lsimCache)))
+    lsimCache[key] = dict(dis, eig=eig, lam=lam, V=V, w=w)
+
+    return lsimCache[key]
+
+
+#######################################################################################################################
+# Switching Edges
+#######################################################################################################################
+def evtCorr(sys, evt, t):
+    # State injections of the edges of one switching function (unit steps) for the event-driven solver: an edge at te
+    # between t[k-1] and t[k] adds G(t[k] - te)*B to the state at t[k] with G(tau) = int_0^tau expm(A*s) ds, the input
+    # itself is held at its value after each sample (evt2dense()); a list of events (batch) is returned as one row per
+    # entry with shape (n, len(t)) each, the injection into the state at t[k] is stored at k-1
+    if isinstance(evt, list):
+        return np.array([evtCorr(sys, temp, t) for temp in evt])
+    dis = evtDis(sys, t[1] - t[0])
+    n = np.size(dis['A'], axis=0)
+    T = len(t)
+    c = np.zeros((n, T))
+
+    # ==============================================================================
+    # Edges
+    # ==============================================================================
+    # Edges within a small fraction of the sample time belong to the sample (same rounding as evt2dense())
+    tol = 1e-9 * (t[-1] - t[0]) / max(T - 1, 1)
+    te = np.asarray(evt['t'], dtype=float)[1:]
+    ds = np.diff(np.asarray(evt['s'], dtype=float))
+    k = np.searchsorted(t + tol, te, side='left')
+    keep = (k >= 1) & (k < T) & (ds != 0)
+    if not np.any(keep):
+        return c
+    k = k[keep]
+    tau = np.maximum(t[k] - te[keep], 0)
+
+    # ==============================================================================
+    # Step responses
+    # ==============================================================================
+    # ------------------------------------------
+    # Modal
+    # ------------------------------------------
+    # G(tau)*B = V*diag((exp(lam*tau) - 1)/lam)*V^-1*B with the limit tau for lam = 0
+    if dis['eig']:
+        z = np.outer(tau, dis['lam'])
+        zs = np.where(z == 0, 1, z)
+        g = np.where(z == 0, 1, np.expm1(zs) / zs) * tau[:, np.newaxis]
+        G = np.real((g * dis['w']) @ dis['V'].T)
+
+    # ------------------------------------------
+    # Matrix exponential
+    # ------------------------------------------
+    else:
+        M = np.zeros((len(tau), n + 1, n + 1))
+        M[:, :n, :n] = dis['A'] * tau[:, np.newaxis, np.newaxis]
+        M[:, :n, n] = dis['B'][:, 0] * tau[:, np.newaxis]
+        G = linalg.expm(M)[:, :n, n]
+
+    np.add.at(c.T, k - 1, G * ds[keep][:, np.newaxis])
+
+    return c
+
+
+#######################################################################################################################
+# Event-Driven Simulation
+#######################################################################################################################
+def esimBatch(sys, u, t, c, X0=None, per=0):
+    # Exact response of a linear model to switched (piecewise constant) inputs: between two samples the input is held
+    # at u[k] (value after the sample) and the edges inside the sample enter as state injections c (see evtCorr(),
+    # shape u.shape[:-1] + (n, T)); X0 and per as for lsimBatch()
+    dis = evtDis(sys, t[1] - t[0])
+    u = np.asarray(u, dtype=float)
+    n = np.size(dis['A'], axis=0)
+    T = np.shape(u)[-1]
+
+    # ==============================================================================
+    # State inputs
+    # ==============================================================================
+    # The state follows x[k+1] = Ad*x[k] + f[k]
+    f = u[..., np.newaxis, :] * dis['Bz'] + c
+
+    # ==============================================================================
+    # Initial state
+    # ==============================================================================
+    # ------------------------------------------
+    # Periodic steady-state
+    # ------------------------------------------
+    if per == 1:
+        P = T - 1
+        xP = np.einsum('...it,tij->...j', f[..., 0:P], matPow(dis['Ad'], np.eye(n), P)[::-1])
+        x0 = linalg.solve(np.eye(n) - np.linalg.matrix_power(dis['Ad'], P), np.reshape(xP, (-1, n)).T).T
+        x0 = np.reshape(x0, np.shape(xP))
+
+    # ------------------------------------------
+    # Initial value
+    # ------------------------------------------
+    else:
+        x0 = np.zeros(np.shape(u)[:-1] + (n,))
+        if X0 is not None:
+            x0 = x0 + np.asarray(X0, dtype=float)[..., np.newaxis]
+            if t[0] > 0:
+                x0 = x0 @ linalg.expm(dis['A'].T * t[0])
+
+    # ==============================================================================
+    # Response
+    # ==============================================================================
+    # Solved in the Schur basis of Ad, the state inputs enter as Q^H*f[k] and the state starts from Q^H*x0
+    g = np.einsum('ij,...jt->...it', dis['Q'].conj().T, f)
+    w = lsimState(dis, g, x0 @ dis['Q'].conj())
+    y = np.real(np.einsum('i,...it->...t', dis['CQ'], w)) + dis['D'][0, 0] * u
+
+    return y
+
+
+#######################################################################################################################
+# Fixed-Point Acceleration
+#######################################################################################################################
+accDepth = {'none': 0, 'secant': 1, 'anderson': 3}
+
+
+def accFix(x, g, hist, mode):
+    # Next iterate of the fixed point x = g(x): (none) plain iteration, (secant) and (anderson) extrapolate from the
+    # residuals f = g(x) - x of the last one or three iterates, the history is restarted if the residual grows
+    x = np.ravel(x).astype(float)
+    g = np.ravel(g).astype(float)
+    f = g - x
+    if len(hist.get('f', [])) > 0 and np.linalg.norm(f) > np.linalg.norm(hist['f'][-1]):
+        hist = {}
+    hist = {'g': (hist.get('g', []) + [g])[-(accDepth[mode] + 1):],
+            'f': (hist.get('f', []) + [f])[-(accDepth[mode] + 1):], 'res': np.max(np.abs(f))}
+
+    # Anderson mixing, least-squares combination of the residual differences
+    xn = g
+    if len(hist['f']) > 1:
+        dF = np.diff(np.array(hist['f']), axis=0).T
+        dG = np.diff(np.array(hist['g']), axis=0).T
+        gam = linalg.lstsq(dF, f)[0]
+        if np.all(np.isfinite(gam)):
+            xn = g - dG @ gam
+
+    return [xn, hist]
+
+
+#######################################################################################################################
+# Micro-Benchmark
+#######################################################################################################################
+if __name__ == "__main__":
+    import time
+
+    # ==============================================================================
+    # Reference loops
+    # ==============================================================================
+    def zoh_easy_loop(x, c):
+        xs = np.zeros(np.size(x))
+        xs[0] = x[0]
+        h_old = x[0]
+        for i in range(1, int(len(x))):
+            if c[i] > 0:
+                xs[i] = x[i]
+                h_old = x[i]
+            elif c[i] < 0:
+                xs[i] = 0
+                h_old = 0
+            else:
+                xs[i] = h_old
+        return xs
+
+    def zoh_loop(x, c, e, th):
+        xs = np.zeros(np.size(x))
+        hold = th
+        xs[0] = x[0]
+        i_old = 0
+        for i in range(1, int(len(x))):
+            if (c[i] >= 0.99 and e == 'SE') or (abs(c[i]) >= 0.99 and e != 'SE'):
+                if hold >= th:
+                    xs[i] = x[i]
+                    i_old = i
+                    hold = 0
+                    continue
+            xs[i] = x[i_old]
+            hold = hold + 1
+        return xs
+
+    def mag2dB_loop(inp, ref):
+        out = np.zeros(np.size(inp))
+        for i in range(0, len(inp)):
+            if inp[i] != 0:
+                out[i] = 20 * np.log10(abs(inp[i]) / ref)
+            else:
+                out[i] = -60
+        return out
+
+    def cbInter_loop(xs, c, Mi, tmin):
+        hold = tmin
+        s = np.zeros(np.size(xs))
+        for i in range(0, len(xs)):
+            if hold >= tmin:
+                if Mi != 0:
+                    temp = xs[i] > c[i]
+                    s[i] = temp.astype(int) - (~temp).astype(int)
+                hold = 0
+            else:
+                s[i] = s[i - 1]
+                hold = hold + 1
+        return s
+
+    def con2dis_loop(x, t, Ts):
+        xs = np.zeros(np.size(x))
+        k = 0
+        for i in range(0, len(xs)):
+            if t[i] >= k * Ts:
+                xs[i] = x[i]
+                k = k + 1
+            else:
+                xs[i] = xs[i - 1]
+        return xs
+
+    def deadTime_loop(s, Td):
+        Nd = 0
+        T1 = (s == 1)
+        T2 = (s == -1)
+        T1_out = np.zeros(np.size(T1))
+        T2_out = np.zeros(np.size(T2))
+        for i in range(2, len(s)):
+            if T1[i - 1] == 0 and T1[i] == 1:
+                Nd = Td
+            if Nd > 0:
+                T1_out[i] = 0
+                Nd = Nd - 1
+            else:
+                T1_out[i] = T1[i]
+            if T2[i - 1] == 0 and T2[i] == 1:
+                Nd = Td
+            if Nd > 0:
+                T2_out[i] = 0
+                Nd = Nd - 1
+            else:
+                T2_out[i] = T2[i]
+        return T1_out - T2_out
+
+    # ==============================================================================
+    # Signals (10^6 samples)
+    # ==============================================================================
+    N = int(1e6)
+    fs = 1050
+    t = np.linspace(0, 1, N)
+    x = 0.9 * np.sin(2 * np.pi * 50 * t)
+    c = np.sin(2 * np.pi * fs * t)
+    x[::1000] = 0
+    s = np.sign(x - c)
+
+    # ==============================================================================
+    # Timing
+    # ==============================================================================
+    cases = [['zoh_easy', zoh_easy, zoh_easy_loop, (x, np.diff(s, prepend=0))],
+             ['zoh', zoh, zoh_loop, (x, c, 'DE', 20)],
+             ['mag2dB', mag2dB, mag2dB_loop, (x, 1)],
+             ['cbInter', cbInter, cbInter_loop, (x, c, 1, 5)],
+             ['con2dis', con2dis, con2dis_loop, (x, t, 1 / fs / 2)],
+             ['deadTime', deadTime, deadTime_loop, (s, 30)]]
+    for name, fnc, ref, arg in cases:
+        t0 = time.time()
+        out = fnc(*arg)
+        t1 = time.time()
+        out_ref = ref(*arg)
+        t2 = time.time()
+        print("INFO: %-9s vectorised %8.4f s, loop %8.4f s, speed-up %7.1f, identical: %s"
+              % (name, t1 - t0, t2 - t1, (t2 - t1) / max(t1 - t0, 1e-12), np.array_equal(out, out_ref)))
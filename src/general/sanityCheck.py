@@ -38,6 +38,21 @@ def sanityInput(setupExp, setupData, setupTopo, setupPara):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Defaults
+    # ==============================================================================
+    # Options missing in older setup files keep their previous behaviour
+    setupExp.setdefault('pss', 0)
+    setupExp.setdefault('solver', 'time')
+    setupPara['PWM'].setdefault('evt', 0)
+    setupPara['Ther'].setdefault('Network', 'foster')
+    setupPara['Ther'].setdefault('Gth', 0)
+    setupExp.setdefault('acc', 'none')
+    setupExp.setdefault('Tq', 0)
+
+    # ==============================================================================
+    # Memory
+    # ==============================================================================
     RAM_machine = psutil.virtual_memory().total
     if setupExp['type'] == 2:
         RAM_use = setupExp['fsim']*setupData['stat']['cyc'] * (20 + 24 + 36 + 12) * setupTopo['fel']*setupData['trans']['tmax']
@@ -58,6 +73,27 @@ def sanityInput(setupExp, setupData, setupTopo, setupPara):
     # ==============================================================================
     if setupExp['eps'] * 1e3 > (1/setupExp['fsim']):
         print("WARN: Numerical value 'setupExp['eps']' comparatively large")
+
+    # ==============================================================================
+    # Solver
+    # ==============================================================================
+    if setupExp['solver'] not in ['time', 'freq', 'evt']:
+        setupExp['solver'] = 'time'
+        print("WARN: Unknown solver 'setupExp['solver']', time domain solver is used")
+
+    # ==============================================================================
+    # Acceleration
+    # ==============================================================================
+    if setupExp['acc'] not in ['none', 'secant', 'anderson']:
+        setupExp['acc'] = 'none'
+        print("WARN: Unknown acceleration 'setupExp['acc']', fixed-point iteration is used")
+
+    # ==============================================================================
+    # Loss Memory
+    # ==============================================================================
+    if setupExp['Tq'] < 0:
+        setupExp['Tq'] = 0
+        print("WARN: Negative temperature step 'setupExp['Tq']', losses are evaluated at the exact temperature")
     
     ###################################################################################################################
     # Mission Profile
@@ -65,8 +101,8 @@ def sanityInput(setupExp, setupData, setupTopo, setupPara):
     # ==============================================================================
     # Cycles
     # ==============================================================================
-    if setupData['stat']['cyc'] < 3:
-        print("WARN: To ensure convergence chose 'setupData['stat']['cyc']' >= 3")
+    if setupData['stat']['cyc'] < 3 and setupExp['pss'] == 0 and setupExp['solver'] != 'freq':
+        print("WARN: To ensure convergence chose 'setupData['stat']['cyc']' >= 3, 'setupExp['pss']' = 1 or 'setupExp['solver']' = 'freq'")
     
     # ==============================================================================
     # Cycles
@@ -89,20 +125,20 @@ def sanityInput(setupExp, setupData, setupTopo, setupPara):
     # ------------------------------------------
     # Minimum time
     # ------------------------------------------
-    if (setupPara['PWM']['tmin'] + setupExp['eps']) < (1/setupExp['fsim']):
+    if (setupPara['PWM']['tmin'] + setupExp['eps']) < (1/setupExp['fsim']) and setupPara['PWM']['evt'] == 0:
         setupPara['PWM']['tmin'] = 0
         print("WARN: Minimum pulse width (tmin) smaller than simulation time (tsim)")
-    elif setupPara['PWM']['tmin'] > (1/setupExp['fs']):
+    elif setupPara['PWM']['tmin'] > (1/setupPara['PWM']['fs']):
         setupPara['PWM']['tmin'] = 0
         print("ERROR: Minimum pulse width (tmin) larger than switching time (ts)")
         
     # ------------------------------------------
     # Dead time
     # ------------------------------------------
-    if (setupPara['PWM']['td'] + setupExp['eps']) < (1/setupExp['fsim']):
+    if (setupPara['PWM']['td'] + setupExp['eps']) < (1/setupExp['fsim']) and setupPara['PWM']['evt'] == 0:
         setupPara['PWM']['td'] = 0
         print("WARN: Dead-time (td) smaller than simulation time (tsim)")
-    elif setupPara['PWM']['td'] > (1/setupExp['fs']):
+    elif setupPara['PWM']['td'] > (1/setupPara['PWM']['fs']):
         setupPara['PWM']['td'] = 0
         print("ERROR: Dead-time (td) larger than switching time (ts)")
     
@@ -119,6 +155,12 @@ def sanityInput(setupExp, setupData, setupTopo, setupPara):
     # ==============================================================================
     # Thermal
     # ==============================================================================
+    if setupPara['Ther']['Network'] not in ['foster', 'shared']:
+        setupPara['Ther']['Network'] = 'foster'
+        print("WARN: Unknown thermal network 'setupPara['Ther']['Network']', Foster networks are used")
+    elif setupPara['Ther']['Network'] == 'shared' and setupPara['Ther']['Heatsink'] == 0:
+        setupPara['Ther']['Network'] = 'foster'
+        print("WARN: Shared thermal network requires 'setupPara['Ther']['Heatsink']' = 1, Foster networks are used")
     
     ###################################################################################################################
     # MSG Out
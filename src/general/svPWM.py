@@ -152,3 +152,115 @@ def svPWM(k, alpha, Mi):
     # Return
     ###################################################################################################################
     return [t0, t1, t2, t7, rr]
+
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def svPWM_Vec(k, alpha, Mi):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    alpha, Mi = np.broadcast_arrays(np.array(alpha, dtype=float, ndmin=1), np.array(Mi, dtype=float, ndmin=1))
+    alpha = np.array(alpha)
+    R = np.ones(np.shape(alpha), dtype=int)
+    t0 = np.zeros(np.shape(alpha))
+    t1 = np.zeros(np.shape(alpha))
+    t2 = np.zeros(np.shape(alpha))
+    t7 = np.zeros(np.shape(alpha))
+    k = np.array(k, dtype=float)
+
+    ###################################################################################################################
+    # Pre-processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Find Sector
+    # ==============================================================================
+    # ------------------------------------------
+    # Reduce to 2pi
+    # ------------------------------------------
+    while np.any(alpha >= 2*np.pi):
+        alpha = np.where(alpha >= 2*np.pi, alpha - 2*np.pi, alpha)
+
+    # ------------------------------------------
+    # Determine Sector
+    # ------------------------------------------
+    while np.any(alpha > np.pi/3):
+        idx = alpha > np.pi/3
+        alpha = np.where(idx, alpha - np.pi/3, alpha)
+        R = R + idx
+
+    # ------------------------------------------
+    # Get sector part
+    # ------------------------------------------
+    idx = (alpha > np.pi/6).astype(int)
+    even = (R % 2) == 0
+    rr = R
+
+    # ------------------------------------------
+    # Modulation region
+    # ------------------------------------------
+    reg0 = Mi <= 2/np.sqrt(3)
+    reg1 = (2/np.sqrt(3) < Mi) & (Mi <= 0.9517/np.pi*4)
+    reg2 = (0.9517/np.pi*4 < Mi) & (Mi < 4/np.pi)
+    reg3 = Mi == 4/np.pi
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Under-Modulation
+    # ==============================================================================
+    if np.any(reg0):
+        ta = np.sqrt(3)/2*Mi*np.sin(np.pi/3 - alpha)
+        tb = np.sqrt(3)/2*Mi*np.sin(alpha)
+        Tz = 1 - np.where(even, tb, ta) - np.where(even, ta, tb)
+        t1 = np.where(reg0, np.where(even, tb, ta), t1)
+        t2 = np.where(reg0, np.where(even, ta, tb), t2)
+        t0 = np.where(reg0, Tz * k[idx, R-1], t0)
+        t7 = np.where(reg0, Tz * (1-k[idx, R-1]), t7)
+
+    # ==============================================================================
+    # Over-Modulation (tbi)
+    # ==============================================================================
+    # ------------------------------------------
+    # First Region
+    # ------------------------------------------
+    if np.any(reg1):
+        ta = (np.sqrt(3)*np.cos(alpha) - np.sin(alpha))/(np.sqrt(3)*np.cos(alpha) + np.sin(alpha))
+        t1 = np.where(reg1, np.where(even, 1 - ta, ta), t1)
+        t2 = np.where(reg1, np.where(even, ta, 1 - ta), t2)
+
+    # ------------------------------------------
+    # Second Region
+    # ------------------------------------------
+    if np.any(reg2):
+        # Holding angle
+        alpha_h = np.select([(0.9517/np.pi*4 <= Mi) & (Mi < 0.9800/np.pi*4),
+                             (0.9800/np.pi*4 < Mi) & (Mi < 0.9975/np.pi*4)],
+                            [6.40*Mi/4*np.pi - 6.09, 11.75*Mi/4*np.pi - 11.34], 48.96*Mi/4*np.pi - 48.43)
+
+        # Comparison
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha_o = np.where((alpha_h <= alpha) & (alpha < np.pi/3 - alpha_h),
+                               (np.pi/6)*(alpha - alpha_h)/(np.pi/6 - alpha_h), np.pi/3)
+        alpha_o = np.where((0 <= alpha) & (alpha < alpha_h), 0, alpha_o)
+
+        # Times
+        ta = (np.sqrt(3)*np.cos(alpha_o) - np.sin(alpha_o))/(np.sqrt(3)*np.cos(alpha_o) + np.sin(alpha_o))
+        t1 = np.where(reg2, np.where(even, 1 - ta, ta), t1)
+        t2 = np.where(reg2, np.where(even, ta, 1 - ta), t2)
+
+    # ------------------------------------------
+    # Third Region (Six-Step)
+    # ------------------------------------------
+    if np.any(reg3):
+        ta = (alpha < np.pi/6) != even
+        t1 = np.where(reg3, ta.astype(float), t1)
+        t2 = np.where(reg3, (~ta).astype(float), t2)
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return [t0, t1, t2, t7, rr]
@@ -73,7 +73,7 @@ def plotStat_B2(time, freq, setupPara, setupData, setupTopo, setupExp):
     Mi = setupData['stat']['Mi']
     Vdc = setupData['stat']['Vdc']
     phiE = setupTopo['phiE']
-    down = setupData['stat']['cyc'] - 2
+    down = setupData['stat']['cyc'] - 2 * int(setupExp['pss'] == 0 and setupExp['solver'] != 'freq')
     Ta = setupData['stat']['Tc']
 
     # ==============================================================================
@@ -16,25 +16,40 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.therm.calcTherSS import calcTherSS
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
+from scipy import signal
+
+
+#######################################################################################################################
+# Loss Matrix
+#######################################################################################################################
+def lossNet(loss, p_cap, cpl):
+    # Losses of the stacked network (transistors, diodes, case nodes and capacitor), case nodes only loaded if coupled
+    return np.vstack((loss['p_T'], loss['p_D'], loss['p_L'] * int(np.any(np.asarray(cpl) >= 0)), p_cap))
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcTherRC(Tinit, Tc, Pv, t, Rth, Cth):
+def calcTherNet(Tinit, Tc, Pv, t, Rth, Cth, cpl=None, per=0):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
     # ==============================================================================
     # Parameters
     # ==============================================================================
-    N = len(Pv)
-    K = len(Rth)
+    # Every row of Pv, Rth and Cth is one Foster network (node), Tinit and Tend are (branches x nodes), for per=1 the
+    # initial temperatures are chosen such that the response is periodic over t and Tinit is ignored
+    Pv = np.atleast_2d(np.asarray(Pv, dtype=float))
+    [M, N] = np.shape(Pv)
+    Rth = np.atleast_2d(Rth) * np.ones((M, 1))
+    Cth = np.atleast_2d(Cth) * np.ones((M, 1))
+    K = np.size(Rth, axis=1)
     tau = Rth*Cth
 
     # ==============================================================================
@@ -42,22 +57,92 @@ def calcTherRC(Tinit, Tc, Pv, t, Rth, Cth):
     # ==============================================================================
     dt = np.diff(t)
     dt = np.insert(dt, len(dt), dt)
-    T = Tinit*np.ones((N, K))
+    Tend = Tinit*np.ones((K, M))*(1-per)
+    T = np.zeros((M, N))
 
     ###################################################################################################################
     # Calculation
     ###################################################################################################################
-    for i in range(1, N):
-        for ii in range(0, K):
-            T[i, ii] = (2*tau[ii]-dt[i])/(2*tau[ii]+dt[i])*T[i-1, ii] + (Rth[ii]*dt[i])/(2*tau[ii]+dt[i])*(Pv[i]+Pv[i-1])
+    # ==============================================================================
+    # Equidistant
+    # ==============================================================================
+    # Trapezoidal update as first-order IIR filter, all branches with identical Rth and tau are filtered at once
+    if N > 1 and np.allclose(dt, dt[0], rtol=1e-9, atol=0):
+        grp = {}
+        for m in range(0, M):
+            for ii in range(0, K):
+                grp.setdefault((Rth[m, ii], tau[m, ii]), []).append([m, ii])
+        for key in grp:
+            idx = np.array(grp[key])
+            a = (2*key[1]-dt[0])/(2*key[1]+dt[0])
+            b = (key[0]*dt[0])/(2*key[1]+dt[0])
+            Tb = np.zeros((len(idx), N))
+            Tb[:, 0] = Tend[idx[:, 1], idx[:, 0]]
+            zi = (a*Tb[:, 0] + b*Pv[idx[:, 0], 0]).reshape(-1, 1)
+            [Tb[:, 1:], _] = signal.lfilter([b, b], [1, -a], Pv[idx[:, 0], 1:], axis=-1, zi=zi)
+            if per and key[0] != 0:
+                Tb = Tb + np.outer(Tb[:, -1] / (1 - a**(N-1)), a**np.arange(0, N))
+            np.add.at(T, idx[:, 0], Tb)
+            Tend[idx[:, 1], idx[:, 0]] = Tb[:, -1]
+
+    # ==============================================================================
+    # Non-Equidistant
+    # ==============================================================================
+    # All nodes and branches are updated at once per sample, the periodic response is found in a second pass from the
+    # end temperatures of the first one
+    else:
+        for ii in range(0, 1+per):
+            Tb = Tend.T.copy()
+            Ab = np.ones((M, K))
+            T[:, 0] = np.sum(Tb, axis=1)
+            for i in range(1, N):
+                a = (2*tau-dt[i])/(2*tau+dt[i])
+                b = (Rth*dt[i])/(2*tau+dt[i])
+                Tb = a*Tb + b*(Pv[:, [i]]+Pv[:, [i-1]])
+                Ab = a*Ab
+                T[:, i] = np.sum(Tb, axis=1)
+            Tend = Tb.T
+            if ii < per:
+                Tend = np.divide(Tb, 1-Ab, out=np.zeros((M, K)), where=(Rth != 0)).T
 
     ###################################################################################################################
     # Post-Processing
     ###################################################################################################################
-    Tj = np.sum(T, axis=1) + Tc
-    Tend = T[-1, :]
+    # ==============================================================================
+    # Ambient
+    # ==============================================================================
+    Tj = T + Tc
+
+    # ==============================================================================
+    # Coupling
+    # ==============================================================================
+    # Nodes with a case node cpl >= 0 are superposed with its temperature rise
+    if cpl is not None:
+        idx = np.nonzero(np.asarray(cpl) >= 0)[0]
+        Tj[idx, :] = Tj[idx, :] + Tj[np.asarray(cpl)[idx], :] - Tc
 
     ###################################################################################################################
     # Return
     ###################################################################################################################
     return [Tj, Tend]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcTherRC(Tinit, Tc, Pv, t, Rth, Cth):
+    # Single Foster network of calcTherNet()
+    [Tj, Tend] = calcTherNet(np.reshape(Tinit*np.ones(len(Rth)), (-1, 1)), Tc, Pv, t, Rth, Cth)
+
+    return [Tj[0], Tend[:, 0]]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcTherBri(Tinit, Tc, Pv, t, net, per=0):
+    # Thermal network of a bridge, Foster networks per node or the shared heatsink model
+    if net['mdl'] == "shared":
+        return calcTherSS(Tinit, Tc, Pv, t, net, per)
+
+    return calcTherNet(Tinit, Tc, Pv, t, net['Rth'], net['Cth'], net['cpl'], per)
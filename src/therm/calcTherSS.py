@@ -0,0 +1,102 @@
+#######################################################################################################################
+#######################################################################################################################
+# Title:        PWM Distortion Toolkit for Standard Topologies
+# Topic:        Power Electronics
+# File:         calcTherSS
+# Date:         14.08.2023
+# Author:       Dr. Pascal A. Schirmer
+# Version:      V.0.2
+# Copyright:    Pascal Schirmer
+#######################################################################################################################
+#######################################################################################################################
+
+#######################################################################################################################
+# Import libs
+#######################################################################################################################
+# ==============================================================================
+# Internal
+# ==============================================================================
+
+# ==============================================================================
+# External
+# ==============================================================================
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg
+
+
+#######################################################################################################################
+# Discretisation
+#######################################################################################################################
+def disTherSS(net, dt):
+    # Trapezoidal discretisation x[k+1] = Ad*x[k] + Bd*(P[k] + P[k+1]), the sparse system is factorised once per dt
+    if dt not in net['dis']:
+        I = sparse.identity(np.size(net['A'], axis=0), format='csc')
+        lu = linalg.splu((I - dt / 2 * net['A']).tocsc())
+        net['dis'][dt] = [lu.solve((I + dt / 2 * net['A']).toarray()), lu.solve(dt / 2 * net['B'].toarray())]
+
+    return net['dis'][dt]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcTherSS(Xinit, Tc, Pv, t, net, per=0):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    # Every row of Pv is one input of the network (stacked nodes), Xinit and Xend are the states of the network, for
+    # per=1 the initial state is chosen such that the response is periodic over t and Xinit is ignored
+    Pv = np.atleast_2d(np.asarray(Pv, dtype=float))
+    N = np.size(Pv, axis=1)
+    n = np.size(net['A'], axis=0)
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    dt = np.diff(t)
+    X = np.zeros((N, n))
+    X[0] = Xinit * np.ones(n) * (1 - per)
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Equidistant
+    # ==============================================================================
+    # Inputs of all samples are mapped at once, one state update per sample
+    if N > 1 and np.allclose(dt, dt[0], rtol=1e-9, atol=0):
+        [Ad, Bd] = disTherSS(net, float(dt[0]))
+        W = (Bd @ (Pv[:, 1:] + Pv[:, :-1])).T
+        for ii in range(0, 1 + per):
+            for i in range(1, N):
+                X[i] = Ad @ X[i - 1] + W[i - 1]
+            if ii < per:
+                X[0] = np.linalg.solve(np.eye(n) - np.linalg.matrix_power(Ad, N - 1), X[-1])
+
+    # ==============================================================================
+    # Non-Equidistant
+    # ==============================================================================
+    else:
+        for ii in range(0, 1 + per):
+            Phi = np.eye(n)
+            for i in range(1, N):
+                [Ad, Bd] = disTherSS(net, float(dt[i - 1]))
+                X[i] = Ad @ X[i - 1] + Bd @ (Pv[:, i] + Pv[:, i - 1])
+                if per:
+                    Phi = Ad @ Phi
+            if ii < per:
+                X[0] = np.linalg.solve(np.eye(n) - Phi, X[-1])
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    Tj = (net['C'] @ X.T) + Tc
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return [Tj, X[-1]]
@@ -22,6 +22,7 @@
 # ==============================================================================
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
 
 #######################################################################################################################
@@ -83,3 +84,216 @@ def initRC(para, setupPara):
     # Return
     ###################################################################################################################
     return [Rth_JA, Cth_JA, Rth_DA, Cth_DA, Rth_CA, Cth_CA, Rth_JA_cap, Cth_JA_cap]
+
+
+#######################################################################################################################
+# Foster to Cauer
+#######################################################################################################################
+def fos2cau(Rth, Cth):
+    # Cauer ladder of a Foster network by continued fraction expansion, Cth[0] is the capacitance of the input node and
+    # Rth[i] connects node i to node i+1 (the last one to ambient)
+    num = np.zeros(1)
+    den = np.ones(1)
+    for i in range(0, len(Rth)):
+        num = np.polyadd(np.polymul(num, [Rth[i] * Cth[i], 1]), Rth[i] * den)
+        den = np.polymul(den, [Rth[i] * Cth[i], 1])
+    num = np.trim_zeros(num, 'f')
+
+    # Continued fraction
+    R = np.zeros(len(Rth))
+    C = np.zeros(len(Rth))
+    for i in range(0, len(Rth)):
+        C[i] = den[0] / num[0]
+        den = np.polysub(den, np.polymul([C[i], 0], num))[1:]
+        R[i] = num[0] / den[0]
+        num = np.polysub(num, R[i] * den)[1:]
+
+    # Lumped network if the expansion is not physical
+    if not (np.all(R > 0) and np.all(C > 0)):
+        print("WARN: Cauer network of the heatsink not physical, lumped RC element is used")
+        R = np.array([np.sum(Rth)])
+        C = np.array([np.sum(Rth * Cth) / np.sum(Rth)])
+
+    return [R, C]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def initRCSS(para, setupPara, Nsw):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # MSG IN
+    # ==============================================================================
+    print("INFO: Initialise shared heatsink network")
+
+    # ==============================================================================
+    # Loading Data
+    # ==============================================================================
+    vec = para['Swi']['Ther']['vec']
+    [Rth_JC, Cth_JC, Rth_DC, Cth_DC, Rth_CA, Cth_CA] = [vec[x].values[np.logical_not(pd.isna(vec[x].values))] for x in
+                                                        ['Rth_JC', 'Cth_JC', 'Rth_DC', 'Cth_DC', 'Rth_CA', 'Cth_CA']]
+    vec = para['Cap']['Ther']['vec']
+    [Rth_JC_cap, Cth_JC_cap, Rth_CA_cap, Cth_CA_cap] = [vec[x].values[np.logical_not(pd.isna(vec[x].values))] for x in
+                                                        ['Rth_JC', 'Cth_JC', 'Rth_CA', 'Cth_CA']]
+
+    # ==============================================================================
+    # Junctions
+    # ==============================================================================
+    # Foster networks of the transistors, diodes and the capacitor on top of their case node (input row of Pv)
+    fos = [[Rth_JC, Cth_JC, i] for i in range(0, Nsw)]
+    fos += [[Rth_DC, Cth_DC, Nsw + i] for i in range(0, Nsw)]
+    fos += [[Rth_JC_cap, Cth_JC_cap, 3 * Nsw]]
+
+    # ==============================================================================
+    # Cases
+    # ==============================================================================
+    # Cauer ladders from the case to ambient of the Nsw switches and the capacitor, the last node of every ladder is
+    # the shared heatsink node
+    cau = [fos2cau(Rth_CA, Cth_CA)] * Nsw + [fos2cau(Rth_CA_cap, Cth_CA_cap)]
+    Gcpl = setupPara['Ther']['Gth'] * np.ones((Nsw + 1, Nsw + 1))
+    if np.ndim(setupPara['Ther']['Gth']) == 0:
+        Gcpl[Nsw, :] = 0
+        Gcpl[:, Nsw] = 0
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    Nf = int(np.sum([len(x[0]) for x in fos]))
+    Nc = int(np.sum([len(x[0]) - 1 for x in cau])) + 1
+    Gth = np.zeros((Nc, Nc))
+    Cn = np.zeros(Nc)
+    Pn = np.zeros((Nc, 3 * Nsw + 1))
+    node = np.zeros(Nsw + 1, dtype=int)
+    A = []
+    B = []
+    C = []
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Foster States
+    # ==============================================================================
+    n = 0
+    for x in fos:
+        for ii in range(0, len(x[0])):
+            A.append([n, n, -1 / (x[0][ii] * x[1][ii])])
+            B.append([n, x[2], 1 / x[1][ii]])
+            C.append([x[2], n, 1])
+            n = n + 1
+
+    # ==============================================================================
+    # Node States
+    # ==============================================================================
+    # ------------------------------------------
+    # Ladders
+    # ------------------------------------------
+    n = 0
+    for i in range(0, len(cau)):
+        [R, Cs] = cau[i]
+        idx = np.append(n + 1 + np.arange(0, len(R) - 1), 0)
+        node[i] = idx[0]
+        n = n + len(R) - 1
+        for ii in range(0, len(R)):
+            Cn[idx[ii]] = Cn[idx[ii]] + Cs[ii]
+            if ii < len(R) - 1:
+                Gth[np.ix_(idx[ii:ii + 2], idx[ii:ii + 2])] += np.array([[1, -1], [-1, 1]]) / R[ii]
+            else:
+                Gth[idx[ii], idx[ii]] += 1 / R[ii]
+
+    # ------------------------------------------
+    # Coupling
+    # ------------------------------------------
+    # Devices on a single node ladder share the heatsink node and are not coupled further
+    for i in range(0, Nsw + 1):
+        for ii in range(i + 1, Nsw + 1):
+            if node[i] != node[ii]:
+                Gth[np.ix_(node[[i, ii]], node[[i, ii]])] += np.array([[1, -1], [-1, 1]]) * Gcpl[i, ii]
+
+    # ------------------------------------------
+    # Losses
+    # ------------------------------------------
+    # Transistor and diode losses heat the case of their switch, the capacitor losses its own case
+    for i in range(0, Nsw):
+        Pn[node[i], [i, Nsw + i]] = 1
+    Pn[node[Nsw], 3 * Nsw] = 1
+
+    # ------------------------------------------
+    # Outputs
+    # ------------------------------------------
+    for i in range(0, Nsw):
+        for ii in [i, Nsw + i, 2 * Nsw + i]:
+            C.append([ii, Nf + node[i], 1])
+    C.append([3 * Nsw, Nf + node[Nsw], 1])
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    A = np.array(A).T
+    B = np.array(B).T
+    C = np.array(C).T
+    A = sparse.block_diag((sparse.csc_matrix((A[2], (A[0], A[1])), shape=(Nf, Nf)),
+                           sparse.csc_matrix(-Gth / Cn.reshape(-1, 1))), format='csc')
+    B = sparse.vstack((sparse.csc_matrix((B[2], (B[0], B[1])), shape=(Nf, 3 * Nsw + 1)),
+                       sparse.csc_matrix(Pn / Cn.reshape(-1, 1))), format='csc')
+    C = sparse.csc_matrix((C[2], (C[0], C[1])), shape=(3 * Nsw + 1, Nf + Nc))
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return {'A': A, 'B': B, 'C': C, 'dis': {}}
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def initRCNet(para, setupPara, Nsw, cpl):
+    ###################################################################################################################
+    # Shared Heatsink
+    ###################################################################################################################
+    # All switches and the capacitor on one heatsink, solved as one state-space model
+    if setupPara['Ther']['Network'] == "shared":
+        net = initRCSS(para, setupPara, Nsw)
+        net['mdl'] = "shared"
+        net['cpl'] = -np.ones(3 * Nsw + 1, dtype=int)
+        return net
+
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    [Rth_JA, Cth_JA, Rth_DA, Cth_DA, Rth_CA, Cth_CA, Rth_JA_cap, Cth_JA_cap] = initRC(para, setupPara)
+
+    # ==============================================================================
+    # Nodes
+    # ==============================================================================
+    # Nsw transistors, Nsw diodes, Nsw case nodes and the capacitor, branches padded with zeros
+    node = [[Rth_JA, Cth_JA]] * Nsw + [[Rth_DA, Cth_DA]] * Nsw + [[Rth_CA, Cth_CA]] * Nsw + [[Rth_JA_cap, Cth_JA_cap]]
+    K = max([len(x[0]) for x in node])
+    Rth = np.zeros((len(node), K))
+    Cth = np.zeros((len(node), K))
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Foster Networks
+    # ==============================================================================
+    for i in range(0, len(node)):
+        Rth[i, 0:len(node[i][0])] = node[i][0]
+        Cth[i, 0:len(node[i][1])] = node[i][1]
+
+    # ==============================================================================
+    # Coupling
+    # ==============================================================================
+    # Transistors and diodes are superposed with the case node of their switch
+    idx = -np.ones(len(node), dtype=int)
+    if cpl:
+        idx[0:2 * Nsw] = np.tile(np.arange(2 * Nsw, 3 * Nsw), 2)
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return {'mdl': "foster", 'Rth': Rth, 'Cth': Cth, 'cpl': idx}
@@ -17,6 +17,8 @@
 # Internal
 # ==============================================================================
 from src.general.helpFnc import cbInter, con2dis, deadTime
+from src.general.genSwEvent import genEvt_CB, genEvt_OPP, evt2dense, dense2evt, evtDeadTime, evtMinPulse
+from src.general.OPP import oppPulse, oppAngles
 
 # ==============================================================================
 # External
@@ -32,6 +34,13 @@ def calcSSeqB2_CB(ref, t, Mi, setupPara, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Parameters
     # ==============================================================================
@@ -61,12 +70,16 @@ def calcSSeqB2_CB(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     if setupPara['PWM']['tri'] == "RE":
         c = signal.sawtooth(2*np.pi*fs*t, 1) * (-1)
+        car = [1, 0, -1]
     elif setupPara['PWM']['tri'] == "FE":
         c = signal.sawtooth(2*np.pi*fs*(t - 0.5/fs), 0) * (-1)
+        car = [0, 0.5, -1]
     elif setupPara['PWM']['tri'] == "AM":
         c = signal.sawtooth(2*np.pi*fs*t, 1/3) * (-1)
+        car = [1/3, 0, -1]
     else:
         c = signal.sawtooth(2*np.pi*fs*t, 0.5) * (-1)
+        car = [0.5, 0, -1]
     c = (2 * (c - min(c))/(max(c)-min(c))) - 1
 
     # ==============================================================================
@@ -75,10 +88,10 @@ def calcSSeqB2_CB(ref, t, Mi, setupPara, setupTopo):
     if setupPara['PWM']['samp'] == "RS":
         if setupPara['PWM']['upd'] == "SE":
             xs = con2dis(x, t, Ts)
-            xsh = np.roll(x, int(len(xs)*fel/fs))
+            xsh = np.roll(x, int(np.shape(xs)[-1]*fel/fs), axis=-1)
         else:
             xs = con2dis(x, t, Ts/2)
-            xsh = np.roll(x, int(len(xs)*fel/fs/2))
+            xsh = np.roll(x, int(np.shape(xs)[-1]*fel/fs/2), axis=-1)
     else:
         xs = x
         xsh = x
@@ -86,7 +99,12 @@ def calcSSeqB2_CB(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Intersections
     # ==============================================================================
-    s = cbInter(xs, c, Mi, tmin)
+    if setupPara['PWM']['evt'] == 1:
+        evt = genEvt_CB(x, t, Mi, car, setupPara)
+        if setupPara['PWM']['tmin'] > 0:
+            evt = evtMinPulse(evt, setupPara['PWM']['tmin'])
+    else:
+        s = cbInter(xs, c, Mi, tmin)
             
     ###################################################################################################################
     # Post-Processing
@@ -94,13 +112,19 @@ def calcSSeqB2_CB(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Dead-time
     # ==============================================================================
-    if setupPara['PWM']['td'] > 0:
-        s = deadTime(s, td)
+    if setupPara['PWM']['evt'] == 1:
+        if setupPara['PWM']['td'] > 0:
+            evt = evtDeadTime(evt, setupPara['PWM']['td'])
+        s = evt2dense(evt, t)
+    else:
+        if setupPara['PWM']['td'] > 0:
+            s = deadTime(s, td)
+        evt = dense2evt(s, t)
     
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c]
+    return [xs, xsh, s, c, evt]
 
 
 #######################################################################################################################
@@ -110,6 +134,13 @@ def calcSSeqB2_FF(ref, t, Mi, _, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Init
     # ==============================================================================
@@ -135,15 +166,100 @@ def calcSSeqB2_FF(ref, t, Mi, _, setupTopo):
     ###################################################################################################################
     # Calculation
     ###################################################################################################################
-    s = signal.square(2 * np.pi * fel * t, duty=0.5)
+    s = signal.square(2 * np.pi * fel * t, duty=0.5) * np.ones(np.shape(x))
             
     ###################################################################################################################
     # Post-Processing
     ###################################################################################################################
     xs = x
     xsh = x
+    evt = dense2evt(s, t)
     
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c]
+    return [xs, xsh, s, c, evt]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcSSeqB2_OPP(ref, t, Mi, setupPara, setupTopo):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    fel = setupTopo['fel']
+    p0 = oppPulse(setupPara, setupTopo)
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    td = int(setupPara['PWM']['td']/(t[1]-t[0]))
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Carrier
+    # ==============================================================================
+    c = np.zeros(np.size(t))
+
+    # ==============================================================================
+    # Scale reference
+    # ==============================================================================
+    x = Mi * ref / np.max(ref)
+    phi = np.arctan2(np.sum(ref * np.cos(2*np.pi*fel*t)), np.sum(ref * np.sin(2*np.pi*fel*t)))
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Switching angles
+    # ==============================================================================
+    alpha = oppAngles(Mi, p0)
+    if np.ndim(Mi) == 0:
+        alpha = alpha[0]
+
+    # ==============================================================================
+    # Switching events
+    # ==============================================================================
+    evt = genEvt_OPP(alpha, phi, t, fel)
+    if setupPara['PWM']['tmin'] > 0:
+        evt = evtMinPulse(evt, setupPara['PWM']['tmin'])
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Dead-time
+    # ==============================================================================
+    if setupPara['PWM']['evt'] == 1:
+        if setupPara['PWM']['td'] > 0:
+            evt = evtDeadTime(evt, setupPara['PWM']['td'])
+        s = evt2dense(evt, t)
+    else:
+        s = evt2dense(evt, t)
+        if setupPara['PWM']['td'] > 0:
+            s = deadTime(s, td)
+        evt = dense2evt(s, t)
+
+    # ==============================================================================
+    # Output
+    # ==============================================================================
+    xs = x
+    xsh = x
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return [xs, xsh, s, c, evt]
@@ -16,19 +16,20 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
-from src.topo.B2.calcSSeqB2 import calcSSeqB2_CB, calcSSeqB2_FF
+from src.topo.B2.calcSSeqB2 import calcSSeqB2_CB, calcSSeqB2_FF, calcSSeqB2_OPP
+from src.general.genPattern import genPattern
 from src.topo.B2.calcTimeB2 import calcTimeB2
 from src.general.calcFreq import calcFreq
-from src.elec.calcElecSwi import calcElecSwi
-from src.elec.calcLossSwi import calcLossSwi
+from src.elec.calcLossSwi import calcMemBri
 from src.elec.calcLossCap import calcLossCap
-from src.therm.calcTherRC import calcTherRC
+from src.therm.calcTherRC import calcTherBri, lossNet
 from src.topo.B2.initB2 import initB2
 from src.general.genWaveform import genWave
-from src.therm.initRC import initRC
+from src.therm.initRC import initRCNet
 from src.elec.calcElecCap import calcElecCap
 from src.topo.B2.outB2 import outB2_Steady
 from src.general.calcAvg import calcAvg
+from src.general.helpFnc import bri2col, col2bri, accFix
 
 # ==============================================================================
 # External
@@ -74,7 +75,7 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     K = setupData['stat']['cyc']
     W = setupData['stat']['W']
     Mi = setupData['stat']['Mi']
-    start = int(N) * 2
+    start = 0 if setupExp['pss'] == 1 or setupExp['solver'] == 'freq' else int(N) * 2
     ende = int(K * N + 1)
 
     # ------------------------------------------
@@ -98,6 +99,8 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     T_ca = setupData['stat']['Tj']
     T_old = setupData['stat']['Tj']
     iter = 0
+    acc = {}
+    memSw = {}
 
     # ==============================================================================
     # Variables
@@ -127,15 +130,7 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ------------------------------------------
     # Load
     # ------------------------------------------
-    [Rth_JA, Cth_JA, Rth_DA, Cth_DA, Rth_CA, Cth_CA, Rth_JA_cap, Cth_JA_cap] = initRC(para, setupPara)
-
-    # ------------------------------------------
-    # Variables
-    # ------------------------------------------
-    Tinit_T = np.zeros((len(Rth_JA), 2))
-    Tinit_D = np.zeros((len(Rth_DA), 2))
-    Tinit_K = np.zeros((len(Rth_CA), 2))
-    Tinit_C = np.zeros(np.size(Rth_JA_cap))
+    net = initRCNet(para, setupPara, 2, setupPara['Ther']['Coupling'] == 1)
 
     ###################################################################################################################
     # Calculation (Stationary)
@@ -144,16 +139,24 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # Switching Function
     # ==============================================================================
     if setupPara['PWM']['type'] == "FF":
-        [xs, xsh, s, c] = calcSSeqB2_FF(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_FF, v_ref, t, Mi, setupPara, setupTopo)
     elif setupPara['PWM']['type'] == "CB":
-        [xs, xsh, s, c] = calcSSeqB2_CB(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_CB, v_ref, t, Mi, setupPara, setupTopo)
+    elif setupPara['PWM']['type'] == "OPP":
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_OPP, v_ref, t, Mi, setupPara, setupTopo)
     else:
-        [xs, xsh, s, c] = calcSSeqB2_CB(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_CB, v_ref, t, Mi, setupPara, setupTopo)
 
     # ==============================================================================
     # Time Domain
     # ==============================================================================
-    [timeAc, timeDc] = calcTimeB2(t, s, e_ref, Vdc, Mi, mdl, setupTopo, start, ende)
+    [timeAc, timeDc, spec] = calcTimeB2(t, s, e_ref, Vdc, Mi, mdl, setupTopo, start, ende, setupExp, evt)
+
+    # ==============================================================================
+    # Bridge
+    # ==============================================================================
+    # Gate signals of the high and low side switch (switches x samples), both carry the phase current
+    i_G = np.array([s[start:ende] * (+1), s[start:ende] * (-1)])
 
     # ==============================================================================
     # Msg
@@ -168,67 +171,32 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # ------------------------------------------
         # Electrical
         # ------------------------------------------
-        # Switches
-        timeElec['sw']['S1'] = calcElecSwi(Vdc, timeAc['i_a'], (s[start:ende] == +1), T_sw[0], 'HS', para, setupPara)
-        timeElec['sw']['S2'] = calcElecSwi(Vdc, timeAc['i_a'], (s[start:ende] == -1), T_sw[1], 'LS', para, setupPara)
+        # Switches (electrical values and losses)
+        [elecSw, lossSw] = calcMemBri(Vdc, timeAc['i_a'], i_G, T_sw[0:2], ['HS', 'LS'], memSw, para, setupPara, setupExp)
 
         # Capacitor
         timeDc['v_dc'] = calcElecCap(t, timeDc['i_c'], T_ca, para, setupPara, setupTopo)
+        spec.pop('v_dc', None)
         timeElec['cap']['C1']['i_c'] = timeDc['i_c']
         timeElec['cap']['C1']['v_c'] = timeDc['v_dc']
 
         # ------------------------------------------
         # Losses
         # ------------------------------------------
-        # Switches
-        timeLoss['sw']['S1'] = calcLossSwi(s[start:ende] * (+1), timeElec['sw']['S1']['i_T'],
-                                           timeElec['sw']['S1']['i_D'], timeElec['sw']['S1']['v_T'],
-                                           timeElec['sw']['S1']['v_D'], T_sw[0], para, setupPara, setupExp)
-        timeLoss['sw']['S2'] = calcLossSwi(s[start:ende] * (-1), timeElec['sw']['S2']['i_T'],
-                                           timeElec['sw']['S2']['i_D'], timeElec['sw']['S2']['v_T'],
-                                           timeElec['sw']['S2']['v_D'], T_sw[1], para, setupPara, setupExp)
-
         # Capacitor
         timeLoss['cap']['C1'] = calcLossCap(t, timeDc['i_c'], T_ca, para, setupPara, setupTopo)
 
-        # ------------------------------------------
-        # Init Thermal
-        # ------------------------------------------
-        if iter == 0:
-            # Switches
-            Tinit_T[:, 0] = np.mean(timeLoss['sw']['S1']['p_T']) * Rth_JA
-            Tinit_D[:, 0] = np.mean(timeLoss['sw']['S1']['p_D']) * Rth_DA
-            Tinit_T[:, 1] = np.mean(timeLoss['sw']['S2']['p_T']) * Rth_JA
-            Tinit_D[:, 1] = np.mean(timeLoss['sw']['S2']['p_D']) * Rth_DA
-            if setupPara['Ther']['Coupling'] == 1:
-                Tinit_K[:, 0] = np.mean(timeLoss['sw']['S1']['p_L']) * Rth_CA
-                Tinit_K[:, 1] = np.mean(timeLoss['sw']['S2']['p_L']) * Rth_CA
-
-            # Capacitor
-            Tinit_C = np.mean(timeLoss['cap']['C1']['p_L']) * Rth_JA_cap
-
         # ------------------------------------------
         # Thermal
         # ------------------------------------------
-        # Switches
-        [timeTher['sw']['T1'], Tinit_T[:, 0]] = calcTherRC(Tinit_T[:, 0], Tc, timeLoss['sw']['S1']['p_T'], t[start:ende], Rth_JA, Cth_JA)
-        [timeTher['sw']['T2'], Tinit_T[:, 1]] = calcTherRC(Tinit_T[:, 1], Tc, timeLoss['sw']['S2']['p_T'], t[start:ende], Rth_JA, Cth_JA)
-        [timeTher['sw']['D1'], Tinit_D[:, 0]] = calcTherRC(Tinit_D[:, 0], Tc, timeLoss['sw']['S1']['p_D'], t[start:ende], Rth_DA, Cth_DA)
-        [timeTher['sw']['D2'], Tinit_D[:, 1]] = calcTherRC(Tinit_D[:, 1], Tc, timeLoss['sw']['S2']['p_D'], t[start:ende], Rth_DA, Cth_DA)
-
-        if setupPara['Ther']['Coupling'] == 1:
-            [timeTher['sw']['C1'], Tinit_K[:, 0]] = calcTherRC(Tinit_K[:, 0], Tc, timeLoss['sw']['S1']['p_L'], t[start:ende], Rth_CA, Cth_CA)
-            [timeTher['sw']['C2'], Tinit_K[:, 1]] = calcTherRC(Tinit_K[:, 1], Tc, timeLoss['sw']['S1']['p_L'], t[start:ende], Rth_CA, Cth_CA)
-            timeTher['sw']['T1'] = timeTher['sw']['T1'][:] + timeTher['sw']['C1'] - Tc
-            timeTher['sw']['D1'] = timeTher['sw']['D1'][:] + timeTher['sw']['C1'] - Tc
-            timeTher['sw']['T2'] = timeTher['sw']['T2'][:] + timeTher['sw']['C2'] - Tc
-            timeTher['sw']['D2'] = timeTher['sw']['D2'][:] + timeTher['sw']['C2'] - Tc
-        else:
-            timeTher['sw']['C1'] = Tc * np.ones(np.size(s['A'][start:ende]))
-            timeTher['sw']['C2'] = Tc * np.ones(np.size(s['A'][start:ende]))
+        # Switches (periodic steady-state of the losses)
+        Pv = lossNet(lossSw, timeLoss['cap']['C1']['p_L'], net['cpl'])
+        [Tther, _] = calcTherBri(0, Tc, Pv, t[start:ende], net, per=1)
+        for i in range(0, len(['T1', 'T2', 'D1', 'D2', 'C1', 'C2'])):
+            timeTher['sw'][['T1', 'T2', 'D1', 'D2', 'C1', 'C2'][i]] = Tther[i]
 
         # Capacitor
-        [timeTher['cap']['C1'], Tinit_C] = calcTherRC(Tinit_C, Tc, timeLoss['cap']['C1']['p_L'], t[start:ende], Rth_JA_cap, Cth_JA_cap)
+        timeTher['cap']['C1'] = Tther[-1]
 
         # ------------------------------------------
         # Error
@@ -239,12 +207,23 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # Update Para
         # ------------------------------------------
         if setupExp['loop'] == "CL":
-            # Switches
-            T_sw[0] = np.mean(timeTher['sw']['T1'])
-            T_sw[1] = np.mean(timeTher['sw']['T2'])
-
-            # Capacitor
-            T_ca = np.mean(timeTher['cap']['C1'])
+            # Switches and capacitor (mean temperatures as fixed point of the electro-thermal loop)
+            T_fix = [np.mean(timeTher['sw'][x]) for x in ['T1', 'T2']] + [np.mean(timeTher['cap']['C1'])]
+            [T_new, acc] = accFix(np.append(T_sw[0:2], T_ca), T_fix, acc, setupExp['acc'])
+            T_sw[0:2, 0] = T_new[0:-1]
+            T_ca = T_new[-1]
+
+            # Error of the accelerated iteration (fixed-point residual)
+            if setupExp['acc'] != "none":
+                err = acc['res'] / np.mean(T_fix)
+
+            # Diagnostics
+            if setupExp['debug'] >= 1:
+                print("ITER: %d) Fixed-point residual %.4f K with %s acceleration (%d iterates)" % (
+                      iter + 1, acc['res'], setupExp['acc'], len(acc['f'])))
+        else:
+            # Losses independent of the temperature, the periodic thermal solution is final
+            err = 0
 
         # Iteration
         iter = iter + 1
@@ -257,7 +236,7 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # ------------------------------------------
         if iter < int(setupExp['int']):
             print("ITER: %d) Stationary temperature T_swi=%.2f C (T_cap=%.2f C) and P_swi=%.2f W (Pv_cap=%.2f W) with error: %.2f %%" % (
-                  iter, T_sw[0], T_ca, np.mean(timeLoss['sw']['S1']['p_L']), np.mean(timeLoss['cap']['C1']['p_L']), err * 100))
+                  iter, T_sw[0], T_ca, np.mean(lossSw['p_L'][0]), np.mean(timeLoss['cap']['C1']['p_L']), err * 100))
         else:
             print("ITER: %d) Maximum iteration reached" % iter)
             break
@@ -271,6 +250,12 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     ###################################################################################################################
     # Post-Processing
     ###################################################################################################################
+    # ==============================================================================
+    # Switches
+    # ==============================================================================
+    timeElec['sw'].update(bri2col(elecSw, ['S1', 'S2']))
+    timeLoss['sw'].update(bri2col(lossSw, ['S1', 'S2']))
+
     # ==============================================================================
     # Averaging
     # ==============================================================================
@@ -291,8 +276,8 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     for c0 in out:
         for c1 in out[c0]:
             for c2 in out[c0][c1]:
-                out[c0][c1][c2] = out[c0][c1][c2].iloc[0:int(ende - start)]
-                out[c0][c1][c2] = out[c0][c1][c2].reset_index(drop=True)
+                for c3 in out[c0][c1][c2]:
+                    out[c0][c1][c2][c3] = out[c0][c1][c2][c3][0:int(ende - start)]
 
     # ------------------------------------------
     # Out
@@ -303,35 +288,27 @@ def calcSteadyB2(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ==============================================================================
     # Update Thermal
     # ==============================================================================
+    # ------------------------------------------
+    # Losses
+    # ------------------------------------------
+    Pv = lossNet(col2bri(timeLoss['sw'], ['S1', 'S2']), timeLoss['cap']['C1']['p_L'], net['cpl'])
+
     # ------------------------------------------
     # Switches
     # ------------------------------------------
-    # Normal
-    [timeTher['sw']['T1'], _] = calcTherRC(Tinit_T[:, 0], Tc, timeLoss['sw']['S1']['p_T'], t[start:ende], Rth_JA, Cth_JA)
-    [timeTher['sw']['T2'], _] = calcTherRC(Tinit_T[:, 1], Tc, timeLoss['sw']['S2']['p_T'], t[start:ende], Rth_JA, Cth_JA)
-    [timeTher['sw']['D1'], _] = calcTherRC(Tinit_D[:, 0], Tc, timeLoss['sw']['S1']['p_D'], t[start:ende], Rth_DA, Cth_DA)
-    [timeTher['sw']['D2'], _] = calcTherRC(Tinit_D[:, 1], Tc, timeLoss['sw']['S2']['p_D'], t[start:ende], Rth_DA, Cth_DA)
-
-    # Coupling
-    if setupPara['Ther']['Coupling'] == 1:
-        [timeTher['sw']['C1'], _] = calcTherRC(Tinit_K[:, 0], Tc, timeLoss['sw']['S1']['p_L'], t[start:ende], Rth_CA, Cth_CA)
-        [timeTher['sw']['C2'], _] = calcTherRC(Tinit_K[:, 1], Tc, timeLoss['sw']['S1']['p_L'], t[start:ende], Rth_CA, Cth_CA)
-        timeTher['sw']['T1'] = timeTher['sw']['T1'][:] + timeTher['sw']['C1'] - Tc
-        timeTher['sw']['D1'] = timeTher['sw']['D1'][:] + timeTher['sw']['C1'] - Tc
-        timeTher['sw']['T2'] = timeTher['sw']['T2'][:] + timeTher['sw']['C2'] - Tc
-        timeTher['sw']['D2'] = timeTher['sw']['D2'][:] + timeTher['sw']['C2'] - Tc
-    else:
-        timeTher['sw']['C1'] = Tc * np.ones(np.size(s['A'][start:ende]))
-        timeTher['sw']['C2'] = Tc * np.ones(np.size(s['A'][start:ende]))
+    [Tther, _] = calcTherBri(0, Tc, Pv, t[start:ende], net, per=1)
+    for i in range(0, len(['T1', 'T2', 'D1', 'D2', 'C1', 'C2'])):
+        timeTher['sw'][['T1', 'T2', 'D1', 'D2', 'C1', 'C2'][i]] = Tther[i]
+
     # ------------------------------------------
     # Capacitor
     # ------------------------------------------
-    [timeTher['cap']['C1'], _] = calcTherRC(Tinit_C, Tc, timeLoss['cap']['C1']['p_L'], t[start:ende], Rth_JA_cap, Cth_JA_cap)
+    timeTher['cap']['C1'] = Tther[-1]
 
     # ==============================================================================
     # Frequency domain
     # ==============================================================================
-    [freqSw, freqAc, freqDc] = calcFreq(s[start:ende], xs[start:ende], timeAc, timeDc)
+    [freqSw, freqAc, freqDc] = calcFreq(s[start:ende], xs[start:ende], timeAc, timeDc, spec)
     
     # ==============================================================================
     # Output
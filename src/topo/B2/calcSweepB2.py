@@ -16,7 +16,8 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
-from src.topo.B2.calcSSeqB2 import calcSSeqB2_CB, calcSSeqB2_FF
+from src.topo.B2.calcSSeqB2 import calcSSeqB2_CB, calcSSeqB2_FF, calcSSeqB2_OPP
+from src.general.genPattern import genPattern, batMax
 from src.topo.B2.calcDistB2 import calcDistB2_Ana
 from src.general.calcDistNum import calcDistNum
 from src.general.calcFreq import calcFreq
@@ -99,7 +100,7 @@ def calcSweepB2(mdl, _, setupTopo, setupData, setupPara, setupExp):
     # ==============================================================================
     # Start and End
     # ==============================================================================
-    start = int(N) * 2
+    start = 0 if setupExp['pss'] == 1 or setupExp['solver'] == 'freq' else int(N) * 2
     ende = int(K * N + 1)
     
     ###################################################################################################################
@@ -112,51 +113,58 @@ def calcSweepB2(mdl, _, setupTopo, setupData, setupPara, setupExp):
     # Switching Function
     # ------------------------------------------
     if setupPara['PWM']['type'] == "FF":
-        [xs, xsh, s, c] = calcSSeqB2_FF(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_FF, v_ref, t, Mi, setupPara, setupTopo)
     elif setupPara['PWM']['type'] == "CB":
-        [xs, xsh, s, c] = calcSSeqB2_CB(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_CB, v_ref, t, Mi, setupPara, setupTopo)
+    elif setupPara['PWM']['type'] == "OPP":
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_OPP, v_ref, t, Mi, setupPara, setupTopo)
     else:
-        [xs, xsh, s, c] = calcSSeqB2_CB(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB2_CB, v_ref, t, Mi, setupPara, setupTopo)
 
     # ------------------------------------------
     # Time Domain
     # ------------------------------------------
-    [timeAc, timeDc] = calcTimeB2(t, s, e_ref, Vdc, Mi, mdl, setupTopo, start, ende)
+    [timeAc, timeDc, spec] = calcTimeB2(t, s, e_ref, Vdc, Mi, mdl, setupTopo, start, ende, setupExp, evt)
     
     # ==============================================================================
     # Sweeping
     # ==============================================================================
-    for i in tqdm(range(len(M_i)), desc='Sweep'):
+    # The modulation indices are swept in batches sharing carrier, time base and sampling grid
+    nB = max(1, int(batMax / len(t)))
+    for i in tqdm(range(0, W, nB), desc='Sweep'):
         # ------------------------------------------
         # Switching
         # ------------------------------------------
+        idx = np.arange(i, min(i + nB, W))
         if setupPara['PWM']['type'] == "FF":
-            [_, _, s, _] = calcSSeqB2_FF(v_ref, t, M_i[i], setupPara, setupTopo)
+            [_, _, sB, _, evtB] = genPattern(calcSSeqB2_FF, v_ref, t, M_i[idx], setupPara, setupTopo)
         elif setupPara['PWM']['type'] == "CB":
-            [_, _, s, _] = calcSSeqB2_CB(v_ref, t, M_i[i], setupPara, setupTopo)
+            [_, _, sB, _, evtB] = genPattern(calcSSeqB2_CB, v_ref, t, M_i[idx], setupPara, setupTopo)
+        elif setupPara['PWM']['type'] == "OPP":
+            [_, _, sB, _, evtB] = genPattern(calcSSeqB2_OPP, v_ref, t, M_i[idx], setupPara, setupTopo)
         else:
-            [_, _, s, _] = calcSSeqB2_CB(v_ref, t, M_i[i], setupPara, setupTopo)
+            [_, _, sB, _, evtB] = genPattern(calcSSeqB2_CB, v_ref, t, M_i[idx], setupPara, setupTopo)
         
         # ------------------------------------------
         # Time
         # ------------------------------------------
-        [tempTimeAc, tempTimeDc] = calcTimeB2(t, s, e_ref, Vdc, M_i[i], mdl, setupTopo, start, ende)
+        [tempTimeAc, tempTimeDc, tempSpec] = calcTimeB2(t, sB, e_ref, Vdc, M_i[idx], mdl, setupTopo, start, ende, setupExp, evtB)
         
         # ------------------------------------------
         # Distortion
         # ------------------------------------------
-        [numDistAc, numDistDc] = calcDistNum(t[start:ende], tempTimeAc['i_a'], tempTimeAc['v_a'], tempTimeDc['i_dc'], tempTimeDc['v_dc'], Vdc, fel)
-        [anaTimeAc, anaTimeDc] = calcDistB2_Ana(M_i[i], Vdc, setupTopo, setupPara)
+        [numDistAc, numDistDc] = calcDistNum(t[start:ende], tempTimeAc['i_a'], tempTimeAc['v_a'], tempTimeDc['i_dc'], tempTimeDc['v_dc'], Vdc, fel, tempSpec)
+        [anaTimeAc, anaTimeDc] = calcDistB2_Ana(M_i[idx], Vdc, setupTopo, setupPara)
         
         # ------------------------------------------
         # Output
         # ------------------------------------------
         for c1 in numDistAc:
-            distAc['num'][c1][i] = numDistAc[c1]
-            distAc['ana'][c1][i] = anaTimeAc[c1]
+            distAc['num'][c1][idx] = numDistAc[c1]
+            distAc['ana'][c1][idx] = anaTimeAc[c1]
         for c1 in numDistDc:
-            distDc['num'][c1][i] = numDistDc[c1]
-            distDc['ana'][c1][i] = anaTimeDc[c1]
+            distDc['num'][c1][idx] = numDistDc[c1]
+            distDc['ana'][c1][idx] = anaTimeDc[c1]
 
     ###################################################################################################################
     # Post-Processing
@@ -164,7 +172,7 @@ def calcSweepB2(mdl, _, setupTopo, setupData, setupPara, setupExp):
     # ==============================================================================
     # Frequency domain
     # ==============================================================================
-    [freqSw, freqAc, freqDc] = calcFreq(s[start:ende], xs[start:ende], timeAc, timeDc)
+    [freqSw, freqAc, freqDc] = calcFreq(s[start:ende], xs[start:ende], timeAc, timeDc, spec)
 
     # ==============================================================================
     # Output
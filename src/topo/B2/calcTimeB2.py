@@ -16,23 +16,44 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import lsimBatch, fsimBatch, esimBatch, evtCorr
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
-import scipy.signal as sig
+from scipy.fft import rfft
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
+def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende, setupExp, evt=None):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # Rows of s belong to a vector of modulation indices
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
+    # ==============================================================================
+    # Solver
+    # ==============================================================================
+    # Time domain (lsim), frequency domain (periodic solution on the FFT grid of t) or event-driven (exact between the
+    # switching edges of evt), the spectra of the frequency domain solver are returned if the solution covers the
+    # output window
+    pss = setupExp['pss']
+    fdom = setupExp['solver'] == 'freq'
+    edom = setupExp['solver'] == 'evt' and evt is not None
+    mdlL = 'OutLoad' if setupTopo['outFilter'] == 1 else 'Load'
+    P = ende - start - 1
+
     timeAc = {}
     timeDc = {}
+    spec = {}
     
     ###################################################################################################################
     # Calculation
@@ -50,8 +71,13 @@ def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ------------------------------------------
     if setupTopo['outFilter'] == 0:
         v_L = v_a0
+    elif fdom:
+        [v_L, _] = fsimBatch(mdl['SS']['Out'], v_a0, t)
+    elif edom:
+        c = 0.5 * Vdc * evtCorr(mdl['SS']['Out'], evt, t)
+        v_L = esimBatch(mdl['SS']['Out'], v_a0, t, c, X0=v_a0[..., 0], per=pss)
     else:
-        _, v_L, _, = sig.lsim(mdl['SS']['Out'], v_a0, t, X0=v_a0[0])
+        v_L = lsimBatch(mdl['SS']['Out'], v_a0, t, X0=v_a0[..., 0], per=pss)
     
     # ------------------------------------------
     # Load 
@@ -60,13 +86,30 @@ def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     v_a = v_L - Mi*e
     
     # Current
-    if setupTopo['wave'] == "con":
-        _, i_a, _, = sig.lsim(mdl['SS']['Load'], v_L, t)
-        i_a = i_a[start:ende]
+    if fdom:
+        # The mean of AC currents is removed over whole periods (bin 0 of the spectrum)
+        [i_a, I_a] = fsimBatch(mdl['SS']['Load'], v_L, t)
+        if setupTopo['wave'] != "con":
+            i_a = i_a - np.real(I_a[..., 0:1]) / (np.shape(i_a)[-1] - 1)
+            I_a[..., 0] = 0
+        i_a = i_a[..., start:ende]
+    elif edom:
+        # The load current is driven by the switched inverter voltage (through the output filter if present)
+        c = 0.5 * Vdc * evtCorr(mdl['SS'][mdlL], evt, t)
+        if setupTopo['wave'] == "con":
+            i_a = esimBatch(mdl['SS'][mdlL], v_a0, t, c, per=pss)
+            i_a = i_a[..., start:ende]
+        else:
+            i_a = esimBatch(mdl['SS'][mdlL], (v_a0 - np.mean(v_a0, axis=-1, keepdims=True)), t, c, per=pss)
+            i_a = i_a[..., start:ende]
+            i_a = i_a - np.mean(i_a, axis=-1, keepdims=True)
+    elif setupTopo['wave'] == "con":
+        i_a = lsimBatch(mdl['SS']['Load'], v_L, t, per=pss)
+        i_a = i_a[..., start:ende]
     else: 
-        _, i_a, _, = sig.lsim(mdl['SS']['Load'], (v_L - np.mean(v_L)), t)
-        i_a = i_a[start:ende]
-        i_a = i_a - np.mean(i_a)
+        i_a = lsimBatch(mdl['SS']['Load'], (v_L - np.mean(v_L, axis=-1, keepdims=True)), t, per=pss)
+        i_a = i_a[..., start:ende]
+        i_a = i_a - np.mean(i_a, axis=-1, keepdims=True)
 
     # ==============================================================================
     # DC-Side
@@ -74,23 +117,31 @@ def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ------------------------------------------
     # Inverter Input
     # ------------------------------------------
-    i_d_p = i_a * (1 + s[start:ende]) / 2
-    i_d_m = i_a * (1 - s[start:ende]) / 2
+    i_d_p = i_a * (1 + s[..., start:ende]) / 2
+    i_d_m = i_a * (1 - s[..., start:ende]) / 2
     i_dc = i_d_p
     
     # ------------------------------------------
     # DC-Link
     # ------------------------------------------
-    i_c = np.mean(i_d_p) - i_d_p
-    _, v_dc, _, = sig.lsim(mdl['SS']['DC'], i_c, t[start:ende])
+    i_c = np.mean(i_d_p, axis=-1, keepdims=True) - i_d_p
+    if fdom:
+        I_dc = rfft(i_dc[..., 0:P], axis=-1)
+        I_c = np.concatenate((np.sum(i_c[..., 0:P], axis=-1, keepdims=True), -I_dc[..., 1:]), axis=-1)
+        [v_dc, V_dc] = fsimBatch(mdl['SS']['DC'], i_c, t[start:ende], I_c)
+    else:
+        v_dc = lsimBatch(mdl['SS']['DC'], i_c, t[start:ende])
     
     # ------------------------------------------
     # Filter Input
     # ------------------------------------------
     if setupTopo['inpFilter'] == 0:
         v_in = v_dc
+    elif fdom:
+        [v_in, _] = fsimBatch(mdl['SS']['Inp'], (v_dc-Vdc), t[start:ende])
+        v_in = v_in + Vdc
     else:
-        _, v_in, _, = sig.lsim(mdl['SS']['Inp'], (v_dc-Vdc), t[start:ende])
+        v_in = lsimBatch(mdl['SS']['Inp'], (v_dc-Vdc), t[start:ende], per=pss)
         v_in = v_in + Vdc
         
     ###################################################################################################################
@@ -99,9 +150,9 @@ def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ==============================================================================
     # AC-Side
     # ==============================================================================
-    timeAc['v_a0'] = v_a0[start:ende]
-    timeAc['v_L'] = v_L[start:ende]
-    timeAc['v_a'] = v_a[start:ende]
+    timeAc['v_a0'] = v_a0[..., start:ende]
+    timeAc['v_L'] = v_L[..., start:ende]
+    timeAc['v_a'] = v_a[..., start:ende]
     timeAc['i_a'] = i_a
     
     # ==============================================================================
@@ -113,8 +164,14 @@ def calcTimeB2(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     timeDc['i_c'] = i_c
     timeDc['i_d_m'] = i_d_m
     timeDc['i_d_p'] = i_d_p
+
+    # ==============================================================================
+    # Spectra
+    # ==============================================================================
+    if fdom and start == 0 and ende == np.size(t):
+        spec = {'i_a': I_a, 'i_dc': I_dc, 'v_dc': V_dc}
     
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [timeAc, timeDc]
\ No newline at end of file
+    return [timeAc, timeDc, spec]
\ No newline at end of file
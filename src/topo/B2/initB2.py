@@ -16,6 +16,7 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import colInit
 
 # ==============================================================================
 # External
@@ -27,7 +28,7 @@ import pandas as pd
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def initB2_Data():
+def initB2_Data(N=0):
     ###################################################################################################################
     # Start Values
     ###################################################################################################################
@@ -43,20 +44,20 @@ def initB2_Data():
     # Electric
     # ------------------------------------------
     data['elec']['sw'] = {}
-    data['elec']['sw']['S1'] = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
-    data['elec']['sw']['S2'] = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
+    data['elec']['sw']['S1'] = colInit(['i_T', 'v_T', 'i_D', 'v_D'], N)
+    data['elec']['sw']['S2'] = colInit(['i_T', 'v_T', 'i_D', 'v_D'], N)
 
     # ------------------------------------------
     # Losses
     # ------------------------------------------
     data['loss']['sw'] = {}
-    data['loss']['sw']['S1'] = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
-    data['loss']['sw']['S2'] = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
+    data['loss']['sw']['S1'] = colInit(['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'], N)
+    data['loss']['sw']['S2'] = colInit(['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'], N)
 
     # ------------------------------------------
     # Thermal
     # ------------------------------------------
-    data['ther']['sw'] = pd.DataFrame(columns=['T1', 'T2', 'D1', 'D2', 'C1', 'C2'])
+    data['ther']['sw'] = colInit(['T1', 'T2', 'D1', 'D2', 'C1', 'C2'], N)
 
     # ==============================================================================
     # Capacitor
@@ -65,18 +66,18 @@ def initB2_Data():
     # Electric
     # ------------------------------------------
     data['elec']['cap'] = {}
-    data['elec']['cap']['C1'] = pd.DataFrame(columns=['i_c', 'v_c'])
+    data['elec']['cap']['C1'] = colInit(['i_c', 'v_c'], N)
 
     # ------------------------------------------
     # Losses
     # ------------------------------------------
     data['loss']['cap'] = {}
-    data['loss']['cap']['C1'] = pd.DataFrame(columns=['p_L'])
+    data['loss']['cap']['C1'] = colInit(['p_L'], N)
 
     # ------------------------------------------
     # Thermal
     # ------------------------------------------
-    data['ther']['cap'] = pd.DataFrame(columns=['C1'])
+    data['ther']['cap'] = colInit(['C1'], N)
 
     ###################################################################################################################
     # Outputs
@@ -103,7 +104,7 @@ def initB2(W):
     # ==============================================================================
     # Output
     # ==============================================================================
-    timeElec['cap']['C1'] = pd.DataFrame(columns=['i_c', 'v_c'])
+    timeElec['cap']['C1'] = colInit(['i_c', 'v_c'])
     timeSw = pd.DataFrame(columns=['t', 'v_ref', 'e', 'xs', 'xsh', 's', 'c'])
     freqSw = pd.DataFrame(columns=['S', 'Xs'])
     freqAc = pd.DataFrame(columns=['I_a', 'V_a'])
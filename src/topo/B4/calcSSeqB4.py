@@ -19,6 +19,8 @@
 from src.general.helpFnc import deadTime
 from src.general.helpFnc import cbInter
 from src.general.helpFnc import con2dis
+from src.general.genSwEvent import genEvt_CB, genEvt_OPP, evt2dense, dense2evt, evtDeadTime, evtMinPulse
+from src.general.OPP import oppPulse, oppAngles
 
 # ==============================================================================
 # External
@@ -34,6 +36,13 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Init
     # ==============================================================================
@@ -42,6 +51,8 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
     s = {}
     xs = {}
     xsh = {}
+    car = {}
+    evt = {}
     
     # ==============================================================================
     # Parameters
@@ -78,15 +89,23 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
     if setupPara['PWM']['tri'] == "RE":
         c['A'] = signal.sawtooth(2*np.pi*fs*t, 1) * (-1)
         c['B'] = signal.sawtooth(2*np.pi*fs*(t - 0.5/fs), 1)
+        car['A'] = [1, 0, -1]
+        car['B'] = [1, 0.5, 1]
     elif setupPara['PWM']['tri'] == "FE":
         c['A'] = signal.sawtooth(2*np.pi*fs*(t - 0.5/fs), 0) * (-1)
         c['B'] = signal.sawtooth(2*np.pi*fs*t, 0)
+        car['A'] = [0, 0.5, -1]
+        car['B'] = [0, 0, 1]
     elif setupPara['PWM']['tri'] == "AM":
         c['A'] = signal.sawtooth(2*np.pi*fs*t, 1/3) * (-1)
         c['B'] = signal.sawtooth(2*np.pi*fs*(t - 0.5/fs), 1/3)
+        car['A'] = [1/3, 0, -1]
+        car['B'] = [1/3, 0.5, 1]
     else:
         c['A'] = signal.sawtooth(2*np.pi*fs*t, 0.5) * (-1)
         c['B'] = signal.sawtooth(2*np.pi*fs*(t - 0.5/fs), 0.5) * (-1)
+        car['A'] = [0.5, 0, -1]
+        car['B'] = [0.5, 0.5, -1]
     c['A'] = (2 * (c['A'] - min(c['A']))/(max(c['A'])-min(c['A']))) - 1
     c['B'] = (2 * (c['B'] - min(c['B']))/(max(c['B'])-min(c['B']))) - 1
     
@@ -95,6 +114,7 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
     # ------------------------------------------
     if setupPara['PWM']['int'] == 0:
         c['B'] = c['A']
+        car['B'] = car['A']
 
     # ==============================================================================
     # Sampling
@@ -103,10 +123,10 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
         if setupPara['PWM']['samp'] == "RS":
             if setupPara['PWM']['upd'] == "SE":
                 xs[id[i]] = con2dis(x[id[i]], t, Ts)
-                xsh[id[i]] = np.roll(x[id[i]], int(len(xs[id[i]])*fel/fs))
+                xsh[id[i]] = np.roll(x[id[i]], int(np.shape(xs[id[i]])[-1]*fel/fs), axis=-1)
             else:
                 xs[id[i]] = con2dis(x[id[i]], t, Ts/2)
-                xsh[id[i]] = np.roll(x[id[i]], int(len(xs[id[i]])*fel/fs/2))
+                xsh[id[i]] = np.roll(x[id[i]], int(np.shape(xs[id[i]])[-1]*fel/fs/2), axis=-1)
         else:
             xs[id[i]] = x[id[i]]
             xsh[id[i]] = x[id[i]]
@@ -114,8 +134,13 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Intersections
     # ==============================================================================
-    s['A'] = cbInter(xs['A'], c['A'], Mi, tmin)
-    s['B'] = cbInter(xs['B'], c['B'], Mi, tmin)  
+    for i in range(0, len(id)):
+        if setupPara['PWM']['evt'] == 1:
+            evt[id[i]] = genEvt_CB(x[id[i]], t, Mi, car[id[i]], setupPara)
+            if setupPara['PWM']['tmin'] > 0:
+                evt[id[i]] = evtMinPulse(evt[id[i]], setupPara['PWM']['tmin'])
+        else:
+            s[id[i]] = cbInter(xs[id[i]], c[id[i]], Mi, tmin)
             
     ###################################################################################################################
     # Post-Processing
@@ -123,14 +148,20 @@ def calcSSeqB4_CB(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Dead-time
     # ==============================================================================
-    if setupPara['PWM']['td'] > 0:
-        s['A'] = deadTime(s['A'], td)
-        s['B'] = deadTime(s['B'], td)
+    for i in range(0, len(id)):
+        if setupPara['PWM']['evt'] == 1:
+            if setupPara['PWM']['td'] > 0:
+                evt[id[i]] = evtDeadTime(evt[id[i]], setupPara['PWM']['td'])
+            s[id[i]] = evt2dense(evt[id[i]], t)
+        else:
+            if setupPara['PWM']['td'] > 0:
+                s[id[i]] = deadTime(s[id[i]], td)
+            evt[id[i]] = dense2evt(s[id[i]], t)
         
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c]
+    return [xs, xsh, s, c, evt]
 
 
 #######################################################################################################################
@@ -140,6 +171,13 @@ def calcSSeqB4_FF(ref, t, Mi, _, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Parameters
     # ==============================================================================
@@ -152,6 +190,7 @@ def calcSSeqB4_FF(ref, t, Mi, _, setupTopo):
     c = {}
     s = {}
     x = {}
+    evt = {}
     
     ###################################################################################################################
     # Pre-Processing
@@ -182,8 +221,108 @@ def calcSSeqB4_FF(ref, t, Mi, _, setupTopo):
     # ==============================================================================
     xs = x
     xsh = x
+    evt['A'] = dense2evt(s['A'], t)
+    evt['B'] = dense2evt(s['B'], t)
     
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c]
+    return [xs, xsh, s, c, evt]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcSSeqB4_OPP(ref, t, Mi, setupPara, setupTopo):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
+    # ==============================================================================
+    # Init
+    # ==============================================================================
+    x = {}
+    c = {}
+    s = {}
+    phi = {}
+    evt = {}
+
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    fel = setupTopo['fel']
+    p0 = oppPulse(setupPara, setupTopo)
+    id = ['A', 'B']
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    td = int(setupPara['PWM']['td']/(t[1]-t[0]))
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Carrier
+    # ==============================================================================
+    c['A'] = np.zeros(np.size(t))
+    c['B'] = np.zeros(np.size(t))
+
+    # ==============================================================================
+    # Scale reference
+    # ==============================================================================
+    for i in range(0, len(id)):
+        x[id[i]] = Mi * ref[id[i]] / np.max(np.abs(ref[id[i]]))
+        phi[id[i]] = np.arctan2(np.sum(ref[id[i]] * np.cos(2*np.pi*fel*t)), np.sum(ref[id[i]] * np.sin(2*np.pi*fel*t)))
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Switching angles
+    # ==============================================================================
+    alpha = oppAngles(Mi, p0)
+    if np.ndim(Mi) == 0:
+        alpha = alpha[0]
+
+    # ==============================================================================
+    # Switching events
+    # ==============================================================================
+    for i in range(0, len(id)):
+        evt[id[i]] = genEvt_OPP(alpha, phi[id[i]], t, fel)
+        if setupPara['PWM']['tmin'] > 0:
+            evt[id[i]] = evtMinPulse(evt[id[i]], setupPara['PWM']['tmin'])
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Dead-time
+    # ==============================================================================
+    for i in range(0, len(id)):
+        if setupPara['PWM']['evt'] == 1:
+            if setupPara['PWM']['td'] > 0:
+                evt[id[i]] = evtDeadTime(evt[id[i]], setupPara['PWM']['td'])
+            s[id[i]] = evt2dense(evt[id[i]], t)
+        else:
+            s[id[i]] = evt2dense(evt[id[i]], t)
+            if setupPara['PWM']['td'] > 0:
+                s[id[i]] = deadTime(s[id[i]], td)
+            evt[id[i]] = dense2evt(s[id[i]], t)
+
+    # ==============================================================================
+    # Output
+    # ==============================================================================
+    xs = x
+    xsh = x
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return [xs, xsh, s, c, evt]
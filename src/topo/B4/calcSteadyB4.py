@@ -16,19 +16,20 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
-from src.topo.B4.calcSSeqB4 import calcSSeqB4_CB, calcSSeqB4_FF
+from src.topo.B4.calcSSeqB4 import calcSSeqB4_CB, calcSSeqB4_FF, calcSSeqB4_OPP
+from src.general.genPattern import genPattern
 from src.topo.B4.calcTimeB4 import calcTimeB4
 from src.general.calcFreq import calcFreq
-from src.elec.calcElecSwi import calcElecSwi
-from src.elec.calcLossSwi import calcLossSwi
+from src.elec.calcLossSwi import calcMemBri
 from src.elec.calcLossCap import calcLossCap
-from src.therm.calcTherRC import calcTherRC
+from src.therm.calcTherRC import calcTherBri, lossNet
 from src.topo.B4.initB4 import initB4
 from src.general.genWaveform import genWave
-from src.therm.initRC import initRC
+from src.therm.initRC import initRCNet
 from src.elec.calcElecCap import calcElecCap
 from src.topo.B4.outB4 import outB4_Steady
 from src.general.calcAvg import calcAvg
+from src.general.helpFnc import bri2col, col2bri, accFix
 
 
 # ==============================================================================
@@ -71,6 +72,7 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     id6 = ['T1', 'T2', 'T3', 'T4']
     id7 = ['D1', 'D2', 'D3', 'D4']
     id8 = ['C1', 'C2', 'C3', 'C4']
+    id9 = id6 + id7 + id8
 
     # ==============================================================================
     # Parameters
@@ -87,7 +89,7 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     K = setupData['stat']['cyc']
     W = setupData['stat']['W']
     Mi = setupData['stat']['Mi']
-    start = int(N) * 2
+    start = 0 if setupExp['pss'] == 1 or setupExp['solver'] == 'freq' else int(N) * 2
     ende = int(K * N + 1)
 
     # ------------------------------------------
@@ -111,6 +113,8 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     T_ca = setupData['stat']['Tj']
     T_old = setupData['stat']['Tj']
     iter = 0
+    acc = {}
+    memSw = {}
 
     # ==============================================================================
     # Variables
@@ -141,15 +145,7 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ------------------------------------------
     # Load
     # ------------------------------------------
-    [Rth_JA, Cth_JA, Rth_DA, Cth_DA, Rth_CA, Cth_CA, Rth_JA_cap, Cth_JA_cap] = initRC(para, setupPara)
-
-    # ------------------------------------------
-    # Variables
-    # ------------------------------------------
-    Tinit_T = np.zeros((len(Rth_JA), len(id2)))
-    Tinit_D = np.zeros((len(Rth_DA), len(id2)))
-    Tinit_K = np.zeros((len(Rth_CA), len(id2)))
-    Tinit_C = np.zeros(np.size(Rth_JA_cap))
+    net = initRCNet(para, setupPara, len(id2), setupPara['Ther']['Coupling'] == 1)
 
     ###################################################################################################################
     # Calculation (Stationary)
@@ -158,16 +154,25 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # Switching Function
     # ==============================================================================
     if setupPara['PWM']['type'] == "FF":
-        [xs, xsh, s, c] = calcSSeqB4_FF(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB4_FF, v_ref, t, Mi, setupPara, setupTopo)
     elif setupPara['PWM']['type'] == "CB":
-        [xs, xsh, s, c] = calcSSeqB4_CB(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB4_CB, v_ref, t, Mi, setupPara, setupTopo)
+    elif setupPara['PWM']['type'] == "OPP":
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB4_OPP, v_ref, t, Mi, setupPara, setupTopo)
     else:
-        [xs, xsh, s, c] = calcSSeqB4_CB(v_ref, t, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, evt] = genPattern(calcSSeqB4_CB, v_ref, t, Mi, setupPara, setupTopo)
 
     # ==============================================================================
     # Time Domain
     # ==============================================================================
-    [timeAc, timeDc] = calcTimeB4(t, s, e_ref, Vdc, Mi, mdl, setupTopo, start, ende)
+    [timeAc, timeDc, spec] = calcTimeB4(t, s, e_ref, Vdc, Mi, mdl, setupTopo, start, ende, setupExp, evt)
+
+    # ==============================================================================
+    # Bridge
+    # ==============================================================================
+    # Gate signals and currents of all switches (switches x samples)
+    i_G = np.array([s[id3[i]][start:ende] * (-1) ** i for i in range(0, len(id2))])
+    i_S = np.array([id4[i] * timeAc['i_a'] for i in range(0, len(id2))])
 
     # ==============================================================================
     # Msg
@@ -182,62 +187,32 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # ------------------------------------------
         # Electrical
         # ------------------------------------------
-        # Switches
-        for i in range(0, len(id2)):
-            timeElec['sw'][id2[i]] = calcElecSwi(Vdc, id4[i] * timeAc['i_a'], (s[id3[i]][start:ende] == (-1) ** i), T_sw[i],
-                                                 id5[i], para, setupPara)
+        # Switches (electrical values and losses)
+        [elecSw, lossSw] = calcMemBri(Vdc, i_S, i_G, T_sw[0:len(id2)], id5, memSw, para, setupPara, setupExp)
 
         # Capacitor
         timeDc['v_dc'] = calcElecCap(t, timeDc['i_c'], T_ca, para, setupPara, setupTopo)
+        spec.pop('v_dc', None)
         timeElec['cap']['C1']['i_c'] = timeDc['i_c']
         timeElec['cap']['C1']['v_c'] = timeDc['v_dc']
 
         # ------------------------------------------
         # Losses
         # ------------------------------------------
-        # Switches
-        for i in range(0, len(id2)):
-            timeLoss['sw'][id2[i]] = calcLossSwi(s[id3[i]][start:ende] * (-1) ** i, timeElec['sw'][id2[i]]['i_T'],
-                                                 timeElec['sw'][id2[i]]['i_D'], timeElec['sw'][id2[i]]['v_T'],
-                                                 timeElec['sw'][id2[i]]['v_D'], T_sw[i], para, setupPara, setupExp)
-
         # Capacitor
         timeLoss['cap']['C1'] = calcLossCap(t, timeDc['i_c'], T_ca, para, setupPara, setupTopo)
 
-        # ------------------------------------------
-        # Init Thermal
-        # ------------------------------------------
-        if iter == 0:
-            # Switches
-            for i in range(0, len(id2)):
-                Tinit_T[:, i] = np.mean(timeLoss['sw'][id2[i]]['p_T']) * Rth_JA
-                Tinit_D[:, i] = np.mean(timeLoss['sw'][id2[i]]['p_D']) * Rth_DA
-                if setupPara['Ther']['Coupling'] == 1:
-                    Tinit_K[:, i] = np.mean(timeLoss['sw'][id2[i]]['p_L']) * Rth_CA
-
-            # Capacitor
-            Tinit_C = np.mean(timeLoss['cap']['C1']['p_L']) * Rth_JA_cap
-
         # ------------------------------------------
         # Thermal
         # ------------------------------------------
-        # Switches
-        for i in range(0, len(id2)):
-            [timeTher['sw'][id6[i]], Tinit_T[:, i]] = calcTherRC(Tinit_T[:, i], Tc, timeLoss['sw'][id2[i]]['p_T'],
-                                                                 t[start:ende], Rth_JA, Cth_JA)
-            [timeTher['sw'][id7[i]], Tinit_D[:, i]] = calcTherRC(Tinit_D[:, i], Tc, timeLoss['sw'][id2[i]]['p_D'],
-                                                                 t[start:ende], Rth_DA, Cth_DA)
-            if setupPara['Ther']['Coupling'] == 1:
-                [timeTher['sw'][id8[i]], Tinit_K[:, i]] = calcTherRC(Tinit_K[:, i], Tc, timeLoss['sw'][id2[i]]['p_L'],
-                                                                     t[start:ende], Rth_CA, Cth_CA)
-                timeTher['sw'][id6[i]] = timeTher['sw'][id6[i]][:] + timeTher['sw'][id8[i]][:] - Tc
-                timeTher['sw'][id7[i]] = timeTher['sw'][id7[i]][:] + timeTher['sw'][id8[i]][:] - Tc
-            else:
-                timeTher['sw'][id8[i]] = Tc * np.ones(np.size(s['A'][start:ende]))
+        # Switches (periodic steady-state of the losses)
+        Pv = lossNet(lossSw, timeLoss['cap']['C1']['p_L'], net['cpl'])
+        [Tther, _] = calcTherBri(0, Tc, Pv, t[start:ende], net, per=1)
+        for i in range(0, len(id9)):
+            timeTher['sw'][id9[i]] = Tther[i]
 
         # Capacitor
-        [timeTher['cap']['C1'], Tinit_C] = calcTherRC(Tinit_C, Tc, timeLoss['cap']['C1']['p_L'], t[start:ende],
-                                                      Rth_JA_cap, Cth_JA_cap)
+        timeTher['cap']['C1'] = Tther[-1]
 
         # ------------------------------------------
         # Error
@@ -248,12 +223,23 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # Update Para
         # ------------------------------------------
         if setupExp['loop'] == "CL":
-            # Switches
-            for i in range(0, len(id2)):
-                T_sw[i] = np.mean(timeTher['sw'][id6[i]])
-
-            # Capacitor
-            T_ca = np.mean(timeTher['cap']['C1'])
+            # Switches and capacitor (mean temperatures as fixed point of the electro-thermal loop)
+            T_fix = [np.mean(timeTher['sw'][x]) for x in id6] + [np.mean(timeTher['cap']['C1'])]
+            [T_new, acc] = accFix(np.append(T_sw[0:len(id2)], T_ca), T_fix, acc, setupExp['acc'])
+            T_sw[0:len(id2), 0] = T_new[0:-1]
+            T_ca = T_new[-1]
+
+            # Error of the accelerated iteration (fixed-point residual)
+            if setupExp['acc'] != "none":
+                err = acc['res'] / np.mean(T_fix)
+
+            # Diagnostics
+            if setupExp['debug'] >= 1:
+                print("ITER: %d) Fixed-point residual %.4f K with %s acceleration (%d iterates)" % (
+                      iter + 1, acc['res'], setupExp['acc'], len(acc['f'])))
+        else:
+            # Losses independent of the temperature, the periodic thermal solution is final
+            err = 0
 
         # Iteration
         iter = iter + 1
@@ -266,7 +252,7 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # ------------------------------------------
         if iter < int(setupExp['int']):
             print("ITER: %d) Stationary temperature T_swi=%.2f C (T_cap=%.2f C) and P_swi=%.2f W (Pv_cap=%.2f W) with error: %.2f %%" % (
-                  iter, T_sw[0], T_ca, np.mean(timeLoss['sw']['S1']['p_L']), np.mean(timeLoss['cap']['C1']['p_L']), err * 100))
+                  iter, T_sw[0], T_ca, np.mean(lossSw['p_L'][0]), np.mean(timeLoss['cap']['C1']['p_L']), err * 100))
         else:
             print("ITER: %d) Maximum iteration reached" % iter)
             break
@@ -280,6 +266,12 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     ###################################################################################################################
     # Post-Processing
     ###################################################################################################################
+    # ==============================================================================
+    # Switches
+    # ==============================================================================
+    timeElec['sw'].update(bri2col(elecSw, id2))
+    timeLoss['sw'].update(bri2col(lossSw, id2))
+
     # ==============================================================================
     # Averaging
     # ==============================================================================
@@ -300,8 +292,8 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     for c0 in out:
         for c1 in out[c0]:
             for c2 in out[c0][c1]:
-                out[c0][c1][c2] = out[c0][c1][c2].iloc[0:int(ende - start)]
-                out[c0][c1][c2] = out[c0][c1][c2].reset_index(drop=True)
+                for c3 in out[c0][c1][c2]:
+                    out[c0][c1][c2][c3] = out[c0][c1][c2][c3][0:int(ende - start)]
 
     # ------------------------------------------
     # Out
@@ -312,28 +304,27 @@ def calcSteadyB4(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ==============================================================================
     # Update Thermal
     # ==============================================================================
+    # ------------------------------------------
+    # Losses
+    # ------------------------------------------
+    Pv = lossNet(col2bri(timeLoss['sw'], id2), timeLoss['cap']['C1']['p_L'], net['cpl'])
+
     # ------------------------------------------
     # Switches
     # ------------------------------------------
-    for i in range(0, len(id2)):
-        [timeTher['sw'][id6[i]], _] = calcTherRC(Tinit_T[:, i], Tc, timeLoss['sw'][id2[i]]['p_T'], t[start:ende], Rth_JA, Cth_JA)
-        [timeTher['sw'][id7[i]], _] = calcTherRC(Tinit_D[:, i], Tc, timeLoss['sw'][id2[i]]['p_D'], t[start:ende], Rth_DA, Cth_DA)
-        if setupPara['Ther']['Coupling'] == 1:
-            [timeTher['sw'][id8[i]], _] = calcTherRC(Tinit_K[:, i], Tc, timeLoss['sw'][id2[i]]['p_L'], t[start:ende], Rth_CA, Cth_CA)
-            timeTher['sw'][id6[i]] = timeTher['sw'][id6[i]][:] + timeTher['sw'][id8[i]][:] - Tc
-            timeTher['sw'][id7[i]] = timeTher['sw'][id7[i]][:] + timeTher['sw'][id8[i]][:] - Tc
-        else:
-            timeTher['sw'][id8[i]] = Tc * np.ones(np.size(s['A'][start:ende]))
+    [Tther, _] = calcTherBri(0, Tc, Pv, t[start:ende], net, per=1)
+    for i in range(0, len(id9)):
+        timeTher['sw'][id9[i]] = Tther[i]
 
     # ------------------------------------------
     # Capacitor
     # ------------------------------------------
-    [timeTher['cap']['C1'], _] = calcTherRC(Tinit_C, Tc, timeLoss['cap']['C1']['p_L'], t[start:ende], Rth_JA_cap, Cth_JA_cap)
+    timeTher['cap']['C1'] = Tther[-1]
 
     # ==============================================================================
     # Frequency domain
     # ==============================================================================
-    [freqSw, freqAc, freqDc] = calcFreq(s['A'][start:ende], xs['A'][start:ende], timeAc, timeDc)
+    [freqSw, freqAc, freqDc] = calcFreq(s['A'][start:ende], xs['A'][start:ende], timeAc, timeDc, spec)
 
     # ==============================================================================
     # Output
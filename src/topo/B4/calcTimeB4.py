@@ -16,23 +16,44 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import lsimBatch, fsimBatch, esimBatch, evtCorr
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
-import scipy.signal as sig
+from scipy.fft import rfft
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
+def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende, setupExp, evt=None):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # Rows of s belong to a vector of modulation indices
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
+    # ==============================================================================
+    # Solver
+    # ==============================================================================
+    # Time domain (lsim), frequency domain (periodic solution on the FFT grid of t) or event-driven (exact between the
+    # switching edges of evt), the spectra of the frequency domain solver are returned if the solution covers the
+    # output window
+    pss = setupExp['pss']
+    fdom = setupExp['solver'] == 'freq'
+    edom = setupExp['solver'] == 'evt' and evt is not None
+    mdlL = 'OutLoad' if setupTopo['outFilter'] == 1 else 'Load'
+    P = ende - start - 1
+
     timeAc = {}
     timeDc = {}
+    spec = {}
     
     ###################################################################################################################
     # Calculation
@@ -52,8 +73,13 @@ def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ------------------------------------------
     if setupTopo['outFilter'] == 0:
         v_out = v_ab
+    elif fdom:
+        [v_out, _] = fsimBatch(mdl['SS']['Out'], v_ab, t)
+    elif edom:
+        c = 0.5 * Vdc * (evtCorr(mdl['SS']['Out'], evt['A'], t) - evtCorr(mdl['SS']['Out'], evt['B'], t))
+        v_out = esimBatch(mdl['SS']['Out'], v_ab, t, c, X0=v_ab[..., 0], per=pss)
     else:
-        _, v_out, _, = sig.lsim(mdl['SS']['Out'], v_ab, t, X0=v_ab[0])
+        v_out = lsimBatch(mdl['SS']['Out'], v_ab, t, X0=v_ab[..., 0], per=pss)
     
     # ------------------------------------------
     # Load 
@@ -62,13 +88,31 @@ def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     v_L = v_out - Mi*e
     
     # Current
-    if setupTopo['wave'] == "con":
-        _, i_a, _, = sig.lsim(mdl['SS']['Load'], v_L, t)
-        i_a = i_a[start:ende]
+    if fdom:
+        # The mean of AC currents is removed over whole periods (bin 0 of the spectrum)
+        [i_a, I_a] = fsimBatch(mdl['SS']['Load'], v_L, t)
+        if setupTopo['wave'] != "con":
+            i_a = i_a - np.real(I_a[..., 0:1]) / (np.shape(i_a)[-1] - 1)
+            I_a[..., 0] = 0
+        i_a = i_a[..., start:ende]
+    elif edom:
+        # Switched inverter voltage (through the output filter if present) and back EMF are superimposed
+        c = 0.5 * Vdc * (evtCorr(mdl['SS'][mdlL], evt['A'], t) - evtCorr(mdl['SS'][mdlL], evt['B'], t))
+        if setupTopo['wave'] == "con":
+            i_a = esimBatch(mdl['SS'][mdlL], v_ab, t, c, per=pss) - lsimBatch(mdl['SS']['Load'], Mi*e, t, per=pss)
+            i_a = i_a[..., start:ende]
+        else:
+            i_a = esimBatch(mdl['SS'][mdlL], (v_ab - np.mean(v_ab, axis=-1, keepdims=True)), t, c, per=pss)
+            i_a = i_a - lsimBatch(mdl['SS']['Load'], Mi*(e - np.mean(e, axis=-1, keepdims=True)), t, per=pss)
+            i_a = i_a[..., start:ende]
+            i_a = i_a - np.mean(i_a, axis=-1, keepdims=True)
+    elif setupTopo['wave'] == "con":
+        i_a = lsimBatch(mdl['SS']['Load'], v_L, t, per=pss)
+        i_a = i_a[..., start:ende]
     else: 
-        _, i_a, _, = sig.lsim(mdl['SS']['Load'], (v_L - np.mean(v_L)), t)
-        i_a = i_a[start:ende]
-        i_a = i_a - np.mean(i_a)
+        i_a = lsimBatch(mdl['SS']['Load'], (v_L - np.mean(v_L, axis=-1, keepdims=True)), t, per=pss)
+        i_a = i_a[..., start:ende]
+        i_a = i_a - np.mean(i_a, axis=-1, keepdims=True)
 
     # ==============================================================================
     # DC-Side
@@ -76,21 +120,29 @@ def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ------------------------------------------
     # Inverter Input
     # ------------------------------------------
-    i_dc = i_a/2 * (s['A'][start:ende] - s['B'][start:ende])
+    i_dc = i_a/2 * (s['A'][..., start:ende] - s['B'][..., start:ende])
     
     # ------------------------------------------
     # DC-Link
     # ------------------------------------------
-    i_c = np.mean(i_dc) - i_dc
-    _, v_dc, _, = sig.lsim(mdl['SS']['DC'], i_c, t[start:ende])
+    i_c = np.mean(i_dc, axis=-1, keepdims=True) - i_dc
+    if fdom:
+        I_dc = rfft(i_dc[..., 0:P], axis=-1)
+        I_c = np.concatenate((np.sum(i_c[..., 0:P], axis=-1, keepdims=True), -I_dc[..., 1:]), axis=-1)
+        [v_dc, V_dc] = fsimBatch(mdl['SS']['DC'], i_c, t[start:ende], I_c)
+    else:
+        v_dc = lsimBatch(mdl['SS']['DC'], i_c, t[start:ende])
     
     # ------------------------------------------
     # Filter Input
     # ------------------------------------------
     if setupTopo['inpFilter'] == 0:
         v_in = v_dc
+    elif fdom:
+        [v_in, _] = fsimBatch(mdl['SS']['Inp'], (v_dc-Vdc), t[start:ende])
+        v_in = v_in + Vdc
     else:
-        _, v_in, _, = sig.lsim(mdl['SS']['Inp'], (v_dc-Vdc), t[start:ende])
+        v_in = lsimBatch(mdl['SS']['Inp'], (v_dc-Vdc), t[start:ende], per=pss)
         v_in = v_in + Vdc
         
     ###################################################################################################################
@@ -99,11 +151,11 @@ def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ==============================================================================
     # AC-Side
     # ==============================================================================
-    timeAc['v_a0'] = v_a0[start:ende]
-    timeAc['v_b0'] = v_a0[start:ende]
-    timeAc['v_L'] = v_L[start:ende]
+    timeAc['v_a0'] = v_a0[..., start:ende]
+    timeAc['v_b0'] = v_a0[..., start:ende]
+    timeAc['v_L'] = v_L[..., start:ende]
     timeAc['v_out'] = v_out[start:ende]
-    timeAc['v_a'] = v_ab[start:ende]
+    timeAc['v_a'] = v_ab[..., start:ende]
     timeAc['i_a'] = i_a
     
     # ==============================================================================
@@ -113,8 +165,14 @@ def calcTimeB4(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     timeDc['v_dc'] = v_dc
     timeDc['i_dc'] = i_dc
     timeDc['i_c'] = i_c
+
+    # ==============================================================================
+    # Spectra
+    # ==============================================================================
+    if fdom and start == 0 and ende == np.size(t):
+        spec = {'i_a': I_a, 'i_dc': I_dc, 'v_dc': V_dc}
     
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [timeAc, timeDc]
+    return [timeAc, timeDc, spec]
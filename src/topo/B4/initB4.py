@@ -16,6 +16,7 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import colInit
 
 # ==============================================================================
 # External
@@ -27,7 +28,7 @@ import pandas as pd
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def initB4_Data():
+def initB4_Data(N=0):
     ###################################################################################################################
     # Start Values
     ###################################################################################################################
@@ -43,26 +44,26 @@ def initB4_Data():
     # Electric
     # ------------------------------------------
     data['elec']['sw'] = {}
-    data['elec']['sw']['S1'] = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
-    data['elec']['sw']['S2'] = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
-    data['elec']['sw']['S3'] = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
-    data['elec']['sw']['S4'] = pd.DataFrame(columns=['i_T', 'v_T', 'i_D', 'v_D'])
+    data['elec']['sw']['S1'] = colInit(['i_T', 'v_T', 'i_D', 'v_D'], N)
+    data['elec']['sw']['S2'] = colInit(['i_T', 'v_T', 'i_D', 'v_D'], N)
+    data['elec']['sw']['S3'] = colInit(['i_T', 'v_T', 'i_D', 'v_D'], N)
+    data['elec']['sw']['S4'] = colInit(['i_T', 'v_T', 'i_D', 'v_D'], N)
 
     # ------------------------------------------
     # Losses
     # ------------------------------------------
     data['loss']['sw'] = {}
-    data['loss']['sw']['S1'] = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
-    data['loss']['sw']['S2'] = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
-    data['loss']['sw']['S3'] = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
-    data['loss']['sw']['S4'] = pd.DataFrame(columns=['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'])
+    data['loss']['sw']['S1'] = colInit(['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'], N)
+    data['loss']['sw']['S2'] = colInit(['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'], N)
+    data['loss']['sw']['S3'] = colInit(['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'], N)
+    data['loss']['sw']['S4'] = colInit(['p_T_c', 'p_T_s', 'p_T', 'p_D_c', 'p_D_s', 'p_D', 'p_L'], N)
 
     # ------------------------------------------
     # Thermal
     # ------------------------------------------
-    data['ther']['sw'] = pd.DataFrame(columns=['T1', 'T2', 'T3', 'T4',
-                                               'D1', 'D2', 'D3', 'D4',
-                                               'C1', 'C2', 'C3', 'C4'])
+    data['ther']['sw'] = colInit(['T1', 'T2', 'T3', 'T4',
+                                  'D1', 'D2', 'D3', 'D4',
+                                  'C1', 'C2', 'C3', 'C4'], N)
 
     # ==============================================================================
     # Capacitor
@@ -71,18 +72,18 @@ def initB4_Data():
     # Electric
     # ------------------------------------------
     data['elec']['cap'] = {}
-    data['elec']['cap']['C1'] = pd.DataFrame(columns=['i_c', 'v_c'])
+    data['elec']['cap']['C1'] = colInit(['i_c', 'v_c'], N)
 
     # ------------------------------------------
     # Losses
     # ------------------------------------------
     data['loss']['cap'] = {}
-    data['loss']['cap']['C1'] = pd.DataFrame(columns=['p_L'])
+    data['loss']['cap']['C1'] = colInit(['p_L'], N)
 
     # ------------------------------------------
     # Thermal
     # ------------------------------------------
-    data['ther']['cap'] = pd.DataFrame(columns=['C1'])
+    data['ther']['cap'] = colInit(['C1'], N)
 
     ###################################################################################################################
     # Outputs
@@ -109,7 +110,7 @@ def initB4(W):
     # ==============================================================================
     # Output
     # ==============================================================================
-    timeElec['cap']['C1'] = pd.DataFrame(columns=['i_c', 'v_c'])
+    timeElec['cap']['C1'] = colInit(['i_c', 'v_c'])
     timeSw = pd.DataFrame(columns=['t', 'v_a_ref', 'v_b_ref', 'e', 'xAs', 'xBs', 'xAsh', 'xBsh', 'sA', 'sB', 'cA', 'cB'])
     freqSw = pd.DataFrame(columns=['Sa', 'Sb', 'Xas', 'Xbs'])
     freqAc = pd.DataFrame(columns=['I_ab', 'V_ab'])
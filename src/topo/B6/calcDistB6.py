@@ -57,9 +57,9 @@ def calcDistB6_Ana(t, i_a, v_a, Ia1, Mi, Vdc, setupTopo, setupPara):
     # Load angle
     # ==============================================================================
     Y = fft(v_a)
-    phiV1 = np.angle(Y)[K]
+    phiV1 = np.angle(Y)[..., K]
     Y = fft(i_a)
-    phiI1 = np.angle(Y)[K]
+    phiI1 = np.angle(Y)[..., K]
     phi = phiV1 - phiI1
 
     ###################################################################################################################
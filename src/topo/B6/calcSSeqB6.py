@@ -20,7 +20,9 @@ from src.general.helpFnc import deadTime
 from src.general.helpFnc import cbInter
 from src.general.helpFnc import con2dis
 from src.general.genSwSeq import genSwSeq
-from src.general.svPWM import svPWM
+from src.general.svPWM import svPWM_Vec
+from src.general.genSwEvent import genEvt_CB, genEvt_SV, genEvt_OPP, evt2dense, dense2evt, evtDeadTime, evtMinPulse
+from src.general.OPP import oppPulse, oppAngles
 
 # ==============================================================================
 # External
@@ -36,6 +38,13 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Init
     # ==============================================================================
@@ -44,6 +53,7 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     s = {}
     xs = {}
     xsh = {}
+    evt = {}
 
     # ==============================================================================
     # Parameters
@@ -68,8 +78,8 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     x0['A'] = Mi * ref['A'] / np.max(ref['A'])
     x0['B'] = Mi * ref['B'] / np.max(ref['B'])
     x0['C'] = Mi * ref['C'] / np.max(ref['C'])
-    xN0 = np.zeros(np.size(x0['A']))
-    xAll = np.vstack((x0['A'], x0['B'], x0['C'])).transpose()
+    xN0 = np.zeros(np.shape(x0['A']))
+    xAll = np.stack((x0['A'], x0['B'], x0['C']), axis=-1)
 
     # ==============================================================================
     # Clark Transform
@@ -83,7 +93,7 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     # SPWM
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "SPWM":
-        xN0 = np.zeros(np.size(x0['A']))
+        xN0 = np.zeros(np.shape(x0['A']))
 
     # ------------------------------------------
     # SVPWM
@@ -107,48 +117,48 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     # DPWM0
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "DPWM0":
-        xAll_s = np.roll(xAll, shift=-int(len(xN0) / 12), axis=0)
-        id2 = np.argsort(abs(xAll_s), axis=1)
-        for i in range(0, len(xN0)):
-            xN0[i] = np.sign(xAll[i, id2[i, 2]]) - xAll[i, id2[i, 2]]
+        xAll_s = np.roll(xAll, shift=-int(np.size(t) / 12), axis=-2)
+        id2 = np.argsort(abs(xAll_s), axis=-1)
+        xMax = np.take_along_axis(xAll, id2[..., 2:3], axis=-1)[..., 0]
+        xN0 = np.sign(xMax) - xMax
 
     # ------------------------------------------
     # DPWM1
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "DPWM1":
-        xAll_s = np.roll(xAll, shift=0, axis=0)
-        id2 = np.argsort(abs(xAll_s), axis=1)
-        for i in range(0, len(xN0)):
-            xN0[i] = np.sign(xAll[i, id2[i, 2]]) - xAll[i, id2[i, 2]]
+        xAll_s = np.roll(xAll, shift=0, axis=-2)
+        id2 = np.argsort(abs(xAll_s), axis=-1)
+        xMax = np.take_along_axis(xAll, id2[..., 2:3], axis=-1)[..., 0]
+        xN0 = np.sign(xMax) - xMax
 
     # ------------------------------------------
     # DPWM2
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "DPWM2":
-        xAll_s = np.roll(xAll, shift=int(len(xN0) / 12), axis=0)
-        id2 = np.argsort(abs(xAll_s), axis=1)
-        for i in range(0, len(xN0)):
-            xN0[i] = np.sign(xAll[i, id2[i, 2]]) - xAll[i, id2[i, 2]]
+        xAll_s = np.roll(xAll, shift=int(np.size(t) / 12), axis=-2)
+        id2 = np.argsort(abs(xAll_s), axis=-1)
+        xMax = np.take_along_axis(xAll, id2[..., 2:3], axis=-1)[..., 0]
+        xN0 = np.sign(xMax) - xMax
 
     # ------------------------------------------
     # DPWM3
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "DPWM3":
-        id2 = np.argsort(abs(xAll), axis=1)
-        for i in range(0, len(xN0)):
-            xN0[i] = np.sign(xAll[i, id2[i, 1]]) - xAll[i, id2[i, 1]]
+        id2 = np.argsort(abs(xAll), axis=-1)
+        xMid = np.take_along_axis(xAll, id2[..., 1:2], axis=-1)[..., 0]
+        xN0 = np.sign(xMid) - xMid
 
     # ------------------------------------------
     # DPWMMIN
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "DPWMMIN":
-        xN0 = -1 - np.min(xAll, axis=1)
+        xN0 = -1 - np.min(xAll, axis=-1)
 
     # ------------------------------------------
     # DPWMMAX
     # ------------------------------------------
     if setupPara['PWM']['zero'] == "DPWMMAX":
-        xN0 = 1 - np.max(xAll, axis=1)
+        xN0 = 1 - np.max(xAll, axis=-1)
 
     # ==============================================================================
     # Line-to-Line References
@@ -165,12 +175,16 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     if setupPara['PWM']['tri'] == "RE":
         c = signal.sawtooth(2 * np.pi * fs * t, 1) * (-1)
+        car = [1, 0, -1]
     elif setupPara['PWM']['tri'] == "FE":
         c = signal.sawtooth(2 * np.pi * fs * (t - 0.5 / fs), 0) * (-1)
+        car = [0, 0.5, -1]
     elif setupPara['PWM']['tri'] == "AM":
         c = signal.sawtooth(2 * np.pi * fs * t, 1 / 3) * (-1)
+        car = [1 / 3, 0, -1]
     else:
         c = signal.sawtooth(2 * np.pi * fs * (t - 0.5 / fs), 0.5)
+        car = [0.5, 0.5, 1]
     c = (2 * (c - min(c)) / (max(c) - min(c))) - 1
 
     # ==============================================================================
@@ -180,10 +194,10 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
         if setupPara['PWM']['samp'] == "RS":
             if setupPara['PWM']['upd'] == "SE":
                 xs[id[i]] = con2dis(x[id[i]], t, Ts)
-                xsh[id[i]] = np.roll(x[id[i]], int(len(xs[id[i]]) * fel / fs))
+                xsh[id[i]] = np.roll(x[id[i]], int(np.shape(xs[id[i]])[-1] * fel / fs), axis=-1)
             else:
                 xs[id[i]] = con2dis(x[id[i]], t, Ts / 2)
-                xsh[id[i]] = np.roll(x[id[i]], int(len(xs[id[i]]) * fel / fs / 2))
+                xsh[id[i]] = np.roll(x[id[i]], int(np.shape(xs[id[i]])[-1] * fel / fs / 2), axis=-1)
         else:
             xs[id[i]] = x[id[i]]
             xsh[id[i]] = x[id[i]]
@@ -192,22 +206,33 @@ def calcSSeqB6_CB(ref, t, Mi, setupPara, setupTopo):
     # Intersections
     # ==============================================================================
     for i in range(0, len(id)):
-        s[id[i]] = cbInter(xs[id[i]], c, Mi, tmin)
+        if setupPara['PWM']['evt'] == 1:
+            evt[id[i]] = genEvt_CB(x[id[i]], t, Mi, car, setupPara)
+            if setupPara['PWM']['tmin'] > 0:
+                evt[id[i]] = evtMinPulse(evt[id[i]], setupPara['PWM']['tmin'])
+        else:
+            s[id[i]] = cbInter(xs[id[i]], c, Mi, tmin)
 
-        ###################################################################################################################
+    ###################################################################################################################
     # Post-Processing
     ###################################################################################################################
     # ==============================================================================
     # Dead-time
     # ==============================================================================
-    if setupPara['PWM']['td'] > 0:
-        for i in range(0, len(id)):
-            s[id[i]] = deadTime(s[id[i]], td)
+    for i in range(0, len(id)):
+        if setupPara['PWM']['evt'] == 1:
+            if setupPara['PWM']['td'] > 0:
+                evt[id[i]] = evtDeadTime(evt[id[i]], setupPara['PWM']['td'])
+            s[id[i]] = evt2dense(evt[id[i]], t)
+        else:
+            if setupPara['PWM']['td'] > 0:
+                s[id[i]] = deadTime(s[id[i]], td)
+            evt[id[i]] = dense2evt(s[id[i]], t)
 
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c, x, xN0]
+    return [xs, xsh, s, c, x, xN0, evt]
 
 
 #######################################################################################################################
@@ -217,6 +242,13 @@ def calcSSeqB6_FF(ref, t, Mi, _, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Parameters
     # ==============================================================================
@@ -229,6 +261,7 @@ def calcSSeqB6_FF(ref, t, Mi, _, setupTopo):
     x0 = {}
     s = {}
     x = {}
+    evt = {}
 
     ###################################################################################################################
     # Pre-Processing
@@ -250,6 +283,7 @@ def calcSSeqB6_FF(ref, t, Mi, _, setupTopo):
     ###################################################################################################################
     for i in range(0, len(id)):
         s[id[i]] = signal.square(2 * np.pi * fel * t - i * (np.pi * 2) / 3, duty=Mi / 2)
+        evt[id[i]] = dense2evt(s[id[i]], t)
 
     ###################################################################################################################
     # Post-Processing
@@ -275,7 +309,7 @@ def calcSSeqB6_FF(ref, t, Mi, _, setupTopo):
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c, x, xN0]
+    return [xs, xsh, s, c, x, xN0, evt]
 
 
 #######################################################################################################################
@@ -285,6 +319,13 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Init
     # ==============================================================================
@@ -294,6 +335,7 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     xs = {}
     xsh = {}
     mS = {}
+    evt = {}
 
     # ==============================================================================
     # Parameters
@@ -322,19 +364,11 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     # Variables
     # ==============================================================================
     ts = np.linspace(0, 2, K)
-    ss = np.zeros(np.size(t))
-    xN0 = np.zeros(np.size(t))
-    rr = np.zeros((Ns * N, 1))
-    t1 = np.zeros((Ns * N, 1))
-    t2 = np.zeros((Ns * N, 1))
-    t0 = np.zeros((Ns * N, 1))
-    t7 = np.zeros((Ns * N, 1))
-    s['A'] = np.zeros(np.size(t))
-    s['B'] = np.zeros(np.size(t))
-    s['C'] = np.zeros(np.size(t))
-    xs['A'] = np.zeros(np.size(t))
-    xs['B'] = np.zeros(np.size(t))
-    xs['C'] = np.zeros(np.size(t))
+    nB = int(np.size(Mi))
+    ss = np.zeros(np.shape(Mi * t))
+    s['A'] = np.zeros(np.shape(Mi * t))
+    s['B'] = np.zeros(np.shape(Mi * t))
+    s['C'] = np.zeros(np.shape(Mi * t))
 
     ###################################################################################################################
     # Pre-Processing
@@ -368,10 +402,9 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Zero-Sequence
     # ==============================================================================
-    for i in range(0, len(t)):
-        alpha = i * N / len(t) * 2 * np.pi + phi[0] + 2 * np.pi
-        [d0, d1, d2, d7, _] = svPWM(k, alpha, Mi)
-        xN0[i] = (-d0 - d1 / 3 + d2 / 3 + d7)
+    alpha = np.arange(0, len(t)) * N / len(t) * 2 * np.pi + phi[0] + 2 * np.pi
+    [d0, d1, d2, d7, _] = svPWM_Vec(k, alpha, Mi)
+    xN0 = (-d0 - d1 / 3 + d2 / 3 + d7)
 
     # ==============================================================================
     # Line-to-Line References
@@ -386,33 +419,56 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Determine Sector
     # ==============================================================================
-    for i in range(0, Ns * N):
-        alpha = i / Ns * 2 * np.pi + phi[0] + 2 * np.pi
-        [t0[i], t1[i], t2[i], t7[i], rr[i]] = svPWM(k, alpha, Mi)
+    alpha = np.arange(0, Ns * N) / Ns * 2 * np.pi + phi[0] + 2 * np.pi
+    [t0, t1, t2, t7, rr] = svPWM_Vec(k, alpha, Mi)
+    t0 = t0[..., np.newaxis]
+    t1 = t1[..., np.newaxis]
+    t2 = t2[..., np.newaxis]
+    t7 = t7[..., np.newaxis]
 
     # ==============================================================================
     # Switching times
     # ==============================================================================
+    # Rows are switching periods, a batch adds a leading axis of modulation indices
     if setupPara['PWM']['upd'] == "SE":
-        st = np.hstack((t0, t0 + t1, 1 - t7, np.ones((Ns * N, 1)), 1 + t7, 1 + t7 + t2, 2 - t0, 2 * np.ones((Ns * N, 1))))
+        st = np.concatenate((t0, t0 + t1, 1 - t7, np.ones(np.shape(t0)), 1 + t7, 1 + t7 + t2, 2 - t0,
+                             2 * np.ones(np.shape(t0))), axis=-1)
     else:
-        st1 = np.hstack((t0, t0 + t1, 1 - t7, np.ones((Ns * N, 1))))
-        st2 = np.roll(np.hstack((1 + t7, 1 + t7 + t2, 2 - t0, 2 * np.ones((Ns * N, 1)))), -1, axis=0)
-        st = np.hstack((st1, st2))
-        st = st[::2]
-        rr = rr[::2]
+        st1 = np.concatenate((t0, t0 + t1, 1 - t7, np.ones(np.shape(t0))), axis=-1)
+        st2 = np.roll(np.concatenate((1 + t7, 1 + t7 + t2, 2 - t0, 2 * np.ones(np.shape(t0))), axis=-1), -1, axis=-2)
+        st = np.concatenate((st1, st2), axis=-1)
+        st = st[..., ::2, :]
+        rr = rr[..., ::2]
 
     # ==============================================================================
     # Switching states
     # ==============================================================================
-    for i in range(0, q * N):
-        j = 0
-        for ii in range(0, K):
-            if st[i, j] > ts[ii]:
-                ss[ii + K * i] = seq[int(rr[i] - 1)][j]
-            else:
-                j = j + 1
-                ss[ii + K * i] = ss[ii + K * i - 1]
+    # ------------------------------------------
+    # Edges
+    # ------------------------------------------
+    # The j-th time of a period is passed at the first sample not earlier than the previous edge plus one
+    nSt = np.arange(0, np.size(st, axis=-1))
+    edge = np.searchsorted(ts, st[..., 0:q * N, :], side='left').reshape(nB * q * N, -1)
+    edge = np.maximum.accumulate(edge - nSt, axis=1) + nSt
+
+    # ------------------------------------------
+    # Sequence index
+    # ------------------------------------------
+    rows, cols = np.nonzero(edge < K)
+    inc = np.zeros((nB * q * N, K), dtype=int)
+    inc[rows, edge[rows, cols]] = 1
+    j = np.cumsum(inc, axis=1) - inc
+    j = np.minimum(j, np.size(st, axis=-1) - 1)
+
+    # ------------------------------------------
+    # States
+    # ------------------------------------------
+    # Samples at an edge hold the previous state
+    temp = np.array(seq)[rr[..., 0:q * N].ravel() - 1][np.arange(0, nB * q * N).reshape(-1, 1), j]
+    temp = np.hstack((np.zeros((nB, 1), dtype=int), temp.reshape(nB, -1)))
+    hold = np.hstack((np.zeros((nB, 1), dtype=int), (inc.reshape(nB, -1) == 0) * np.arange(1, q * N * K + 1)))
+    ss[..., 0:q * N * K] = np.take_along_axis(temp, np.maximum.accumulate(hold, axis=1), axis=1)[:, 1:].reshape(
+        np.shape(ss[..., 0:q * N * K]))
 
     ###################################################################################################################
     # Post-Processing
@@ -420,35 +476,39 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     # ==============================================================================
     # Sampled waveform
     # ==============================================================================
+    idx = np.arange(0, len(t)) // int(len(t) / (Ns * N)) * int(len(t) / (Ns * N))
     for i in range(0, len(id)):
-        for ii in range(0, len(x[id[i]])):
-            if (ii % int(len(t) / (Ns * N))) == 0:
-                xs[id[i]][ii] = x[id[i]][ii]
-            else:
-                xs[id[i]][ii] = xs[id[i]][ii - 1]
+        xs[id[i]] = x[id[i]][..., idx]
 
     # ==============================================================================
     # Shifted waveform
     # ==============================================================================    
     for i in range(0, len(id)):
         if setupPara['PWM']['upd'] == "SE":
-            xsh[id[i]] = np.roll(x0[id[i]], int(len(xs[id[i]]) * fel / fs))
+            xsh[id[i]] = np.roll(x0[id[i]], int(np.shape(xs[id[i]])[-1] * fel / fs), axis=-1)
         else:
-            xsh[id[i]] = np.roll(x0[id[i]], int(len(xs[id[i]]) * fel / fs / 2))
+            xsh[id[i]] = np.roll(x0[id[i]], int(np.shape(xs[id[i]])[-1] * fel / fs / 2), axis=-1)
 
     # ==============================================================================
     # Switching Function
     # ==============================================================================
-    for i in range(0, len(ss)):
+    if setupPara['PWM']['evt'] == 1:
+        evt = genEvt_SV(st, rr, seq, mS, Mi, t, setupPara)
+        for i in range(0, len(id)):
+            if setupPara['PWM']['tmin'] > 0:
+                evt[id[i]] = evtMinPulse(evt[id[i]], setupPara['PWM']['tmin'])
+            if setupPara['PWM']['td'] > 0:
+                evt[id[i]] = evtDeadTime(evt[id[i]], setupPara['PWM']['td'])
+            s[id[i]] = evt2dense(evt[id[i]], t)
+    else:
         hold = tmin
-        for ii in range(0, len(id)):
+        for i in range(0, len(id)):
             if hold >= tmin:
-                if Mi != 0:
-                    s[id[ii]][i] = mS[id[ii]][int(ss[i])]
+                s[id[i]] = np.where(Mi != 0, np.array(mS[id[i]])[ss.astype(int)], s[id[i]])
                 hold = 0
             else:
-                s[id[ii]][i] = s[id[ii]][i - 1]
                 hold = hold + 1
+            evt[id[i]] = dense2evt(s[id[i]], t)
 
     # ==============================================================================
     # Outputs
@@ -458,4 +518,141 @@ def calcSSeqB6_SV(ref, t, Mi, setupPara, setupTopo):
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [xs, xsh, s, c, x, xN0]
+    return [xs, xsh, s, c, x, xN0, evt]
+
+
+#######################################################################################################################
+# Function
+#######################################################################################################################
+def calcSSeqB6_OPP(ref, t, Mi, setupPara, setupTopo):
+    ###################################################################################################################
+    # Initialisation
+    ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # A vector of modulation indices gives one row per index, carrier and time base are shared
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
+    # ==============================================================================
+    # Init
+    # ==============================================================================
+    x0 = {}
+    x = {}
+    s = {}
+    phi = {}
+    evt = {}
+
+    # ==============================================================================
+    # Parameters
+    # ==============================================================================
+    fel = setupTopo['fel']
+    p0 = oppPulse(setupPara, setupTopo)
+    id = ['A', 'B', 'C']
+
+    # ==============================================================================
+    # Variables
+    # ==============================================================================
+    td = int(setupPara['PWM']['td'] / (t[1] - t[0]))
+
+    ###################################################################################################################
+    # Pre-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Scale reference
+    # ==============================================================================
+    for i in range(0, len(id)):
+        x0[id[i]] = Mi * ref[id[i]] / np.max(ref[id[i]])
+        phi[id[i]] = np.arctan2(np.sum(ref[id[i]] * np.cos(2 * np.pi * fel * t)),
+                                np.sum(ref[id[i]] * np.sin(2 * np.pi * fel * t)))
+
+    # ==============================================================================
+    # Carrier
+    # ==============================================================================
+    c = np.zeros(np.size(t))
+
+    ###################################################################################################################
+    # Calculation
+    ###################################################################################################################
+    # ==============================================================================
+    # Switching angles
+    # ==============================================================================
+    alpha = oppAngles(Mi, p0)
+    if np.ndim(Mi) == 0:
+        alpha = alpha[0]
+
+    # ==============================================================================
+    # Switching events
+    # ==============================================================================
+    for i in range(0, len(id)):
+        evt[id[i]] = genEvt_OPP(alpha, phi[id[i]], t, fel)
+        if setupPara['PWM']['tmin'] > 0:
+            evt[id[i]] = evtMinPulse(evt[id[i]], setupPara['PWM']['tmin'])
+
+    ###################################################################################################################
+    # Post-Processing
+    ###################################################################################################################
+    # ==============================================================================
+    # Dead-time
+    # ==============================================================================
+    for i in range(0, len(id)):
+        if setupPara['PWM']['evt'] == 1:
+            if setupPara['PWM']['td'] > 0:
+                evt[id[i]] = evtDeadTime(evt[id[i]], setupPara['PWM']['td'])
+            s[id[i]] = evt2dense(evt[id[i]], t)
+        else:
+            s[id[i]] = evt2dense(evt[id[i]], t)
+            if setupPara['PWM']['td'] > 0:
+                s[id[i]] = deadTime(s[id[i]], td)
+            evt[id[i]] = dense2evt(s[id[i]], t)
+
+    # ==============================================================================
+    # Neutral Voltage
+    # ==============================================================================
+    xN0 = 1 / 3 * (s['A'] + s['B'] + s['C'])
+
+    # ==============================================================================
+    # Line-to-Line References
+    # ==============================================================================
+    x['A'] = x0['A'] + xN0
+    x['B'] = x0['B'] + xN0
+    x['C'] = x0['C'] + xN0
+
+    # ==============================================================================
+    # Output
+    # ==============================================================================
+    xs = x
+    xsh = x
+
+    ###################################################################################################################
+    # Return
+    ###################################################################################################################
+    return [xs, xsh, s, c, x, xN0, evt]
+
+
+#######################################################################################################################
+# Benchmark
+#######################################################################################################################
+if __name__ == "__main__":
+    import time
+
+    # ==============================================================================
+    # Setup
+    # ==============================================================================
+    fel = 50
+    fsim = 1e6
+    t = np.linspace(0, 4 / fel, int(4 * fsim / fel) + 1)
+    ref = {'A': np.sin(2 * np.pi * fel * t), 'B': np.sin(2 * np.pi * fel * t - 2 / 3 * np.pi),
+           'C': np.sin(2 * np.pi * fel * t - 4 / 3 * np.pi)}
+    setupPara = {'PWM': {'fs': 1050, 'tri': "SM", 'samp': "RS", 'upd': "DE", 'td': 0, 'tmin': 0, 'evt': 0}}
+    setupTopo = {'fel': fel}
+
+    # ==============================================================================
+    # Zero-Sequence
+    # ==============================================================================
+    for zero in ["SPWM", "SVPWM", "THIPWM4", "THIPWM6", "DPWM0", "DPWM1", "DPWM2", "DPWM3", "DPWMMAX", "DPWMMIN"]:
+        setupPara['PWM']['zero'] = zero
+        t0 = time.time()
+        calcSSeqB6_CB(ref, t, 1.0, setupPara, setupTopo)
+        print("INFO: %-8s %8.4f s for %d samples" % (zero, time.time() - t0, len(t)))
@@ -16,27 +16,46 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
+from src.general.helpFnc import lsimBatch, fsimBatch, esimBatch, evtCorr
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
-import scipy.signal as sig
+from scipy.fft import rfft
 
 
 #######################################################################################################################
 # Function
 #######################################################################################################################
-def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
+def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende, setupExp, evt=None):
     ###################################################################################################################
     # Initialisation
     ###################################################################################################################
+    # ==============================================================================
+    # Batch
+    # ==============================================================================
+    # Rows of s belong to a vector of modulation indices
+    if np.ndim(Mi) > 0:
+        Mi = np.reshape(Mi, (-1, 1))
+
     # ==============================================================================
     # Parameters
     # ==============================================================================
     id = ['A', 'B', 'C']
     fel = setupTopo['fel']
     K = int((ende-start-1)*fel*(t[1] - t[0]))
+    P = ende - start - 1
+
+    # ==============================================================================
+    # Solver
+    # ==============================================================================
+    # Time domain (lsim), frequency domain (periodic solution on the FFT grid of t) or event-driven (exact between the
+    # switching edges of evt), the spectra of the frequency domain solver are returned if the solution covers the
+    # output window
+    pss = setupExp['pss']
+    fdom = setupExp['solver'] == 'freq'
+    edom = setupExp['solver'] == 'evt' and evt is not None
 
     # ==============================================================================
     # Variables
@@ -48,6 +67,7 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     i = {}
     timeAc = {}
     timeDc = {}
+    spec = {}
 
     ###################################################################################################################
     # Pre-Processing
@@ -63,7 +83,7 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # Inverter Output
     # ------------------------------------------
     for j in range(0, len(id)):
-        v0[id[j]] = 0.5 * (s[id[j]] - np.mean(s[id[j]])) * Vdc
+        v0[id[j]] = 0.5 * (s[id[j]] - np.mean(s[id[j]], axis=-1, keepdims=True)) * Vdc
     v_n0 = 1 / 3 * (v0['A'] + v0['B'] + v0['C'])
 
     # ------------------------------------------
@@ -75,11 +95,23 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ------------------------------------------
     # Filter Output
     # ------------------------------------------
-    for j in range(0, len(id)):
-        if setupTopo['outFilter'] == 0:
+    # The three phases are solved as one batch along the second to last axis
+    if setupTopo['outFilter'] == 0:
+        for j in range(0, len(id)):
             v_out[id[j]] = v[id[j]]
+    else:
+        v_abc = np.stack([v[id[j]] for j in range(0, len(id))], axis=-2)
+        if fdom:
+            [v_abc, _] = fsimBatch(mdl['SS']['Out'], v_abc, t)
+        elif edom:
+            # Phase voltages are weighted sums of the switching functions (edges of all legs)
+            c = [evtCorr(mdl['SS']['Out'], evt[id[j]], t) for j in range(0, len(id))]
+            c = 0.5 * Vdc / 3 * np.stack([3 * c[j] - c[0] - c[1] - c[2] for j in range(0, len(id))], axis=-3)
+            v_abc = esimBatch(mdl['SS']['Out'], v_abc, t, c, X0=v_abc[..., 0], per=pss)
         else:
-            _, v_out[id[j]], _, = sig.lsim(mdl['SS']['Out'], v[id[j]], t, X0=v[id[j]][0])
+            v_abc = lsimBatch(mdl['SS']['Out'], v_abc, t, X0=v_abc[..., 0], per=pss)
+        for j in range(0, len(id)):
+            v_out[id[j]] = v_abc[..., j, :]
 
     # ------------------------------------------
     # Load
@@ -89,17 +121,38 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
         v_L[id[j]] = v_out[id[j]] - Mi * e[id[j]]
 
     # LL Current
-    _, i_ab, _, = sig.lsim(mdl['SS']['Load'], (v0['A'] - Mi * e['A'] - v0['B'] - Mi * e['B']) / np.sqrt(3), t)
-    _, i_bc, _, = sig.lsim(mdl['SS']['Load'], (v0['B'] - Mi * e['B'] - v0['C'] - Mi * e['C']) / np.sqrt(3), t)
-    _, i_ca, _, = sig.lsim(mdl['SS']['Load'], (v0['C'] - Mi * e['C'] - v0['A'] - Mi * e['A']) / np.sqrt(3), t)
-    i['A'] = np.roll(i_ab[start:ende], int(np.floor((30 + 0) / 360 / K * len(s['A'][start:ende]))))
-    i['B'] = np.roll(i_bc[start:ende], int(np.floor((30 + 0) / 360 / K * len(s['B'][start:ende]))))
-    i['C'] = np.roll(i_ca[start:ende], int(np.floor((30 + 0) / 360 / K * len(s['C'][start:ende]))))
+    v_LL = np.stack([(v0['A'] - Mi * e['A'] - v0['B'] - Mi * e['B']) / np.sqrt(3),
+                     (v0['B'] - Mi * e['B'] - v0['C'] - Mi * e['C']) / np.sqrt(3),
+                     (v0['C'] - Mi * e['C'] - v0['A'] - Mi * e['A']) / np.sqrt(3)], axis=-2)
+    dk = int(np.floor((30 + 0) / 360 / K * (ende - start)))
+    if fdom:
+        # Whole periods are shifted circularly and the spectrum by the corresponding phase
+        [i_LL, I_LL] = fsimBatch(mdl['SS']['Load'], v_LL, t)
+        Pt = np.shape(i_LL)[-1] - 1
+        i_LL = np.roll(i_LL[..., 0:Pt], dk, axis=-1)
+        i_LL = np.concatenate((i_LL, i_LL[..., 0:1]), axis=-1)
+        I_LL = I_LL * np.exp(-2j * np.pi * np.arange(0, np.shape(I_LL)[-1]) * dk / Pt)
+    elif edom:
+        # The switched part of the LL voltages is solved between the edges, the back EMF is superimposed
+        c = [evtCorr(mdl['SS']['Load'], evt[id[j]], t) for j in range(0, len(id))]
+        c = 0.5 * Vdc / np.sqrt(3) * np.stack([c[j] - c[(j + 1) % 3] for j in range(0, len(id))], axis=-3)
+        e_LL = np.stack([-Mi * (e[id[j]] + e[id[(j + 1) % 3]]) / np.sqrt(3) for j in range(0, len(id))], axis=-2)
+        i_LL = esimBatch(mdl['SS']['Load'], v_LL - e_LL, t, c, per=pss) + lsimBatch(mdl['SS']['Load'], e_LL, t, per=pss)
+        i_LL = np.roll(i_LL[..., start:ende], dk, axis=-1)
+    else:
+        i_LL = lsimBatch(mdl['SS']['Load'], v_LL, t, per=pss)
+        i_LL = np.roll(i_LL[..., start:ende], dk, axis=-1)
 
     # LN Current
-    if setupTopo['wave'] != 'con':
-        for j in range(0, len(id)):
-            i[id[j]] = i[id[j]] - np.mean(i[id[j]])
+    if setupTopo['wave'] != 'con' and fdom:
+        i_LL = i_LL - np.real(I_LL[..., 0:1]) / Pt
+        I_LL[..., 0] = 0
+    elif setupTopo['wave'] != 'con':
+        i_LL = i_LL - np.mean(i_LL, axis=-1, keepdims=True)
+    if fdom:
+        i_LL = i_LL[..., start:ende]
+    for j in range(0, len(id)):
+        i[id[j]] = i_LL[..., j, :]
 
     # ==============================================================================
     # DC-Side
@@ -107,22 +160,33 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ------------------------------------------
     # Inverter Input
     # ------------------------------------------
-    i_dc = 1 / 2 * (s['A'][start:ende] * i['A'] + s['B'][start:ende] * i['B'] + s['C'][start:ende] * i['C'])
+    i_dc = 1 / 2 * (s['A'][..., start:ende] * i['A'] + s['B'][..., start:ende] * i['B'] +
+                    s['C'][..., start:ende] * i['C'])
 
     # ------------------------------------------
     # DC-Link
     # ------------------------------------------
-    i_cap = np.mean(i_dc) - i_dc
-    _, v_dc, _, = sig.lsim(mdl['SS']['DC'], i_cap, t[start:ende])
-    v_dc = v_dc - np.mean(v_dc) + Vdc
+    i_cap = np.mean(i_dc, axis=-1, keepdims=True) - i_dc
+    if fdom:
+        I_dc = rfft(i_dc[..., 0:P], axis=-1)
+        I_c = np.concatenate((np.sum(i_cap[..., 0:P], axis=-1, keepdims=True), -I_dc[..., 1:]), axis=-1)
+        [v_dc, V_dc] = fsimBatch(mdl['SS']['DC'], i_cap, t[start:ende], I_c)
+        v_dc = v_dc + Vdc
+        V_dc[..., 0] = Vdc * P
+    else:
+        v_dc = lsimBatch(mdl['SS']['DC'], i_cap, t[start:ende])
+        v_dc = v_dc - np.mean(v_dc, axis=-1, keepdims=True) + Vdc
 
     # ------------------------------------------
     # Filter Input
     # ------------------------------------------
     if setupTopo['inpFilter'] == 0:
         v_in = v_dc
+    elif fdom:
+        [v_in, _] = fsimBatch(mdl['SS']['Inp'], (v_dc - Vdc), t[start:ende])
+        v_in = v_in + Vdc
     else:
-        _, v_in, _, = sig.lsim(mdl['SS']['Inp'], (v_dc - Vdc), t[start:ende])
+        v_in = lsimBatch(mdl['SS']['Inp'], (v_dc - Vdc), t[start:ende], per=pss)
         v_in = v_in + Vdc
 
     ###################################################################################################################
@@ -131,11 +195,11 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     # ==============================================================================
     # AC-Side
     # ==============================================================================
-    timeAc['v_a0'] = v0['A'][start:ende]
-    timeAc['v_a'] = v['A'][start:ende]
-    timeAc['v_L_a'] = v_L['A'][start:ende]
-    timeAc['v_a_out'] = v_out['A'][start:ende]
-    timeAc['v_n0'] = v_n0[start:ende]
+    timeAc['v_a0'] = v0['A'][..., start:ende]
+    timeAc['v_a'] = v['A'][..., start:ende]
+    timeAc['v_L_a'] = v_L['A'][..., start:ende]
+    timeAc['v_a_out'] = v_out['A'][..., start:ende]
+    timeAc['v_n0'] = v_n0[..., start:ende]
     timeAc['i_a'] = i['A']
     timeAc['i_b'] = i['B']
     timeAc['i_c'] = i['C']
@@ -148,7 +212,13 @@ def calcTimeB6(t, s, e, Vdc, Mi, mdl, setupTopo, start, ende):
     timeDc['i_dc'] = i_dc
     timeDc['i_c'] = i_cap
 
+    # ==============================================================================
+    # Spectra
+    # ==============================================================================
+    if fdom and start == 0 and ende == np.size(t):
+        spec = {'i_a': I_LL[..., 0, :], 'i_dc': I_dc, 'v_dc': V_dc}
+
     ###################################################################################################################
     # Return
     ###################################################################################################################
-    return [timeAc, timeDc]
+    return [timeAc, timeDc, spec]
@@ -16,18 +16,19 @@
 # ==============================================================================
 # Internal
 # ==============================================================================
-from src.topo.B6.calcSSeqB6 import calcSSeqB6_CB, calcSSeqB6_FF, calcSSeqB6_SV
+from src.topo.B6.calcSSeqB6 import calcSSeqB6_CB, calcSSeqB6_FF, calcSSeqB6_SV, calcSSeqB6_OPP
+from src.general.genPattern import genPattern
 from src.topo.B6.calcTimeB6 import calcTimeB6
 from src.general.genWaveform import genWave
-from src.topo.B6.initB6 import initB6_Data, initB6
+from src.topo.B6.initB6 import initB6_Data
 from src.topo.B6.outB6 import outB6_Trans
 from src.general.calcFreq import calcFreq
-from src.elec.calcElecSwi import calcElecSwi
-from src.elec.calcLossSwi import calcLossSwi
-from src.therm.calcTherRC import calcTherRC
+from src.elec.calcLossSwi import calcMemBri
+from src.therm.calcTherRC import calcTherBri, lossNet
 from src.elec.calcLossCap import calcLossCap
 from src.general.calcAvg import calcAvg
-from src.therm.initRC import initRC
+from src.general.helpFnc import bri2col, col2bri
+from src.therm.initRC import initRCNet
 from src.elec.calcElecCap import calcElecCap
 from src.general.append import app_fel, app_fs
 
@@ -36,7 +37,6 @@ from src.general.append import app_fel, app_fs
 # ==============================================================================
 import numpy as np
 import math
-import pandas as pd
 from tqdm import tqdm
 
 
@@ -74,6 +74,7 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
     id6 = ['T1', 'T2', 'T3', 'T4', 'T5', 'T6']
     id7 = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6']
     id8 = ['C1', 'C2', 'C3', 'C4', 'C5', 'C6']
+    id9 = id6 + id7 + id8
 
     # ==============================================================================
     # Parameters
@@ -98,6 +99,7 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
     Vdc = setupData['stat']['Vdc']
     phiE = math.radians(setupTopo['phiE'])
     phiV = math.radians(setupData['stat']['phi'])
+    memSw = {}
 
     # ------------------------------------------
     # Thermal
@@ -122,7 +124,14 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ==============================================================================
     # Outputs
     # ==============================================================================
-    out = initB6_Data()
+    # Samples per electrical period
+    if iterNpwm == 1:
+        Nfel = int(Nsim + 1)
+    else:
+        Nfel = int(Nsim / iterNpwm * iterNpwm + 0)
+
+    # Preallocated column stores
+    out = initB6_Data(Nel * Nfel)
 
     ###################################################################################################################
     # Pre-Processing
@@ -148,14 +157,13 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ------------------------------------------
     # Parameters
     # ------------------------------------------
-    [Rth_JA, Cth_JA, Rth_DA, Cth_DA, Rth_CA, Cth_CA, Rth_JA_cap, Cth_JA_cap] = initRC(para, setupPara)
+    cplSw = setupPara['Ther']['Heatsink'] == 1 and setupPara['Ther']['Coupling'] == 1
+    net = initRCNet(para, setupPara, len(id2), cplSw)
 
     # ------------------------------------------
     # Init
     # ------------------------------------------
-    Tinit_T = np.zeros((len(Rth_JA), len(id2)))
-    Tinit_C = np.zeros((len(Rth_JA), len(id2)))
-    Tinit_Cap = np.zeros(np.size(Rth_JA_cap))
+    Tinit = 0
 
     ###################################################################################################################
     # Calculation
@@ -164,27 +172,36 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # Switching Function
     # ==============================================================================
     if setupPara['PWM']['type'] == "FF":
-        [xs, xsh, s, c, x, n0] = calcSSeqB6_FF(v_ref, t_ref, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, x, n0, evt] = genPattern(calcSSeqB6_FF, v_ref, t_ref, Mi, setupPara, setupTopo)
     elif setupPara['PWM']['type'] == "CB":
-        [xs, xsh, s, c, x, n0] = calcSSeqB6_CB(v_ref, t_ref, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, x, n0, evt] = genPattern(calcSSeqB6_CB, v_ref, t_ref, Mi, setupPara, setupTopo)
     elif setupPara['PWM']['type'] == "SV":
-        [xs, xsh, s, c, x, n0] = calcSSeqB6_SV(v_ref, t_ref, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, x, n0, evt] = genPattern(calcSSeqB6_SV, v_ref, t_ref, Mi, setupPara, setupTopo)
+    elif setupPara['PWM']['type'] == "OPP":
+        [xs, xsh, s, c, x, n0, evt] = genPattern(calcSSeqB6_OPP, v_ref, t_ref, Mi, setupPara, setupTopo)
     else:
-        [xs, xsh, s, c, x, n0] = calcSSeqB6_CB(v_ref, t_ref, Mi, setupPara, setupTopo)
+        [xs, xsh, s, c, x, n0, evt] = genPattern(calcSSeqB6_CB, v_ref, t_ref, Mi, setupPara, setupTopo)
 
     # ==============================================================================
     # Time Domain
     # ==============================================================================
-    [timeAc, timeDc] = calcTimeB6(t_ref, s, e_ref, Vdc, Mi, mdl, setupTopo, Nsim * (K - 1), (K * Nsim + 1))
+    [timeAc, timeDc, _] = calcTimeB6(t_ref, s, e_ref, Vdc, Mi, mdl, setupTopo, Nsim * (K - 1), (K * Nsim + 1), setupExp, evt)
+
+    # ==============================================================================
+    # Bridge
+    # ==============================================================================
+    # Gate signals and currents of all switches (switches x samples)
+    i_G = np.array([s[id3[j]] * (-1) ** j for j in range(0, len(id2))])
+    i_S = np.array([timeAc[id4[j]] for j in range(0, len(id2))])
 
     # ==============================================================================
     # Electrical cycle
     # ==============================================================================
-    for _ in tqdm(range(iterNel), desc='Elec-Period', position=0):
+    for k in tqdm(range(iterNel), desc='Elec-Period', position=0):
         # ------------------------------------------
         # Init
         # ------------------------------------------
-        dataFel = initB6_Data()
+        dataFel = initB6_Data(Nfel)
 
         # ------------------------------------------
         # Electrical
@@ -196,7 +213,8 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
         # ------------------------------------------
         for ii in tqdm(range(iterNpwm), desc='PWM-Period', position=1, leave=False):
             # Init
-            [_, timeElec, timeLoss, timeTher, _, _, _, _, _] = initB6(2)
+            timeElec = {'sw': {}, 'cap': {'C1': {}}}
+            timeLoss = {'sw': {}, 'cap': {}}
             start = int(ii * (Nsim / iterNpwm))
             if iterNpwm == 1:
                 ende = int(Nsim / iterNpwm * (ii + 1) + 1)
@@ -204,36 +222,32 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
                 ende = int(Nsim / iterNpwm * (ii + 1) + 0)
 
             # Switch
-            for j in range(0, len(id2)):
-                timeElec['sw'][id2[j]] = calcElecSwi(Vdc, timeAc[id4[j]][start:ende], (s[id3[j]][start:ende] == (-1) ** j), Tj[j], id5[j], para, setupPara)
-                timeLoss['sw'][id2[j]] = calcLossSwi(s[id3[j]][start:ende] * (-1) ** j, timeElec['sw'][id2[j]]['i_T'], timeElec['sw'][id2[j]]['i_D'], timeElec['sw'][id2[j]]['v_T'], timeElec['sw'][id2[j]]['v_D'], Tj[j], para, setupPara, setupExp)
-
-                if setupPara['Ther']['Heatsink'] == 1 & setupPara['Ther']['Coupling'] == 1:
-                    [timeTher['sw'][id6[j]], Tinit_T[:, j]] = calcTherRC(Tinit_T[:, j], Ta, timeLoss['sw'][id2[j]]['p_T'], t_ref[start:ende], Rth_JA, Cth_JA)
-                    [timeTher['sw'][id8[j]], Tinit_C[:, j]] = calcTherRC(Tinit_C[:, j], Ta, timeLoss['sw'][id2[j]]['p_L'], t_ref[start:ende], Rth_CA, Cth_CA)
-                    timeTher['sw'][id6[j]] = timeTher['sw'][id6[j]][:] + timeTher['sw'][id8[j]][:] - Ta
-                else:
-                    [timeTher['sw'][id6[j]], Tinit_T[:, j]] = calcTherRC(Tinit_T[:, j], Ta, timeLoss['sw'][id2[j]]['p_T'], t_ref[start:ende], Rth_JA, Cth_JA)
+            [elecSw, lossSw] = calcMemBri(Vdc, i_S[:, start:ende], i_G[:, start:ende], Tj, id5, memSw, para, setupPara, setupExp)
+            timeElec['sw'].update(bri2col(elecSw, id2))
+            timeLoss['sw'].update(bri2col(lossSw, id2))
 
             # Capacitor
             timeElec['cap']['C1']['i_c'] = timeDc['i_c'][start:ende]
             timeElec['cap']['C1']['v_c'] = timeDc['v_dc'][start:ende]
             timeLoss['cap']['C1'] = calcLossCap(t_ref, timeDc['i_c'][start:ende], Tcap, para, setupPara, setupTopo)
-            [timeTher['cap']['C1'], Tinit_Cap] = calcTherRC(Tinit_Cap, Ta, timeLoss['cap']['C1']['p_L'], t_ref[start:ende], Rth_JA_cap, Cth_JA_cap)
+
+            # Thermal
+            Pv = lossNet(lossSw, timeLoss['cap']['C1']['p_L'], net['cpl'])
+            [Tther, Tinit] = calcTherBri(Tinit, Ta, Pv, t_ref[start:ende], net)
 
             # Appending
-            dataFel = app_fs(dataFel, timeElec, timeLoss, setupExp)
+            dataFel = app_fs(dataFel, timeElec, timeLoss, start)
 
             # Parameter Update
             if setupExp['loop'] == 'CL':
                 for j in range(0, len(id2)):
-                    Tj[j] = timeTher['sw'][id6[j]][-1]
-                Tcap = timeTher['cap']['C1'][-1]
+                    Tj[j] = Tther[j, -1]
+                Tcap = Tther[-1, -1]
 
         # ------------------------------------------
         # Appending
         # ------------------------------------------
-        out = app_fel(out, dataFel['elec'], dataFel['loss'], Nel, setupExp)
+        out = app_fel(out, dataFel['elec'], dataFel['loss'], k, Nel, setupExp)
 
     # ==============================================================================
     # Averaging
@@ -251,33 +265,15 @@ def calcTransB6(mdl, para, setupTopo, setupData, setupPara, setupExp):
     # ------------------------------------------
     # Calc
     # ------------------------------------------
-    # Switches
-    for i in range(0, len(id2)):
-        [out['ther']['sw'][id6[i]], _] = calcTherRC(0, Ta, out['loss']['sw'][id2[i]]['p_T'].values, t, Rth_JA, Cth_JA)
-        [out['ther']['sw'][id7[i]], _] = calcTherRC(0, Ta, out['loss']['sw'][id2[i]]['p_D'].values, t, Rth_DA, Cth_DA)
-
-    # Capacitor
-    [out['ther']['cap']['C1'], _] = calcTherRC(0, Ta, out['loss']['cap']['C1']['p_L'].values, t, Rth_JA_cap, Cth_JA_cap)
-
-    # Coupling
-    for i in range(0, len(id2)):
-        if setupPara['Ther']['Heatsink'] == 1 & setupPara['Ther']['Coupling'] == 1:
-            [out['ther']['sw'][id8[i]], _] = calcTherRC(0, Ta, out['loss']['sw'][id2[i]]['p_L'].values, t, Rth_CA, Cth_CA)
-            out['ther']['sw'][id6[i]] = out['ther']['sw'][id6[i]][:] + out['ther']['sw'][id8[i]][:] - Ta
-            out['ther']['sw'][id7[i]] = out['ther']['sw'][id7[i]][:] + out['ther']['sw'][id8[i]][:] - Ta
-        else:
-            out['ther']['sw'][id8[i]] = Ta
+    Pv = lossNet(col2bri(out['loss']['sw'], id2), out['loss']['cap']['C1']['p_L'], net['cpl'])
+    [Tther, _] = calcTherBri(0, Ta, Pv, t, net)
 
-    # ------------------------------------------
-    # Appending
-    # ------------------------------------------
-    # Switch
-    out['ther']['sw'] = pd.DataFrame(out['ther']['sw'], columns=['T1', 'T2', 'T3', 'T4', 'T5', 'T6',
-                                                                 'D1', 'D2', 'D3', 'D4', 'D5', 'D6',
-                                                                 'C1', 'C2', 'C3', 'C4', 'C5', 'C6'])
+    # Switches
+    for i in range(0, len(id9)):
+        out['ther']['sw'][id9[i]] = Tther[i]
 
     # Capacitor
-    out['ther']['cap'] = pd.DataFrame(out['ther']['cap'], columns=['C1'])
+    out['ther']['cap']['C1'] = Tther[-1]
 
     ###################################################################################################################
     # Post-Processing
@@ -17,11 +17,13 @@
 # Internal
 # ==============================================================================
 from src.topo.B6.initB6 import initB6
+from src.general.helpFnc import col2df
 
 # ==============================================================================
 # External
 # ==============================================================================
 import numpy as np
+import pandas as pd
 
 
 #######################################################################################################################
@@ -80,9 +82,9 @@ def outB6_Trans(out, timeAc, timeDc, freqSw, freqAc, freqDc, t_ref, v_ref, e_ref
     time['Ac'] = timeAc
     time['Dc'] = timeDc
     time['t'] = np.linspace(0, Tel * Nel, int(len(out['loss']['sw']['S1']['p_T'])))
-    time['Elec'] = out['elec']
-    time['Loss'] = out['loss']
-    time['Ther'] = out['ther']
+    time['Elec'] = col2df(out['elec'])
+    time['Loss'] = col2df(out['loss'])
+    time['Ther'] = {'sw': pd.DataFrame(out['ther']['sw']), 'cap': pd.DataFrame(out['ther']['cap'])}
 
     # ------------------------------------------
     # Frequency
@@ -152,8 +154,8 @@ def outB6_Steady(timeElec, timeLoss, timeTher, timeAc, timeDc, freqSw, freqAc, f
     time['Sw'] = timeSw
     time['Ac'] = timeAc
     time['Dc'] = timeDc
-    time['Elec'] = timeElec
-    time['Loss'] = timeLoss
+    time['Elec'] = col2df(timeElec)
+    time['Loss'] = col2df(timeLoss)
     time['Ther'] = timeTher
 
     # ------------------------------------------
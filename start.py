@@ -68,6 +68,10 @@ setupExp['fsim'] = 5e5
 setupExp['tol'] = 1e-3                                                                                                  # tolerance in percent with respect to the previous converged result
 setupExp['eps'] = 1e-12                                                                                                 # small numerical tolerance
 setupExp['int'] = 20                                                                                                    # number of steps for integration
+setupExp['pss'] = 0                                                                                                     # (0): start-up transient is simulated and the first two fundamental cycles are discarded, (1): circuit is solved in periodic steady-state from the one-period state transition (cyc can be 1)
+setupExp['solver'] = 'time'                                                                                             # solver for the circuit models: 'time' (time domain simulation), 'freq' (periodic steady-state, solved in the frequency domain on the FFT grid, cyc can be 1) or 'evt' (exact between switching edges, best with setupPara['PWM']['evt'] = 1)
+setupExp['acc'] = 'none'                                                                                                # acceleration of the closed-loop electro-thermal iteration of the steady-state analysis: 'none' (fixed-point iteration), 'secant' or 'anderson' (extrapolation from the last one or three iterates, converged on the fixed-point residual)
+setupExp['Tq'] = 0                                                                                                      # temperature step of the switch loss memory (K), losses are evaluated at the two bracketing multiples of Tq and interpolated linearly in Tj for recurring current and gate waveforms, (0): losses are evaluated at the exact temperature
 
 # ------------------------------------------
 # Output
@@ -87,7 +91,7 @@ setupData['trans']['Tc'] = 50.0
 setupData['trans']['Tj'] = 50.0                                                                                         # core temperature at t=0 of all components (°C)
 
 # Stationary
-setupData['stat']['cyc'] = 4                                                                                            # number of fundamental cycles used for stationary analysis (at least 4)
+setupData['stat']['cyc'] = 4                                                                                            # number of fundamental cycles used for stationary analysis (at least 4, at least 1 for setupExp['pss'] = 1)
 setupData['stat']['W'] = 20                                                                                             # number of datapoints for sweep analysis
 setupData['stat']['Tj'] = 50.0                                                                                          # core temperature of all components (°C)
 setupData['stat']['Tc'] = 50.0                                                                                          # reference temperature of all components (°C)
@@ -154,13 +158,14 @@ setupTopo['fel'] = 50
 # ------------------------------------------
 # General
 # ------------------------------------------
-setupPara['PWM']['type'] = "SV"                                                                                         # (FF): fundamental frequency, (CB): carrier based, (SV): space vector based
+setupPara['PWM']['type'] = "SV"                                                                                         # (FF): fundamental frequency, (CB): carrier based, (SV): space vector based, (OPP): optimal pulse patterns (angles from cached lookup tables in para/OPP)
 setupPara['PWM']['upd'] = "DE"                                                                                          # (SE): single edge, (DE): double edge 
 setupPara['PWM']['samp'] = "RS"                                                                                         # (NS): natural sampling, (RS): regular sampling
 setupPara['PWM']['tri'] = "SM"                                                                                          # modulation trigger (RE): rising edge, (FE): falling edge, (SM): symmetrical modulation, (AM): asymmetrical modualtion
 setupPara['PWM']['int'] = 0                                                                                             # (0): non-interleaved, (1): interleaving (when multiple carriers are used)
 setupPara['PWM']['td'] = 0                                                                                              # dead time (sec)
 setupPara['PWM']['tmin'] = 0                                                                                            # minimum on/off period (sec)
+setupPara['PWM']['evt'] = 0                                                                                             # (0): switching functions sampled at fsim, (1): exact switching events (edges from carrier/reference intersections or dwell times, td and tmin applied on edge times)
 
 # ------------------------------------------
 # Modelling
@@ -202,6 +207,8 @@ setupPara['Elec']['CapSeries'] = 1
 # ==============================================================================
 setupPara['Ther']['Heatsink'] = 1                                                                                       # 1) using thermal capacities and resistances of heatsink RC model
 setupPara['Ther']['Coupling'] = 0                                                                                       # 0) no thermal coupling between diode and transistor, 1) thermal coupling between diode and transistor
+setupPara['Ther']['Network'] = 'foster'                                                                                 # thermal network: 'foster' (one Foster network per transistor, diode and capacitor) or 'shared' (all switches and the capacitor on one heatsink node, case-to-ambient networks as Cauer ladders)
+setupPara['Ther']['Gth'] = 0                                                                                            # coupling conductance between the cases of the switches in W/K for 'shared' (scalar, or matrix incl. the capacitor as last row/column)
 
 #######################################################################################################################
 # Calculations